@@ -0,0 +1,235 @@
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+#   Local stand-ins for remote backends                 #
+#                                                       #
+#   `ElasticsearchStub`: an in-process transport node   #
+#       answering info, exists, (sliced) scroll and     #
+#       point in time searches and bulk requests, so    #
+#       the real client, helpers and (de)serialization  #
+#       are exercised                                   #
+#                                                       #
+#   `sqlite_engine`: an in-memory SQLite database       #
+#                                                       #
+#   `HttpStub`: a local HTTP server answering Solr      #
+#       `select` and ArcGIS-style `query` requests      #
+#                                                       #
+#   Each stub accumulates the time it spends building   #
+#       responses in `time`, so it can be reported      #
+#       separately from the framework's time            #
+#                                                       #
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+
+# stdlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import count
+from typing import Any, Callable
+from urllib.parse import parse_qs, urlsplit
+
+# third-party
+from elastic_transport import ApiResponseMeta, BaseNode, HttpHeaders
+from elastic_transport._node import NodeApiResponse
+from elasticsearch import Elasticsearch
+from pandas import DataFrame
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.pool import StaticPool
+
+HEADERS = {'content-type':'application/json', 'x-elastic-product':'Elasticsearch'}
+SHARDS = {'total':1, 'successful':1, 'skipped':0, 'failed':0}
+
+
+class Backend:
+    """ a stand-in that accumulates the time it spends answering requests """
+    def __init__(self) -> None:
+        self.time = 0.
+        self.requests = 0
+        self._lock = threading.Lock()
+
+
+    def reset(self) -> None:
+        with self._lock:
+            self.time = 0.
+            self.requests = 0
+
+
+    def timed[T](self, fn:Callable[[], T]) -> T:
+        start = time.perf_counter()
+        try:
+            return fn()
+        finally:
+            with self._lock:
+                self.time += time.perf_counter() - start
+                self.requests += 1
+
+
+class ElasticsearchStub(Backend):
+    """ an in-process Elasticsearch 'cluster' with one index of `hits`, served through a transport node; see `client`. each request
+        waits `latency` seconds first, standing in for the network (it's not counted in `time`) """
+    def __init__(self, hits:list[dict]|None=None, index:str='items', latency:float=0.) -> None:
+        super().__init__()
+        self.hits = hits or []
+        self.index = index
+        self.latency = latency
+        self.indexed = 0            # documents received by `_bulk`
+        self._scrolls:dict[str, tuple[list[dict], int, int]] = {}     # {scroll id: (hits, next offset, page size)}
+        self._ids = count()
+
+
+    def client(self) -> Elasticsearch:
+        """ an `Elasticsearch` client whose every request is answered by this stub """
+        stub = self
+
+        class Node(BaseNode):
+            def perform_request(self, method, target, body=None, headers=None, request_timeout=None) -> NodeApiResponse:
+                if stub.latency:
+                    time.sleep(stub.latency)
+                status, payload = stub.timed(lambda: stub.handle(method, target, body))
+                meta = ApiResponseMeta(status, '1.1', HttpHeaders(HEADERS), 0., self.config)
+                return NodeApiResponse(meta, payload)
+
+        return Elasticsearch('http://elasticsearch-stub:9200', node_class=Node)
+
+
+    def handle(self, method:str, target:str, body:bytes|None) -> tuple[int, bytes]:
+        path, _, query = target.partition('?')
+        params = parse_qs(query)
+        parts = [p for p in path.split('/') if p]
+
+        if method == 'GET' and not parts:
+            return 200, json.dumps({'name':'stub', 'cluster_name':'benchmarks', 'version':{'number':'8.19.0'}, 'tagline':'You Know, for Search'}).encode()
+
+        if method == 'HEAD':
+            return (200 if parts == [self.index] else 404), b''
+
+        if parts[-1] == '_bulk':
+            # two lines (action, source) per document
+            n = body.count(b'\n') // 2 if body else 0
+            self.indexed += n
+            items = b','.join([b'{"index":{"status":201,"result":"created"}}'] * n)
+            return 200, b'{"took":1,"errors":false,"items":[' + items + b']}'
+
+        if parts[-1] == '_pit':
+            if method == 'DELETE':
+                return 200, b'{"succeeded":true,"num_freed":1}'
+            return 200, json.dumps({'id':f'pit-{next(self._ids)}'}).encode()
+
+        if parts == ['_search', 'scroll']:
+            if method == 'DELETE':
+                return 200, b'{"succeeded":true,"num_freed":1}'
+            scroll_id = json.loads(body or b'{}')['scroll_id']
+            return 200, self.page(scroll_id)
+
+        if parts[-1] == '_search':
+            # `size` may be passed in the query string or the body; a `slice` scrolls every `max`th hit from the `id`th
+            search = json.loads(body or b'{}')
+            size = int(params.get('size', [search.get('size', 10)])[0])
+            hits = self.hits[search['slice']['id']::search['slice']['max']] if 'slice' in search else self.hits
+            if 'pit' in search:
+                return 200, self.pit_page(hits, search['pit']['id'], search.get('search_after', [-1])[0] + 1, size)
+            scroll_id = f'scroll-{next(self._ids)}'
+            self._scrolls[scroll_id] = (hits, 0, size)
+            return 200, self.page(scroll_id)
+
+        return 404, b'{"error":"not found","status":404}'
+
+
+    def page(self, scroll_id:str) -> bytes:
+        hits, offset, size = self._scrolls[scroll_id]
+        self._scrolls[scroll_id] = (hits, offset + size, size)
+        return json.dumps({
+            '_scroll_id':scroll_id,
+            'took':1,
+            '_shards':SHARDS,
+            'hits':{'total':{'value':len(hits), 'relation':'eq'}, 'hits':hits[offset:offset + size]}
+        }).encode()
+
+
+    def pit_page(self, hits:list[dict], pit_id:str, offset:int, size:int) -> bytes:
+        # a hit's sort value is its position (in its slice), standing in for `_shard_doc`
+        return json.dumps({
+            'pit_id':pit_id,
+            'took':1,
+            '_shards':SHARDS,
+            'hits':{'hits':[{**hit, 'sort':[i]} for i, hit in enumerate(hits[offset:offset + size], offset)]}
+        }).encode()
+
+
+def sqlite_engine(tables:dict[str, DataFrame]) -> Engine:
+    """ an in-memory SQLite database (one connection, shared by every `connect`) holding `tables` """
+    engine = create_engine('sqlite://', poolclass=StaticPool, connect_args={'check_same_thread':False})
+    for name, df in tables.items():
+        df.to_sql(name, engine, index=df.index.name is not None)
+    return engine
+
+
+class HttpStub(Backend):
+    """ a local HTTP server; Solr `select`s page through `docs`, ArcGIS `query`s return a feature per requested id.
+        use as a context manager; `url` is its base url """
+    def __init__(self, docs:list[dict]|None=None) -> None:
+        super().__init__()
+        self.docs = docs or []
+        self._by_id = {doc['id']:doc for doc in self.docs}
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format:str, *args:Any) -> None:
+                pass
+
+            def reply(self, status:int, body:bytes=b'') -> None:
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if self.command != 'HEAD':
+                    self.wfile.write(body)
+
+            def do_HEAD(self) -> None:
+                self.reply(200)
+
+            def do_GET(self) -> None:
+                url = urlsplit(self.path)
+                self.reply(*stub.timed(lambda: stub.select(url.path, parse_qs(url.query))))
+
+            def do_POST(self) -> None:
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0))).decode()
+                self.reply(*stub.timed(lambda: stub.query(urlsplit(self.path).path, parse_qs(body))))
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_port}'
+
+
+    def __enter__(self) -> 'HttpStub':
+        threading.Thread(target=self.server.serve_forever, name='http-stub', daemon=True).start()
+        return self
+
+
+    def __exit__(self, *_) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+    def select(self, path:str, params:dict[str, list[str]]) -> tuple[int, bytes]:
+        """ a Solr `/<instance>/select` page """
+        if not path.endswith('/select'):
+            return 404, b'{}'
+        start, rows = int(params.get('start', ['0'])[0]), int(params.get('rows', ['10'])[0])
+        return 200, json.dumps({
+            'responseHeader':{'status':0},
+            'response':{'numFound':len(self.docs), 'start':start, 'docs':self.docs[start:start + rows]}
+        }).encode()
+
+
+    def query(self, path:str, form:dict[str, list[str]]) -> tuple[int, bytes]:
+        """ an ArcGIS-style `query`; a GeoJSON point feature per id in the `ids` form field """
+        if not path.endswith('/query'):
+            return 404, b'{}'
+        ids = form.get('ids', [''])[0].split(',')
+        features = [
+            {'type':'Feature', 'id':i, 'geometry':{'type':'Point', 'coordinates':[n % 360 - 180, n % 180 - 90]}, 'properties':{'id':i}}
+            for n, i in enumerate(ids) if i in self._by_id
+        ]
+        return 200, json.dumps({'type':'FeatureCollection', 'features':features}).encode()
\ No newline at end of file
@@ -0,0 +1,53 @@
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+#   Compare two benchmark results files                 #
+#                                                       #
+#   python benchmarks/compare.py base.json head.json    #
+#       [--metric framework_median] [--threshold 0.1]   #
+#                                                       #
+#   Exits non-zero if any benchmark got slower by       #
+#       more than `threshold`                           #
+#                                                       #
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+
+# stdlib
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def load(path:Path) -> tuple[dict, dict[tuple[str, int], dict]]:
+    results = json.loads(path.read_text())
+    return results, {(r['benchmark'], r['rows']):r for r in results['results'] if r['status'] == 'ok'}
+
+
+def main(argsv=None) -> int:
+    parser = argparse.ArgumentParser(description='compare two benchmark results files')
+    parser.add_argument('base', type=Path)
+    parser.add_argument('head', type=Path)
+    parser.add_argument('--metric', choices=('median', 'min', 'framework_median'), default='median')
+    parser.add_argument('--threshold', type=float, default=.1, help='the relative slowdown counted as a regression')
+    args = parser.parse_args(argsv)
+
+    base_run, base = load(args.base)
+    head_run, head = load(args.head)
+    print(f"base {base_run.get('commit')}  head {head_run.get('commit')}  ({args.metric})")
+
+    regressions = 0
+    for key in sorted(base.keys() & head.keys()):
+        before, after = base[key][args.metric], head[key][args.metric]
+        change = (after - before) / before if before else 0.
+        flag = ''
+        if change > args.threshold:
+            flag = '  REGRESSION'
+            regressions += 1
+        print(f'{key[0]:26} {key[1]:>10,} rows  {before:8.3f}s -> {after:8.3f}s  {change:+7.1%}{flag}')
+
+    for key in sorted(base.keys() ^ head.keys()):
+        print(f"{key[0]:26} {key[1]:>10,} rows  only in {'base' if key in base else 'head'}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
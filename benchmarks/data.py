@@ -0,0 +1,78 @@
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+#   Deterministic, synthetic data for benchmarks        #
+#                                                       #
+#   `items` is an `id`-indexed DataFrame of strings,    #
+#       categories, ints, floats, timestamps and a      #
+#       nullable column; the same `rows` and `seed`     #
+#       always give the same frame                      #
+#                                                       #
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+
+# stdlib
+from datetime import datetime
+
+# third-party
+import numpy as np
+import pandas as pd
+from pandas import DataFrame, MultiIndex
+
+# first-party
+from process_framework.steps.elasticsearch import Document
+
+NAMES = np.array(['barrow', 'cairn', 'henge', 'hillfort', 'motte', 'priory', 'tithe barn', 'villa', 'windmill', 'wreck'])
+TAGS = np.array(['listed', 'scheduled', 'registered', 'protected'])
+EPOCH = pd.Timestamp('2024-01-01')
+
+
+class Item(Document):
+    """ the document type of a row of `items` """
+    id:str
+    name:str
+    quantity:int
+    price:float
+    updated:datetime
+    tag:str|None = None
+
+
+def items(rows:int, seed:int=0) -> DataFrame:
+    """ an `id`-indexed DataFrame of `rows` synthetic items """
+    rng = np.random.default_rng(seed)
+    tags = TAGS[rng.integers(0, len(TAGS), rows)].astype(object)
+    tags[rng.random(rows) < .2] = None
+    df = DataFrame({
+        'id':pd.Index(np.arange(rows)).astype(str).str.zfill(9),
+        'name':NAMES[rng.integers(0, len(NAMES), rows)],
+        'quantity':rng.integers(0, 1_000, rows),
+        'price':(rng.random(rows) * 100).round(2),
+        'updated':EPOCH + pd.to_timedelta(rng.integers(0, 365 * 86_400, rows), unit='s'),
+        'tag':tags,
+    })
+    return df.set_index('id')
+
+
+def wide(rows:int, columns:int=40, seed:int=0) -> DataFrame:
+    """ `items` with `columns` more float columns, `x0`, `x1`... """
+    rng = np.random.default_rng(seed)
+    df = items(rows, seed)
+    return df.join(DataFrame(rng.random((rows, columns)), index=df.index, columns=[f'x{i}' for i in range(columns)]))
+
+
+def hits(df:DataFrame, index:str='items') -> list[dict]:
+    """ elasticsearch hits for the rows of `df` """
+    sources = df.assign(updated=df['updated'].dt.strftime('%Y-%m-%dT%H:%M:%S')).to_dict('records')
+    return [
+        {'_index':index, '_id':_id, '_source':{k:v for k, v in source.items() if v is not None}}
+        for _id, source in zip(df.index, sources)
+    ]
+
+
+def versions(rows:int, changed:float=.1, deleted:float=.05, seed:int=0) -> tuple[MultiIndex, MultiIndex]:
+    """ local and remote (`_id`, `version`) indexes of `rows` documents, with a fraction `changed` locally and `deleted` remotely """
+    rng = np.random.default_rng(seed)
+    ids = pd.Index(np.arange(rows)).astype(str).str.zfill(9)
+    remote_versions = rng.integers(0, 2**31, rows)
+    local_versions = np.where(rng.random(rows) < changed, remote_versions + 1, remote_versions)
+    keep = rng.random(rows) >= deleted
+    local = MultiIndex.from_arrays([ids, local_versions], names=['_id', 'version'])
+    remote = MultiIndex.from_arrays([ids[keep], remote_versions[keep]], names=['_id', 'version'])
+    return local, remote
\ No newline at end of file
@@ -0,0 +1,84 @@
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+#   Import-time benchmark                               #
+#                                                       #
+#   Imports each module in a fresh interpreter and      #
+#       fails if a heavy, optional backend (pandas,     #
+#       elasticsearch, sqlalchemy, ...) was loaded      #
+#       with it, or if the import took too long         #
+#                                                       #
+#   python benchmarks/import_time.py [--json] \         #
+#       [--max-seconds 1.0] [--repeat 5]                #
+#                                                       #
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+
+# stdlib
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+HEAVY = ('pandas', 'numpy', 'elasticsearch', 'sqlalchemy', 'geopandas', 'requests', 'aiohttp', 'pyarrow')
+
+# modules which must import without loading any of `HEAVY`
+MODULES = (
+    'process_framework',
+    'process_framework.references',
+    'process_framework.steps',
+    'process_framework.steps.elasticsearch',
+    'process_framework.steps.sql',
+    'process_framework.steps.versioning',
+    'process_framework.instrumentation',
+    'process_framework.pipeline',
+    'process_framework.pipeline.cli',
+)
+
+PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = sorted(m for m in {heavy!r} if m in sys.modules)
+print(json.dumps({{"seconds":elapsed, "heavy":heavy}}))
+'''
+
+
+def probe(module:str) -> dict:
+    """ import `module` in a fresh interpreter; get its import time and the heavy modules it loaded """
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE.format(module=module, heavy=HEAVY)],
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout)
+
+
+def main(argsv=None) -> int:
+    parser = argparse.ArgumentParser(description='time importing process_framework modules, failing on heavy imports or slow starts')
+    parser.add_argument('--repeat', type=int, default=5, help='imports per module; the median is reported')
+    parser.add_argument('--max-seconds', type=float, default=1.0, help='fail if any median import time exceeds this')
+    parser.add_argument('--json', action='store_true', help='print results as json')
+    args = parser.parse_args(argsv)
+
+    results = []
+    for module in MODULES:
+        probes = [probe(module) for _ in range(max(1, args.repeat))]
+        seconds = statistics.median(p['seconds'] for p in probes)
+        heavy = sorted({m for p in probes for m in p['heavy']})
+        results.append({
+            'module':module,
+            'seconds':seconds,
+            'heavy':heavy,
+            'ok':not heavy and seconds <= args.max_seconds
+        })
+
+    if args.json:
+        print(json.dumps({'benchmark':'import_time', 'max_seconds':args.max_seconds, 'results':results}, indent=2))
+    else:
+        for r in results:
+            print(f"{'ok' if r['ok'] else 'FAIL':4}  {r['seconds']:.3f}s  {r['module']}{'  loaded ' + ', '.join(r['heavy']) if r['heavy'] else ''}")
+
+    return 0 if all(r['ok'] for r in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,147 @@
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+#   Run the benchmark suite                             #
+#                                                       #
+#   python benchmarks/run.py [--rows 10k 100k 1M 10M]   #
+#       [--only NAME ...] [--repeat 3] [--warmup 1]     #
+#       [--output results.json]                         #
+#                                                       #
+#   Results (median, min, and the time spent in the     #
+#       stand-in backend) are written as json with      #
+#       the commit and package versions, to compare     #
+#       across commits with `compare.py`                #
+#                                                       #
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+
+# stdlib
+import argparse
+import gc
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Any
+
+# local
+sys.path.insert(0, str(Path(__file__).parent))
+from suite import BENCHMARKS, Skip
+
+# first-party
+from process_framework.instrumentation import peak_rss
+
+PACKAGES = ('process_framework', 'pandas', 'numpy', 'pydantic', 'elasticsearch', 'sqlalchemy', 'requests', 'pyarrow', 'geopandas')
+
+
+def parse_rows(value:str) -> int:
+    """ parse a row count, e.g. '10k', '1M', '2_500' """
+    value = value.strip().lower().replace('_', '')
+    for suffix, factor in (('k', 1_000), ('m', 1_000_000)):
+        if value.endswith(suffix):
+            return int(float(value[:-1]) * factor)
+    return int(value)
+
+
+def get_environment() -> dict[str, Any]:
+    """ the commit, interpreter and package versions the suite ran against """
+    def git(*args:str) -> str|None:
+        try:
+            return subprocess.run(['git', *args], capture_output=True, text=True, check=True, cwd=Path(__file__).parent).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    versions = {}
+    for package in PACKAGES:
+        try:
+            versions[package] = version(package)
+        except PackageNotFoundError:
+            versions[package] = None
+
+    return {
+        'commit':git('rev-parse', 'HEAD'),
+        'dirty':bool(git('status', '--porcelain', '--untracked-files=no')),
+        'timestamp':datetime.now(timezone.utc).isoformat(),
+        'python':platform.python_version(),
+        'platform':platform.platform(),
+        'versions':versions,
+    }
+
+
+def run_case(name:str, rows:int, repeat:int, warmup:int) -> dict[str, Any]:
+    """ time `repeat` runs of the case `name` with `rows` rows, after `warmup` untimed runs """
+    result:dict[str, Any] = {'benchmark':name, 'rows':rows, 'status':'ok'}
+    try:
+        with BENCHMARKS[name](rows) as case:
+            for _ in range(warmup):
+                case.run()
+
+            times, backend_times = [], []
+            for _ in range(repeat):
+                if case.backend is not None:
+                    case.backend.reset()
+                gc.collect()
+                start = time.perf_counter()
+                case.run()
+                times.append(time.perf_counter() - start)
+                backend_times.append(case.backend.time if case.backend is not None else 0.)
+
+            output_memory = case.output.memory_usage() if case.output is not None else None
+
+    except Skip as e:
+        return result | {'status':'skipped', 'reason':str(e)}
+    except Exception as e:
+        logging.exception(f'{name} ({rows} rows) failed')
+        return result | {'status':'failed', 'error':f'{type(e).__name__}: {e}'}
+
+    median = statistics.median(times)
+    backend = statistics.median(backend_times)
+    return result | {
+        'repeat':repeat,
+        'times':times,
+        'median':median,
+        'min':min(times),
+        'backend_median':backend,                   # time spent in the stand-in backend (serializing responses etc.)
+        'framework_median':max(0., median - backend),
+        'rows_per_second':rows / median if median else None,
+        'peak_rss':peak_rss(),
+        'output_memory':output_memory,              # the deep memory of the case's output, bytes
+    }
+
+
+def main(argsv=None) -> int:
+    parser = argparse.ArgumentParser(description='time process_framework steps against local stand-in backends')
+    parser.add_argument('--rows', nargs='+', type=parse_rows, default=[10_000, 100_000], help='row counts, e.g. 10k 100k 1M 10M')
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), default=None, help='run only these benchmarks')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per benchmark and row count')
+    parser.add_argument('--warmup', type=int, default=1, help='untimed runs before the timed runs')
+    parser.add_argument('--output', type=Path, default=None, help='write results as json to this path (print them if omitted)')
+    args = parser.parse_args(argsv)
+
+    logging.basicConfig(level=logging.WARNING)
+    results = []
+    for name in args.only or BENCHMARKS:
+        for rows in args.rows:
+            result = run_case(name, rows, args.repeat, args.warmup)
+            results.append(result)
+            if result['status'] == 'ok':
+                memory = '' if result['output_memory'] is None else f", output {result['output_memory'] / 2**20:,.1f}MiB"
+                print(f"{name:26} {rows:>10,} rows  {result['median']:8.3f}s  (backend {result['backend_median']:.3f}s, {result['rows_per_second']:,.0f} rows/s{memory})", file=sys.stderr)
+            else:
+                print(f"{name:26} {rows:>10,} rows  {result['status']}: {result.get('reason') or result.get('error')}", file=sys.stderr)
+
+    output = json.dumps({'suite':'process_framework', **get_environment(), 'results':results}, indent=2)
+    if args.output is None:
+        print(output)
+    else:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(output)
+
+    return 1 if any(r['status'] == 'failed' for r in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
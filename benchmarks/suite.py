@@ -0,0 +1,301 @@
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+#   Benchmark cases                                     #
+#                                                       #
+#   Each case is a context manager taking a row         #
+#       count; it builds its data, backend and step     #
+#       (untimed), and yields a `Case` whose `run` is   #
+#       timed by `run.py`                               #
+#                                                       #
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+
+# stdlib
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager
+from dataclasses import dataclass
+from typing import Any
+
+# third-party
+import pandas as pd
+from pandas import DataFrame, Index, Series
+from sqlalchemy import Column, DateTime, Float, Integer, MetaData, String, Table, select
+
+# first-party
+from process_framework import ModifyingStep, Reference
+from process_framework.references import ColumnReference, ColumnsReference
+from process_framework.steps import Append
+from process_framework.steps.batch_processing_step import BatchProcessDataFrame
+from process_framework.steps.dataframe.dtype_backend import DtypeBackend, to_dtype_backend
+from process_framework.steps.dataframe.process_pool import ProcessPoolTransform
+from process_framework.steps.elasticsearch import DataFrameToDocuments, IndexDocuments, ScanToDataFrame
+from process_framework.steps.elasticsearch.point_in_time import ScanEngine
+from process_framework.steps.solr.get_solr_query_result import GetSolrQueryResult
+from process_framework.steps.sql import GetOrmQueryResult, GetTextQueryResult
+from process_framework.steps.versioning import DetectUpdates
+
+# local
+import data
+from backends import Backend, ElasticsearchStub, HttpStub, sqlite_engine
+
+
+class Skip(Exception):
+    """ raised by a case that can't run here (e.g. an optional dependency is missing) """
+
+
+@dataclass
+class Case:
+    run:Callable[[], Any]
+    backend:Backend|None = None
+    output:Reference|None = None    # if set, the (deep) memory of its value after the last run is reported
+
+
+BENCHMARKS:dict[str, Callable[[int], AbstractContextManager[Case]]] = {}
+
+# seconds an `ElasticsearchStub` waits before answering each request, in the cases comparing one scroll with sliced scrolls
+SCROLL_LATENCY = 0.02
+
+
+def benchmark(name:str):
+    """ register a generator function as the case `name` """
+    def register(fn:Callable[[int], Iterator[Case]]):
+        BENCHMARKS[name] = contextmanager(fn)
+        return fn
+    return register
+
+
+@benchmark('scan_to_dataframe')
+def scan_to_dataframe(rows:int, dtype_backend:DtypeBackend|None=None, slices:int|None=None, latency:float=0., engine:ScanEngine='scroll') -> Iterator[Case]:
+    es = ElasticsearchStub(data.hits(data.items(rows)), latency=latency)
+    step = ScanToDataFrame(Reference(DataFrame), es.client(), 'items', source=True, dtype_backend=dtype_backend, slices=slices, engine=engine)
+    yield Case(step.do, es, step.assign_to)
+
+
+@benchmark('scan_wide_documents')
+def scan_wide_documents(rows:int) -> Iterator[Case]:
+    es = ElasticsearchStub(data.hits(data.wide(rows)))
+    step = ScanToDataFrame(Reference(DataFrame), es.client(), 'items', source=True)
+    yield Case(step.do, es, step.assign_to)
+
+
+@benchmark('scan_to_dataframe_latency')
+def scan_to_dataframe_latency(rows:int) -> Iterator[Case]:
+    yield from scan_to_dataframe(rows, latency=SCROLL_LATENCY)
+
+
+@benchmark('scan_to_dataframe_sliced')
+def scan_to_dataframe_sliced(rows:int) -> Iterator[Case]:
+    yield from scan_to_dataframe(rows, slices=4, latency=SCROLL_LATENCY)
+
+
+@benchmark('scan_to_dataframe_pit')
+def scan_to_dataframe_pit(rows:int) -> Iterator[Case]:
+    yield from scan_to_dataframe(rows, engine='pit')
+
+
+@benchmark('scan_to_dataframe_arrow')
+def scan_to_dataframe_arrow(rows:int) -> Iterator[Case]:
+    yield from scan_to_dataframe(rows, 'pyarrow')
+
+
+@benchmark('dataframe_to_documents')
+def dataframe_to_documents(rows:int, dtype_backend:DtypeBackend|None=None) -> Iterator[Case]:
+    step = DataFrameToDocuments(Reference(DataFrame, to_dtype_backend(data.items(rows), dtype_backend)), Reference(Series), data.Item)
+    yield Case(step.do)
+
+
+@benchmark('dataframe_to_documents_arrow')
+def dataframe_to_documents_arrow(rows:int) -> Iterator[Case]:
+    yield from dataframe_to_documents(rows, 'pyarrow')
+
+
+@benchmark('dataframe_to_documents_processes')
+def dataframe_to_documents_processes(rows:int) -> Iterator[Case]:
+    step = DataFrameToDocuments(Reference(DataFrame, to_dtype_backend(data.items(rows), 'pyarrow')), Reference(Series), data.Item)
+    yield Case(ProcessPoolTransform(step).do)
+
+
+@benchmark('index_documents')
+def index_documents(rows:int) -> Iterator[Case]:
+    df = data.items(rows).reset_index()
+    documents = Series([data.Item.model_validate(record) for record in df.to_dict('records')], index=df['id'])
+    es = ElasticsearchStub()
+    step = IndexDocuments(Reference(Series, documents), es.client(), 'items')
+    yield Case(step.do, es)
+
+
+@benchmark('detect_updates')
+def detect_updates(rows:int) -> Iterator[Case]:
+    local, remote = data.versions(rows)
+    step = DetectUpdates(Reference(Index, local), Reference(Index, remote), Reference(Index))
+    yield Case(step.do)
+
+
+class AddTax(ModifyingStep[Series]):
+    def transform(self, subject:Series) -> Series:
+        return subject * 1.2
+
+
+@benchmark('batch_process_dataframe')
+def batch_process_dataframe(rows:int) -> Iterator[Case]:
+    batch = Reference(DataFrame)
+    out = Reference(list)
+    step = BatchProcessDataFrame(Reference(DataFrame, data.items(rows)), batch, [
+        AddTax(ColumnReference(batch, 'price'), ColumnReference(batch, 'gross')),
+        Append(ColumnReference(batch, 'gross'), out),
+    ], batch_size=1_000)
+
+    def run() -> None:
+        out.set(None)
+        step.do()
+
+    yield Case(run)
+
+
+def batch_wide_dataframe(rows:int, views:bool) -> Iterator[Case]:
+    """ batch a wide frame, writing one new column per batch and appending it """
+    batch = Reference(DataFrame)
+    out = Reference(list)
+    step = BatchProcessDataFrame(Reference(DataFrame, data.wide(rows)), batch, [
+        AddTax(ColumnReference(batch, 'price'), ColumnReference(batch, 'gross')),
+        Append(ColumnReference(batch, 'gross'), out),
+    ], batch_size=1_000, views=views)
+
+    def run() -> None:
+        out.set(None)
+        step.do()
+
+    yield Case(run)
+
+
+@benchmark('batch_copies')
+def batch_copies(rows:int) -> Iterator[Case]:
+    with pd.option_context('mode.copy_on_write', False):
+        yield from batch_wide_dataframe(rows, views=False)
+
+
+@benchmark('batch_views')
+def batch_views(rows:int) -> Iterator[Case]:
+    """ as `batch_copies`, with copy-on-write views of the subject for batches """
+    with pd.option_context('mode.copy_on_write', True):
+        yield from batch_wide_dataframe(rows, views=True)
+
+
+@benchmark('column_set_aligned')
+def column_set_aligned(rows:int) -> Iterator[Case]:
+    """ set a column from a series with an equal (not the same) index """
+    df = data.items(rows)
+    value = Series(df['price'].to_numpy() * 1.2, index=df.index.copy())
+    column = ColumnReference(Reference(DataFrame, df), 'gross')
+    yield Case(lambda: column.set(value))
+
+
+@benchmark('column_set_shuffled')
+def column_set_shuffled(rows:int) -> Iterator[Case]:
+    """ set a column from a series with the same labels, shuffled, and a tenth missing """
+    df = data.items(rows)
+    value = (df['price'] * 1.2).sample(frac=.9, random_state=0)
+    column = ColumnReference(Reference(DataFrame, df), 'gross')
+    yield Case(lambda: column.set(value))
+
+
+@benchmark('column_set_as_index')
+def column_set_as_index(rows:int) -> Iterator[Case]:
+    """ set a column by looking up the values of another column in a small series """
+    df = data.items(rows)
+    value = Series(range(len(data.NAMES)), index=data.NAMES)
+    column = ColumnReference(Reference(DataFrame, df), 'name_code', column_as_index='name')
+    yield Case(lambda: column.set(value))
+
+
+@benchmark('columns_set')
+def columns_set(rows:int) -> Iterator[Case]:
+    """ set three columns at once from a shuffled frame """
+    df = data.items(rows)
+    value = df[['quantity', 'price', 'tag']].sample(frac=1, random_state=0).add_suffix('_copy')
+    columns = ColumnsReference(Reference(DataFrame, df), ['quantity_copy', 'price_copy', 'tag_copy'])
+    yield Case(lambda: columns.set(value))
+
+
+@benchmark('text_query')
+def text_query(rows:int, dtype_backend:DtypeBackend|None=None) -> Iterator[Case]:
+    engine = sqlite_engine({'items':data.items(rows)})
+    step = GetTextQueryResult(Reference(DataFrame), 'SELECT * FROM items', engine=engine, index='id', dtype_backend=dtype_backend)
+    yield Case(step.do, output=step.assign_to)
+    engine.dispose()
+
+
+@benchmark('text_query_arrow')
+def text_query_arrow(rows:int) -> Iterator[Case]:
+    yield from text_query(rows, 'pyarrow')
+
+
+class GetItems(GetOrmQueryResult[DataFrame]):
+    def populate_metadata(self, metadata:MetaData) -> None:
+        self.items = Table('items', metadata,
+            Column('id', String, primary_key=True),
+            Column('name', String),
+            Column('quantity', Integer),
+            Column('price', Float),
+            Column('updated', DateTime),
+            Column('tag', String),
+        )
+
+
+    def get_in_column(self):
+        return self.items.c.id
+
+
+    def get_query(self):
+        return select(self.items)
+
+
+@benchmark('orm_query')
+def orm_query(rows:int) -> Iterator[Case]:
+    engine = sqlite_engine({'items':data.items(rows)})
+    step = GetItems(Reference(DataFrame), engine=engine, index='id')
+    yield Case(step.do)
+    engine.dispose()
+
+
+@benchmark('orm_query_ids')
+def orm_query_ids(rows:int) -> Iterator[Case]:
+    """ as `orm_query`, filtered to every tenth id through a temp table """
+    df = data.items(rows)
+    engine = sqlite_engine({'items':df})
+    step = GetItems(Reference(DataFrame), engine=engine, index='id', _ids=df.index[::10].to_list())
+    yield Case(step.do)
+    engine.dispose()
+
+
+@benchmark('solr_query')
+def solr_query(rows:int, dtype_backend:DtypeBackend|None=None) -> Iterator[Case]:
+    df = data.items(rows).drop(columns='updated').rename(columns={'price':'unitPrice'}).reset_index()
+    docs = [{k:v for k, v in doc.items() if v is not None} | {'typeName':'Item'} for doc in df.to_dict('records')]
+    with HttpStub(docs) as solr:
+        step = GetSolrQueryResult(Reference(DataFrame), f'{solr.url}/solr', 'items', type_name='Item', fq=None, rows=1_000, dtype_backend=dtype_backend)
+        yield Case(step.do, solr, step.assign_to)
+
+
+@benchmark('solr_query_arrow')
+def solr_query_arrow(rows:int) -> Iterator[Case]:
+    yield from solr_query(rows, 'pyarrow')
+
+
+@benchmark('arcgis_api')
+def arcgis_api(rows:int) -> Iterator[Case]:
+    try:
+        from geopandas import GeoDataFrame
+        from process_framework.steps.geospatial.assign_esri_api_response import ArcGisApiTransformer
+    except ImportError as e:
+        raise Skip(f'{e.name} is not installed (install the `geo` extra)')
+
+    class QueryFeatures(ArcGisApiTransformer):
+        def get_payload_for_batch(self, batch:DataFrame) -> dict:
+            return {'f':'geojson', 'ids':','.join(batch.index)}
+
+        def get_geodataframe_for_responses(self, responses:list) -> GeoDataFrame:
+            return GeoDataFrame.from_features([f for response in responses for f in response['features']])
+
+    df = data.items(rows)
+    with HttpStub([{'id':i} for i in df.index]) as arcgis:
+        step = QueryFeatures(Reference(DataFrame, df), Reference(GeoDataFrame), f'{arcgis.url}/arcgis/query', batch_size=1_000)
+        yield Case(step.do, arcgis)
\ No newline at end of file
@@ -0,0 +1,3 @@
+from .report import RunReport, StepReport, measure, record_metrics, peak_rss, size_of
+from ..references.summary import memory_of
+from .profile import Profiler
\ No newline at end of file
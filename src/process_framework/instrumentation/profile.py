@@ -0,0 +1,230 @@
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+#   Profile pipeline runs or selected steps             #
+#                                                       #
+#   Each top-level step (or each `measure`d block whose #
+#       name is selected) is profiled with cProfile in  #
+#       the thread it runs in; blocks nested in it, on  #
+#       worker threads (`BatchProcessor` batches,       #
+#       `Retry` tries) or the event loop's thread, are  #
+#       profiled as part of it                          #
+#                                                       #
+#   Meanwhile a sampling thread records the stacks of   #
+#       threads in profiled blocks, for flame graphs    #
+#                                                       #
+#   Results are written as pstats files (one per step   #
+#       name, and one for the run) and a collapsed-     #
+#       stack text file                                 #
+#                                                       #
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+
+# stdlib
+import cProfile
+import io
+import logging
+import pstats
+import re
+import sys
+import threading
+from collections import Counter
+from collections.abc import Collection
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from types import FrameType
+from typing import TYPE_CHECKING, Iterator
+
+if TYPE_CHECKING:
+    import asyncio
+
+
+# the active profiler in the current context; `None` if nothing is being profiled
+_profiler:ContextVar['Profiler|None'] = ContextVar('_profiler', default=None)
+
+# the name of the profiled block the current context is in (worker threads copy it), and whether it's in any `measure`d block
+_enclosing:ContextVar[str|None] = ContextVar('_enclosing', default=None)
+_nested:ContextVar[bool] = ContextVar('_nested', default=False)
+
+
+def collapse(name:str, frame:FrameType|None) -> str:
+    """ a collapsed (`;`-separated, outermost first) stack of `frame`, rooted at `name` """
+    labels = []
+    while frame is not None:
+        code = frame.f_code
+        labels.append(f"{frame.f_globals.get('__name__', '?')}:{code.co_qualname}")
+        frame = frame.f_back
+    labels.append(name.replace(';', ','))
+    return ';'.join(reversed(labels))
+
+
+class Profiler:
+    """ profile the blocks `measure`d under `steps` names (every top-level block, i.e. step, if `steps` is empty) during `run`,
+        writing the results to `directory`. the blocks within a profiled one, on whichever thread, are profiled as part of it """
+    def __init__(self, directory:Path, steps:Collection[str]=(), interval:float=0.005) -> None:
+        self.directory = directory
+        self.steps = set(steps)
+        self.interval = interval                        # seconds between stack samples
+        self.stats:dict[str, pstats.Stats] = {}         # {name: stats}, merged over every block with that name
+        self.samples:Counter[str] = Counter()           # {collapsed stack: samples}
+        self._active:dict[int, str] = {}                # {thread id: name} of threads in profiled blocks
+        self._unprofiled:set[str] = set()               # names that could not be profiled (at least once)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stopped = threading.Event()
+
+
+    def selects(self, name:str, top_level:bool=True) -> bool:
+        return name in self.steps if self.steps else top_level
+
+
+    @contextmanager
+    def run(self) -> Iterator['Profiler']:
+        """ make this the active profiler for the duration of the context, then write its results """
+        token = _profiler.set(self)
+        self._stopped.clear()
+        sampler = threading.Thread(target=self._sample, name='process_framework-profiler', daemon=True)
+        sampler.start()
+        try:
+            yield self
+        finally:
+            self._stopped.set()
+            sampler.join()
+            _profiler.reset(token)
+            self.dump()
+
+
+    @contextmanager
+    def profiling(self, name:str) -> Iterator[None]:
+        """ profile the current thread as `name` for the duration of the context, unless it already is """
+        started = self.start(name)
+        try:
+            yield
+        finally:
+            if started:
+                self.stop(name)
+
+
+    def start(self, name:str) -> bool:
+        """ start profiling the current thread as `name`, then `stop` it; False if it already is (as `name`, or as another block, which
+            is logged) or can't be """
+        if (active := getattr(self._local, 'name', None)) is not None:
+            if active != name:
+                # e.g. concurrent tasks on the event loop's thread; their time goes to the block that started first
+                self.unprofiled(name, f'its thread is already profiled as {active}')
+            return False
+
+        profile:cProfile.Profile|None = cProfile.Profile()
+        try:
+            profile.enable() # type: ignore
+        except ValueError as e:
+            # since 3.12 a profile covers every thread, so only one can be enabled at once
+            with self._lock:
+                others = set(self._active.values()) - {name}
+                covered = bool(self._active) and not others
+            if not covered:
+                self.unprofiled(name, f'{", ".join(sorted(others))} is being profiled on another thread' if others else str(e))
+                return False
+            # profiled by the profile of `name` enabled on another thread; the thread's stacks are still sampled
+            profile = None
+
+        self._local.name = name
+        self._local.profile = profile
+        with self._lock:
+            self._active[threading.get_ident()] = name
+        return True
+
+
+    def stop(self, name:str) -> None:
+        """ stop profiling the current thread, adding to the stats of `name` """
+        profile = self._local.profile
+        if profile is not None:
+            profile.disable()
+        self._local.name = self._local.profile = None
+        with self._lock:
+            self._active.pop(threading.get_ident(), None)
+            if profile is None:
+                return
+            if name in self.stats:
+                self.stats[name].add(profile)
+            else:
+                self.stats[name] = pstats.Stats(profile)
+
+
+    def unprofiled(self, name:str, reason:str) -> None:
+        if name not in self._unprofiled:
+            self._unprofiled.add(name)
+            logging.warning(f'could not profile {name}: {reason}')
+
+
+    def _sample(self) -> None:
+        while not self._stopped.wait(self.interval):
+            with self._lock:
+                active = dict(self._active)
+            if not active:
+                continue
+            frames = sys._current_frames()
+            for thread, name in active.items():
+                if (frame := frames.get(thread)) is not None:
+                    self.samples[collapse(name, frame)] += 1
+
+
+    def dump(self) -> None:
+        """ write `<name>.pstats` per profiled name, `run.pstats` for all of them, and `stacks.collapsed` """
+        if not self.stats:
+            logging.warning(f'nothing was profiled{f" (no steps named {sorted(self.steps)} ran)" if self.steps else ""}')
+            return
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        run = pstats.Stats()
+        for name, stats in self.stats.items():
+            filename = re.sub(r'[^\w.-]+', '_', name)
+            stats.dump_stats(self.directory / f'{filename}.pstats')
+            run.add(stats)
+        run.dump_stats(self.directory / 'run.pstats')
+
+        with (self.directory / 'stacks.collapsed').open('w', encoding='utf-8') as f:
+            for stack, count in sorted(self.samples.items()):
+                f.write(f'{stack} {count}\n')
+
+        summary = io.StringIO()
+        run.stream = summary # type: ignore
+        run.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(20)
+        logging.info(f'profile written to {self.directory}')
+        logging.debug(summary.getvalue())
+
+
+@contextmanager
+def profile_step(name:str) -> Iterator[None]:
+    """ profile the context as `name`, if a `Profiler` is active and selects it; within a profiled block, profile the context (on
+        whichever thread it runs) as part of that block """
+    profiler = _profiler.get()
+    if profiler is None:
+        yield
+        return
+
+    top_level = not _nested.get()
+    nested = _nested.set(True)
+    try:
+        if (enclosing := _enclosing.get()) is not None:
+            with profiler.profiling(enclosing):
+                yield
+        elif profiler.selects(name, top_level):
+            token = _enclosing.set(name)
+            try:
+                with profiler.profiling(name):
+                    yield
+            finally:
+                _enclosing.reset(token)
+        else:
+            yield
+    finally:
+        _nested.reset(nested)
+
+
+def profile_task(task:'asyncio.Task') -> None:
+    """ profile the event loop's thread until `task` is done, as part of the profiled block it was started from (if any);
+        call from the loop's thread, in the context the task was started in """
+    profiler = _profiler.get()
+    if profiler is None or (name := _enclosing.get()) is None:
+        return
+    if profiler.start(name):
+        task.add_done_callback(lambda _: profiler.stop(name))
@@ -0,0 +1,229 @@
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+#   Structured, per-step run reports                    #
+#                                                       #
+#   A `RunReport` is the root of a tree of              #
+#       `StepReport`s, one per `Step` executed          #
+#                                                       #
+#   Steps that nest other steps (`BatchProcessor`,      #
+#       `Retry`) open child reports with `measure`      #
+#                                                       #
+#   `measure` is a no-op unless a `RunReport`           #
+#       (or a `Profiler`) is active in the current      #
+#       context                                         #
+#                                                       #
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+
+# stdlib
+import json
+import sys
+import time
+import tracemalloc
+from collections.abc import Sized
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field, fields
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterator
+
+try:
+    import resource
+except ModuleNotFoundError:     # `resource` is unix-only
+    resource = None
+
+# first-party
+from process_framework.references.reference import Reference, _set_observer
+from process_framework.exceptions import EarlyEscape
+from process_framework.instrumentation.profile import profile_step
+
+
+# the innermost report in the current context; `None` if nothing is being recorded
+_current:ContextVar['StepReport|None'] = ContextVar('_current_report', default=None)
+
+
+def peak_rss() -> int|None:
+    """ the peak resident set size of this process in bytes, or None if it can't be determined """
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # linux reports KiB, macOS reports bytes
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def size_of(value:Any) -> list[int]|int|None:
+    """ a json-friendly size for `value`: its `shape` if it has one, else its `len` if `Sized` """
+    if value is None:
+        return None
+    if (shape := getattr(value, 'shape', None)) is not None:
+        return list(shape)
+    if not isinstance(value, str) and isinstance(value, Sized):
+        return len(value)
+    return None
+
+
+@dataclass
+class StepReport:
+    """ wall time, cpu time, memory and the sizes of references written for a single `Step` (or section) """
+    name:str
+    status:str = 'running'                      # running | completed | escaped | failed
+    wall_time:float = 0.
+    cpu_time:float = 0.                         # cpu time of the executing thread
+    peak_rss:int|None = None                    # process high-water mark after the step, bytes
+    tracemalloc_delta:int|None = None           # net traced allocation, bytes; only when tracemalloc is tracing
+    tracemalloc_peak:int|None = None            # peak traced allocation above the starting point, bytes
+    writes:dict[str, Any] = field(default_factory=dict)    # {reference: size} for references `set` by the step
+    metrics:dict[str, Any] = field(default_factory=dict)   # step-specific metrics (retries, batch sizes, etc.); see `record_metrics`
+    steps:list['StepReport'] = field(default_factory=list)
+
+    # bookkeeping, excluded from `to_dict`
+    _written:dict[int, Reference] = field(default_factory=dict, repr=False)
+    _peak:int = field(default=0, repr=False)
+
+
+    def _fold_peak(self, peak:int) -> None:
+        self._peak = max(self._peak, peak)
+
+
+    def to_dict(self) -> dict[str, Any]:
+        """ a json-serializable dict of this report and its nested reports """
+        result = {f.name:getattr(self, f.name) for f in fields(self) if not f.name.startswith('_')}
+        result['writes'] = dict(self.writes)
+        result['metrics'] = dict(self.metrics)
+        result['steps'] = [s.to_dict() for s in self.steps]
+        return result
+
+
+@dataclass
+class RunReport(StepReport):
+    """ the root `StepReport` for a single pipeline run """
+    name:str = 'pipeline'
+    started:str|None = None
+    finished:str|None = None
+    preflight:dict[str, Any]|None = None                    # the pipeline's `PreflightReport`
+    released:dict[str, Any] = field(default_factory=dict)  # {reference: {after: step, memory: bytes}} for references released after their last use
+    spilled:dict[str, Any] = field(default_factory=dict)   # {reference: {after: [step], memory: bytes, spills: n, loads: n}} for references spilled to disk
+
+    @contextmanager
+    def run(self) -> Iterator['RunReport']:
+        """ make this the active report for the duration of the context, timing the whole run """
+        self.started = datetime.now(timezone.utc).isoformat()
+        token = _current.set(self)
+        observer = _set_observer.set(_observe_set)
+        wall, cpu = time.perf_counter(), time.thread_time()
+        start_traced = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+        try:
+            yield self
+            if self.status == 'running':
+                self.status = 'completed'
+        except EarlyEscape:
+            self.status = 'escaped'
+            raise
+        except BaseException:
+            self.status = 'failed'
+            raise
+        finally:
+            self.wall_time = time.perf_counter() - wall
+            self.cpu_time = time.thread_time() - cpu
+            self.peak_rss = peak_rss()
+            if start_traced is not None and tracemalloc.is_tracing():
+                current, peak = tracemalloc.get_traced_memory()
+                self._fold_peak(peak)
+                self.tracemalloc_delta = current - start_traced
+                self.tracemalloc_peak = self._peak - start_traced
+            self.finished = datetime.now(timezone.utc).isoformat()
+            _set_observer.reset(observer)
+            _current.reset(token)
+
+
+    def dump(self, path:Path) -> None:
+        """ write this report to `path` as json """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2, default=str))
+
+
+def record_metrics(**metrics:Any) -> None:
+    """ add `metrics` to the innermost active report (usually that of the running step); a no-op if no report is active """
+    if (report := _current.get()) is not None:
+        report.metrics.update(metrics)
+
+
+def _observe_set(reference:Reference, value:Any) -> None:
+    """ record `reference` as written by the innermost active report """
+    if (report := _current.get()) is not None:
+        report._written.setdefault(id(reference), reference)
+
+
+def _reference_names(subject:object|None) -> dict[int, str]:
+    """ map the ids of `Reference` attributes of `subject` to their attribute names """
+    if subject is None:
+        return {}
+    try:
+        attributes = vars(subject)
+    except TypeError:
+        return {}
+    return {id(v):k for k, v in attributes.items() if isinstance(v, Reference)}
+
+
+@contextmanager
+def measure(name:str, subject:object|None=None) -> Iterator[StepReport|None]:
+    """ record a child `StepReport` named `name` under the active report for the duration of the context;
+        `subject` (usually the `Step`) is used to name the references written. a no-op if no report is active.
+        the context is also profiled if a `Profiler` is active and selects `name` """
+    with profile_step(name), _record(name, subject) as report:
+        yield report
+
+
+@contextmanager
+def _record(name:str, subject:object|None=None) -> Iterator[StepReport|None]:
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+
+    report = StepReport(name)
+    parent.steps.append(report)
+
+    # fold the parent's peak so far and start a fresh peak for this report
+    tracing = tracemalloc.is_tracing()
+    start_traced = 0
+    if tracing:
+        start_traced, peak = tracemalloc.get_traced_memory()
+        parent._fold_peak(peak)
+        tracemalloc.reset_peak()
+
+    token = _current.set(report)
+    wall, cpu = time.perf_counter(), time.thread_time()
+    try:
+        yield report
+        report.status = 'completed'
+    except EarlyEscape:
+        report.status = 'escaped'
+        raise
+    except BaseException:
+        report.status = 'failed'
+        raise
+    finally:
+        report.wall_time = time.perf_counter() - wall
+        report.cpu_time = time.thread_time() - cpu
+        report.peak_rss = peak_rss()
+
+        if tracing and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            report._fold_peak(peak)
+            report.tracemalloc_delta = current - start_traced
+            report.tracemalloc_peak = report._peak - start_traced
+            parent._fold_peak(report._peak)
+            tracemalloc.reset_peak()
+
+        names = _reference_names(subject)
+        for key, reference in report._written.items():
+            label = names.get(key) or type(reference).__name__
+            if label in report.writes:
+                label = f'{label}#{len(report.writes)}'
+            try:
+                report.writes[label] = size_of(reference.peek()) if reference.has_value() else None
+            except Exception:
+                report.writes[label] = None
+        report._written.clear()
+
+        _current.reset(token)
@@ -1,4 +1,7 @@
 from .clients import ClientsBase
 from .references import ReferencesBase
 from .settings import SettingsBase
-from .pipeline import load_json, sql_engine_from_config, PipelineBase
\ No newline at end of file
+from .scheduler import StepScheduler
+from .preflight import PreflightReport, run_preflight
+from .pipeline import load_json, sql_engine_from_config, PipelineBase
+from .daemon import Daemon, RunMetrics
\ No newline at end of file
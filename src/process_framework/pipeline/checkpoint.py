@@ -0,0 +1,217 @@
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+#   Checkpoint and resume `ReferencesBase` values       #
+#                                                       #
+#   After each completed step, the `Reference`s it      #
+#       wrote are persisted under a run directory       #
+#                                                       #
+#   DataFrame, Series and Index values go to Parquet    #
+#       (if pyarrow is available), else to pickle, as   #
+#       are those with list or dict values, which       #
+#       Parquet doesn't give back as they were          #
+#                                                       #
+#   A run directory is keyed on the step list (types    #
+#       and arguments) and the settings; change any     #
+#       and a resume starts from scratch                #
+#                                                       #
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+
+# stdlib
+import hashlib
+import json
+import logging
+import pickle
+import re
+import shutil
+import threading
+from dataclasses import fields, is_dataclass
+from enum import Enum
+from pathlib import Path
+from typing import Any
+
+# third-party (pandas is imported on first use)
+from pydantic import BaseModel
+
+# first-party
+from process_framework.references import Reference
+from process_framework.steps import Step
+from process_framework.pipeline.references import ReferencesBase
+from process_framework.references.reference import root_of
+
+MANIFEST = 'manifest.json'
+
+
+def get_checkpoint_key(steps:list[Step], settings:BaseModel) -> str:
+    """ a hash of the step list (types and arguments, in order) and the settings """
+    payload = json.dumps({
+        'steps':[describe(s) for s in steps],
+        'settings':settings.model_dump(mode='json'),
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def describe(value:Any) -> Any:
+    """ a JSON-able description of `value` that's the same in any process: steps by type and `get_arguments`, references by type only,
+        functions and classes by name, and anything else by its repr, without memory addresses """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, Step):
+        return {'type':_name(type(value)), 'arguments':describe(value.get_arguments())}
+    if isinstance(value, Reference):
+        return f'Reference[{value._type.__name__}]'
+    if isinstance(value, Enum):
+        return describe(value.value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode='json')
+    if isinstance(value, dict):
+        return {str(k):describe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [describe(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted((describe(v) for v in value), key=str)
+    if isinstance(value, type) or callable(value) and hasattr(value, '__qualname__'):
+        return _name(value)
+    if is_dataclass(value):
+        return {'type':_name(type(value)), **{f.name:describe(getattr(value, f.name)) for f in fields(value)}}
+    return re.sub(r' at 0x[0-9a-fA-F]+', '', repr(value))
+
+
+def _name(value:Any) -> str:
+    return f'{getattr(value, "__module__", "")}.{value.__qualname__}'
+
+
+# values Parquet doesn't round trip: lists (and tuples and sets) come back as arrays, dicts with the keys of every dict in the column
+_NESTED = (list, tuple, set, dict)
+
+
+def save_value(value:Any, path:Path) -> dict[str, Any]:
+    """ write `value` to `path` (without suffix); return a description of how it was written """
+    from pandas import DataFrame, Series, Index
+    try:
+        if isinstance(value, (DataFrame, Series, Index)) and _has_nested(value):
+            raise ValueError('list or dict values')
+
+        if isinstance(value, DataFrame):
+            value.to_parquet(path.with_suffix('.parquet'))
+            return {'format':'parquet', 'kind':'DataFrame'}
+
+        if isinstance(value, Series) and isinstance(value.name, (str, int, float, type(None))):
+            value.to_frame(name='value').to_parquet(path.with_suffix('.parquet'))
+            return {'format':'parquet', 'kind':'Series', 'name':value.name}
+
+        if isinstance(value, Index):
+            DataFrame(index=value).to_parquet(path.with_suffix('.parquet'))
+            return {'format':'parquet', 'kind':'Index'}
+
+    except Exception as e:
+        # no pyarrow, non-string column names, mixed object columns etc.
+        logging.debug(f'could not write {path.name} as parquet ({e}), falling back to pickle')
+        path.with_suffix('.parquet').unlink(missing_ok=True)
+
+    with path.with_suffix('.pickle').open('wb') as f:
+        pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return {'format':'pickle'}
+
+
+def _has_nested(value:Any) -> bool:
+    """ whether any object column (or index) of `value`, a DataFrame, Series or Index, holds a list, tuple, set or dict """
+    from pandas import DataFrame, Series
+    from pandas.api.types import infer_dtype
+    columns = [c for _, c in value.items()] if isinstance(value, DataFrame) else [value]
+    if isinstance(value, (DataFrame, Series)):
+        columns.append(value.index)
+    return any(
+        column.dtype == object and infer_dtype(column, skipna=True) not in ('string', 'empty')
+        and any(isinstance(v, _NESTED) for v in column)
+        for column in columns
+    )
+
+
+def load_value(path:Path, meta:dict[str, Any]) -> Any:
+    """ read a value written by `save_value` """
+    if meta['format'] == 'pickle':
+        with path.with_suffix('.pickle').open('rb') as f:
+            return pickle.load(f)
+
+    from pandas import read_parquet
+    df = read_parquet(path.with_suffix('.parquet'))
+    match meta['kind']:
+        case 'DataFrame':
+            return df
+        case 'Series':
+            return df['value'].rename(meta['name'])
+        case 'Index':
+            return df.index
+    raise ValueError(f'unexpected checkpoint kind {meta["kind"]}')
+
+
+class Checkpoint:
+    """ persists the values of `refs` after each completed step under `directory / key`, and restores them on resume """
+    def __init__(self, directory:Path, key:str, refs:ReferencesBase) -> None:
+        self.path = directory / key[:16]
+        self.key = key
+        self.refs = refs
+        self.completed:set[int] = set()
+        self.values:dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+        # map the ids of root references to `refs` field names; derived references are saved with their `df`
+        self._names = {
+            id(value):f.name for f in fields(refs)
+            if isinstance(value := getattr(refs, f.name), Reference) and root_of(value) is value
+        }
+
+
+    def resume(self) -> set[int]:
+        """ restore reference values from a previous, failed run with the same key; return the indices of completed steps """
+        manifest_path = self.path / MANIFEST
+        if not manifest_path.exists():
+            logging.info(f'no checkpoint at {self.path}; starting from scratch')
+            return set()
+
+        manifest = json.loads(manifest_path.read_text())
+        if manifest.get('key') != self.key:
+            logging.info(f'checkpoint at {self.path} is for a different step list or settings; starting from scratch')
+            return set()
+
+        for name, meta in manifest['values'].items():
+            reference:Reference = getattr(self.refs, name)
+            reference.set(load_value(self.path / name, meta))
+            logging.info(f'  restored {name}: {reference}')
+
+        self.completed = set(manifest['completed'])
+        self.values = manifest['values']
+        logging.info(f'resuming from checkpoint at {self.path}; skipping steps {sorted(self.completed)}')
+        return set(self.completed)
+
+
+    def save(self, i:int, step:Step) -> None:
+        """ persist the references written by step `i`, then mark it complete """
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        names = {self._names[key] for r in step.get_writes() if (key := id(root_of(r))) in self._names}
+        for name in sorted(names):
+            reference:Reference = getattr(self.refs, name)
+            for stale in self.path.glob(f'{name}.*'):
+                stale.unlink()
+            if reference.has_value():
+                meta = save_value(reference.get_value(), self.path / name)
+            else:
+                meta = None
+            with self._lock:
+                if meta is None:
+                    self.values.pop(name, None)
+                else:
+                    self.values[name] = meta
+
+        with self._lock:
+            self.completed.add(i)
+            manifest = {'key':self.key, 'completed':sorted(self.completed), 'values':self.values}
+            # write-then-rename so a crash mid-write leaves the previous manifest intact
+            temp = self.path / f'{MANIFEST}.tmp'
+            temp.write_text(json.dumps(manifest, indent=2, default=str))
+            temp.replace(self.path / MANIFEST)
+
+
+    def clear(self) -> None:
+        """ remove the run directory; called once a run completes """
+        shutil.rmtree(self.path, ignore_errors=True)
@@ -16,12 +16,16 @@
 from argparse import ArgumentParser, Namespace
 import logging
 import sys
+import tracemalloc
 from logging.handlers import RotatingFileHandler
 from logging import Logger
 from process_framework.pipeline import PipelineBase
+from process_framework.pipeline.daemon import Daemon
+from process_framework.instrumentation import Profiler
 from pathlib import Path
 from typing import Sequence
 from abc import ABC, abstractmethod
+from contextlib import nullcontext
 
 class CliBase[TPipeline:PipelineBase](ABC):
     
@@ -39,10 +43,55 @@ class CliBase[TPipeline:PipelineBase](ABC):
         logger = logging.getLogger()
         self.configure_logging(args, logger)
 
+        # trace python allocations per step if requested; this is comparatively expensive
+        if args.trace_memory:
+            tracemalloc.start()
+
+        # turn on pandas copy-on-write before any frames are made; lets `BatchProcessDataFrame(views=True)` hand out views
+        if args.copy_on_write:
+            import pandas
+            pandas.set_option('mode.copy_on_write', True)
+
         # init pipeline
         pipeline = self.initialize_pipeline(argsv)
+        if args.max_workers:
+            pipeline.max_workers = args.max_workers
+        if isinstance(args.checkpoint_dir, Path):
+            pipeline.checkpoint_dir = args.checkpoint_dir
+            pipeline.resume = args.resume
+        elif args.resume:
+            logging.warning('`--resume` has no effect without `--checkpoint-dir`')
+        if args.release_references:
+            pipeline.release_references = True
+        if args.memory_budget is not None:
+            pipeline.memory_budget = int(args.memory_budget * 2**20)
+            if isinstance(args.spill_dir, Path):
+                pipeline.spill_dir = args.spill_dir
+        elif args.spill_dir:
+            logging.warning('`--spill-dir` has no effect without `--memory-budget`')
         pipeline.log_steps()
-        pipeline.do()
+
+        # profile the run, or only the steps named, if requested
+        profiler = None
+        if args.profile or args.profile_step:
+            profiler = Profiler(args.profile_dir, args.profile_step or ())
+
+        with profiler.run() if profiler is not None else nullcontext():
+            # keep the pipeline (and its clients) alive, re-running it on an interval or trigger
+            if args.daemon:
+                run = pipeline.do_async if args.run_async else pipeline.do
+                daemon = Daemon(pipeline, run, args.interval, args.max_runs, args.metrics_file, args.report_file)
+                return daemon.serve()
+
+            try:
+                if args.run_async:
+                    pipeline.do_async()
+                else:
+                    pipeline.do()
+            finally:
+                # write the run report, even if the run failed
+                if isinstance(args.report_file, Path) and pipeline.report is not None:
+                    pipeline.report.dump(args.report_file)
         return 0
     
         
@@ -108,4 +157,42 @@ class CliBase[TPipeline:PipelineBase](ABC):
                         help='Max bytes before size rotation')
         parser.add_argument('--log-backup-count', type=int, default=10,
                         help='How many rotated files to keep')
+        # instrumentation
+        parser.add_argument('--report-file', type=Path, default=None,
+                        help='Path to write a json run report of per-step timings and memory (disabled if omitted)')
+        parser.add_argument('--trace-memory', action='store_true', default=False,
+                        help='Record per-step tracemalloc deltas and peaks in the run report (slow)')
+        parser.add_argument('--profile', action='store_true', default=False,
+                        help='Profile every step of the run, writing pstats files and collapsed stacks to --profile-dir')
+        parser.add_argument('--profile-step', action='append', default=None, metavar='NAME',
+                        help='Profile only steps of this type (including steps nested in `BatchProcessor`s); repeatable')
+        parser.add_argument('--profile-dir', type=Path, default=Path('profile'),
+                        help='Directory to write profiles to')
+        # scheduling
+        parser.add_argument('--max-workers', type=int, default=None,
+                        help='Run independent steps concurrently on this many threads (in order if omitted)')
+        parser.add_argument('--async', dest='run_async', action='store_true', default=False,
+                        help='Run the pipeline on an event loop, awaiting `AsyncStep`s and offloading other steps to threads')
+        parser.add_argument('--release-references', action='store_true', default=False,
+                        help='Release each reference once the last step using it completes, to reduce peak memory')
+        parser.add_argument('--memory-budget', type=float, default=None, metavar='MIB',
+                        help='Spill the least recently used references to disk whenever they hold more than this many MiB (disabled if omitted)')
+        parser.add_argument('--spill-dir', type=Path, default=None,
+                        help='Directory to spill references to (a temporary directory if omitted)')
+        parser.add_argument('--copy-on-write', action='store_true', default=False,
+                        help='Enable pandas copy-on-write, so batches of `BatchProcessDataFrame(views=True)` are views, copied only when written')
+        # checkpointing
+        parser.add_argument('--checkpoint-dir', type=Path, default=None,
+                        help='Persist reference values after each step under this directory (disabled if omitted)')
+        parser.add_argument('--resume', action='store_true', default=False,
+                        help='Restore reference values from --checkpoint-dir and skip steps completed by a failed run')
+        # daemon
+        parser.add_argument('--daemon', action='store_true', default=False,
+                        help='Keep running, re-running the pipeline every --daemon-interval seconds and/or on SIGUSR1, with warm clients')
+        parser.add_argument('--daemon-interval', dest='interval', type=float, default=None,
+                        help='Seconds between the starts of runs in --daemon mode (run only on SIGUSR1 if omitted)')
+        parser.add_argument('--daemon-max-runs', dest='max_runs', type=int, default=None,
+                        help='Stop --daemon mode after this many runs (run until SIGINT/SIGTERM if omitted)')
+        parser.add_argument('--metrics-file', type=Path, default=None,
+                        help='Path to append a json line of metrics to after each run in --daemon mode (disabled if omitted)')
     
\ No newline at end of file
@@ -0,0 +1,185 @@
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+#   Keep a pipeline alive and re-run it                 #
+#                                                       #
+#   Settings, clients (and their connection pools)      #
+#       and steps are initialized once                  #
+#                                                       #
+#   Runs start every `interval` seconds, and/or         #
+#       when triggered (`trigger`, or SIGUSR1)          #
+#                                                       #
+#   Before each re-run only cheap (connectivity)        #
+#       preflight checks are re-made; after each run    #
+#       references are reset to their initial values    #
+#                                                       #
+#   Per-run metrics are kept, logged, and optionally    #
+#       appended to a json lines file                   #
+#                                                       #
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+
+# stdlib
+import json
+import logging
+import signal
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+# first-party
+from process_framework.pipeline.pipeline import PipelineBase
+
+
+@dataclass
+class RunMetrics:
+    """ a summary of a single run of a long-lived pipeline """
+    run:int
+    started:str
+    status:str = 'running'              # running | completed | escaped | failed
+    wall_time:float = 0.                # including preflight
+    preflight_time:float = 0.           # cheap preflight checks made before the run
+    cpu_time:float|None = None
+    peak_rss:int|None = None
+    error:str|None = None
+    steps:dict[str, float] = field(default_factory=dict)    # {step: wall_time}
+
+    def to_dict(self) -> dict[str, Any]:
+        return dict(vars(self))
+
+
+class Daemon:
+    """ run `pipeline` (with `run`, `pipeline.do` by default) every `interval` seconds and/or when triggered,
+        until stopped or `max_runs` runs have started """
+    def __init__(self,
+                 pipeline:PipelineBase,
+                 run:Callable[[], Any]|None=None,
+                 interval:float|None=None,
+                 max_runs:int|None=None,
+                 metrics_file:Path|None=None,
+                 report_file:Path|None=None,
+                 history:int=100) -> None:
+        self.pipeline = pipeline
+        self.run = run or pipeline.do
+        self.interval = interval
+        self.max_runs = max_runs
+        self.metrics_file = metrics_file
+        self.report_file = report_file
+        # the metrics of the most recent `history` runs
+        self.metrics:deque[RunMetrics] = deque(maxlen=history)
+        self.runs = 0
+        self._trigger = threading.Event()
+        self._stopping = threading.Event()
+
+
+    def trigger(self) -> None:
+        """ start a run now, or as soon as the current run completes """
+        self._trigger.set()
+
+
+    def stop(self) -> None:
+        """ stop once the current run (if any) completes """
+        self._stopping.set()
+        self._trigger.set()
+
+
+    def serve(self) -> int:
+        """ run until stopped; return 0 """
+        if self.interval is None:
+            logging.info('daemon started; running on SIGUSR1 or `trigger`')
+        else:
+            logging.info(f'daemon started; running every {self.interval}s')
+
+        with self.signals():
+            while not self._stopping.is_set():
+                start = time.monotonic()
+                self.runs += 1
+                self.run_once(self.runs)
+
+                if self.max_runs is not None and self.runs >= self.max_runs:
+                    break
+
+                # wait for the next interval (runs that overrun start the next at once) or a trigger
+                timeout = None if self.interval is None else max(0., start + self.interval - time.monotonic())
+                self._trigger.wait(timeout)
+                self._trigger.clear()
+
+        logging.info(f'daemon stopped after {self.runs} runs')
+        return 0
+
+
+    def run_once(self, i:int) -> RunMetrics:
+        """ make cheap preflight checks (unless this is the first run), run the pipeline, record its metrics and reset its references """
+        metrics = RunMetrics(i, datetime.now(timezone.utc).isoformat())
+        previous = self.pipeline.report
+        start = time.perf_counter()
+        try:
+            if i > 1:
+                self.pipeline.clients.preflight()
+                self.pipeline.preflight(cheap_only=True)
+                metrics.preflight_time = time.perf_counter() - start
+            self.run()
+            metrics.status = 'completed'
+        except Exception as e:
+            logging.exception(f'run {i} failed')
+            metrics.status = 'failed'
+            metrics.error = f'{type(e).__name__}: {e}'
+        metrics.wall_time = time.perf_counter() - start
+
+        if (report := self.pipeline.report) is not None and report is not previous:
+            metrics.status = report.status
+            metrics.cpu_time = report.cpu_time
+            metrics.peak_rss = report.peak_rss
+            metrics.steps = {s.name:s.wall_time for s in report.steps}
+            if self.report_file is not None:
+                report.dump(self.report_file)
+
+        self.record(metrics)
+
+        try:
+            self.pipeline.reset()
+        except Exception:
+            logging.exception(f'could not reset references after run {i}; stopping')
+            self.stop()
+
+        return metrics
+
+
+    def record(self, metrics:RunMetrics) -> None:
+        """ keep, log and (optionally) append `metrics` to `metrics_file` """
+        self.metrics.append(metrics)
+        logging.info(f'run {metrics.run} {metrics.status} in {metrics.wall_time:.2f}s (preflight {metrics.preflight_time:.2f}s)')
+        if self.metrics_file is not None:
+            self.metrics_file.parent.mkdir(parents=True, exist_ok=True)
+            with self.metrics_file.open('a', encoding='utf-8') as f:
+                f.write(json.dumps(metrics.to_dict(), default=str) + '\n')
+
+
+    @contextmanager
+    def signals(self) -> Iterator[None]:
+        """ stop on SIGINT/SIGTERM (twice to interrupt a run), and run on SIGUSR1 (where available); only from the main thread """
+        if threading.current_thread() is not threading.main_thread():
+            yield
+            return
+
+        def on_stop(signum, frame) -> None:
+            if self._stopping.is_set():
+                raise KeyboardInterrupt
+            logging.info(f'received {signal.Signals(signum).name}; stopping after the current run')
+            self.stop()
+
+        def on_trigger(signum, frame) -> None:
+            self.trigger()
+
+        handlers:dict[int, Any] = {signal.SIGINT:on_stop, signal.SIGTERM:on_stop}
+        if (sigusr1 := getattr(signal, 'SIGUSR1', None)) is not None:
+            handlers[sigusr1] = on_trigger
+
+        previous = {signum:signal.signal(signum, handler) for signum, handler in handlers.items()}
+        try:
+            yield
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
\ No newline at end of file
@@ -9,23 +9,38 @@
 #   Pipelines can take CLI args                         #
 #       if their settings are configured to read them   #
 #                                                       #
+#   `do` runs the steps synchronously; `ado` awaits     #
+#       `AsyncStep`s and offloads other steps to        #
+#       threads                                         #
+#                                                       #
 # """"""""""""""""""""""""""""""""""""""""""""""""""""" #
 
 # stdlib
+import asyncio
 import json
 import logging
 from pathlib import Path
 from abc import abstractmethod, ABC
+from contextlib import contextmanager
+from typing import Iterator, TYPE_CHECKING
 
-# third-party
-from sqlalchemy import URL, Engine, create_engine
+# third-party (sqlalchemy is optional; only `sql_engine_from_config` needs it)
+if TYPE_CHECKING:
+    from sqlalchemy import Engine
 
 # first-party (process_framework / process)
 from process_framework import Step
+from process_framework.steps.async_step import AsyncStep, run_coroutine
 from process_framework.pipeline.clients import ClientsBase
 from process_framework.pipeline.references import ReferencesBase
 from process_framework.pipeline.settings import SettingsBase
+from process_framework.pipeline.scheduler import StepScheduler
+from process_framework.pipeline.checkpoint import Checkpoint, get_checkpoint_key
+from process_framework.pipeline.release import ReferenceReleaser
+from process_framework.pipeline.spill import ReferenceSpiller
+from process_framework.pipeline.preflight import PreflightReport, run_preflight
 from process_framework.exceptions import EarlyEscape
+from process_framework.instrumentation import RunReport, measure
 
 
 def load_json(path:Path) -> dict:
@@ -33,8 +48,9 @@ def load_json(path:Path) -> dict:
     return json.loads(path.read_text())
 
 
-def sql_engine_from_config(path:Path) -> Engine:
+def sql_engine_from_config(path:Path) -> 'Engine':
     """ construct a sqlalchemy Engine from a json file at `path` """
+    from sqlalchemy import URL, create_engine
     return create_engine(
         url=URL.create(**load_json(path))
     )
@@ -43,8 +59,36 @@ def sql_engine_from_config(path:Path) -> Engine:
 class PipelineBase[TSettings:SettingsBase, TReferences:ReferencesBase, TClients:ClientsBase](ABC):
     """ base class for Pipelines """
 
+    # if set, run independent steps concurrently on a pool of `max_workers` threads (see `StepScheduler`)
+    max_workers:int|None = None
+
+    # if set, persist reference values after each step under `checkpoint_dir`; if `resume`, restore them and skip completed steps
+    checkpoint_dir:Path|None = None
+    resume:bool = False
+
+    # if set, release (`set(None)`) each `ReferencesBase` field once the last step using it completes, except `pinned_references`
+    release_references:bool = False
+    pinned_references:tuple[str, ...] = ()
+
+    # if set, spill the least recently used `ReferencesBase` fields to `spill_dir` (a temporary directory by default) whenever they hold
+    # more than `memory_budget` bytes, loading them back when a step uses them; `pinned_references` are never spilled
+    memory_budget:int|None = None
+    spill_dir:Path|None = None
+
+    # the number of distinct preflight checks made at once
+    preflight_workers:int = 8
+
     def __init__(self, argsv=None) -> None:
         logging.info('initializing pipeline')
+
+        # the `RunReport` of the most recent call to `do`
+        self.report:RunReport|None = None
+        self.checkpoint:Checkpoint|None = None
+        # the checkpoint key, computed before the first run, as steps' attributes can hold run state afterwards
+        self.checkpoint_key:str|None = None
+        self.releaser:ReferenceReleaser|None = None
+        self.spiller:ReferenceSpiller|None = None
+        self.preflight_report:PreflightReport|None = None
         
         logging.info('  initializing settings')
         self.settings = self.initialize_settings(argsv)
@@ -52,6 +96,8 @@ class PipelineBase[TSettings:SettingsBase, TReferences:ReferencesBase, TClients:
         logging.info('  initializing references')
         self.refs = self.initialize_references(self.settings)
         self.refs.preflight()
+        # the initial reference values, restored by `reset` before re-running a long-lived pipeline
+        self.initial_values = self.refs.snapshot()
 
         logging.info('  initializing clients')
         self.clients = self.initialize_clients(self.settings)
@@ -94,26 +140,202 @@ class PipelineBase[TSettings:SettingsBase, TReferences:ReferencesBase, TClients:
         ...
        
         
-    def preflight(self) -> None:
-        """ make steps' preflight assertions """
-        for step in self.steps:
-            step.preflight()
+    def preflight(self, cheap_only:bool=False) -> None:
+        """ make steps' preflight assertions; identical checks (same client and target) are made once, concurrently.
+            if `cheap_only`, make only connectivity checks (see `PreflightCheck.cheap`) """
+        self.preflight_report = run_preflight(self.steps, self.preflight_workers, cheap_only)
 
 
-    def do(self):
-        """ execute the pipeline by iterating through its steps and doing them, detecting and handling any managed `EarlyEscape`s"""
-        logging.info(f"Pipeline started")
-        for step in self.steps:
-            logging.info(type(step).__name__)
+    def reset(self) -> None:
+        """ restore references to their initial values, so the pipeline can be run again; settings, clients and steps are kept """
+        self.refs.restore(self.initial_values)
+        self.refs.preflight()
+
+
+    def initialize_checkpoint(self) -> Checkpoint|None:
+        """ get a `Checkpoint` keyed on the steps (types and arguments) and settings, if `checkpoint_dir` is set """
+        if self.checkpoint_dir is None:
+            return None
+        if self.checkpoint_key is None:
+            self.checkpoint_key = get_checkpoint_key(self.steps, self.settings)
+        return Checkpoint(self.checkpoint_dir, self.checkpoint_key, self.refs)
+
+
+    def initialize_releaser(self, skip:set[int]) -> ReferenceReleaser|None:
+        """ get a `ReferenceReleaser` for the steps that will run, if `release_references` is set """
+        if not self.release_references:
+            return None
+        releaser = ReferenceReleaser(self.steps, self.refs, self.pinned_references, skip)
+        releaser.log_last_uses()
+        return releaser
+
+
+    def initialize_spiller(self) -> ReferenceSpiller|None:
+        """ get a `ReferenceSpiller` for the steps, if `memory_budget` is set """
+        if self.memory_budget is None:
+            return None
+        return ReferenceSpiller(self.steps, self.refs, self.memory_budget, self.spill_dir, self.pinned_references)
+
+
+    @contextmanager
+    def running(self) -> Iterator[set[int]]:
+        """ record a run to `self.report` and manage its checkpoint; yields the indices of steps to skip """
+        self.report = RunReport()
+        if self.preflight_report is not None:
+            self.report.preflight = self.preflight_report.to_dict()
+        self.checkpoint = self.initialize_checkpoint()
+        with self.report.run():
+            logging.info(f"Pipeline started")
+
+            skip:set[int] = set()
+            if self.checkpoint is not None:
+                if self.resume:
+                    with measure('resume'):
+                        skip = self.checkpoint.resume()
+                else:
+                    self.checkpoint.clear()
+
+            self.releaser = self.initialize_releaser(skip)
+            self.spiller = self.initialize_spiller()
+
             try:
+                yield skip
+            finally:
+                # spilled references are loaded back, so they outlive their spill files
+                if self.spiller is not None:
+                    self.spiller.clear()
+                    self.report.spilled = self.spiller.spilled
+
+            if self.releaser is not None:
+                self.report.released = self.releaser.released
+
+        # the run finished, or escaped by design; a checkpoint is only needed to resume a failed run
+        if self.checkpoint is not None:
+            self.checkpoint.clear()
+
+
+    def end_run(self, completed:bool) -> None:
+        if completed:
+            logging.info(f"Pipeline completed")
+        elif self.report is not None:
+            self.report.status = 'escaped'
+
+
+    def do(self):
+        """ execute the pipeline by iterating through its steps and doing them, detecting and handling any managed `EarlyEscape`s;
+            per-step timings, memory and written reference sizes are recorded to `self.report` """
+        with self.running() as skip:
+            self.end_run(self.do_steps(skip))
+
+
+    def do_steps(self, skip:set[int]) -> bool:
+        """ do each step, except those in `skip`, in order or using a `StepScheduler`; return False if a step escaped early """
+        if self.max_workers:
+            scheduler = StepScheduler(self.steps, self.do_step, self.max_workers)
+            scheduler.log_dependencies()
+            return scheduler.run(skip)
+
+        for i, step in enumerate(self.steps):
+            if i in skip:
+                logging.info(f'{type(step).__name__} (completed in a previous run, skipping)')
+                continue
+            if not self.do_step(i, step):
+                return False
+        return True
+
+
+    def do_step(self, i:int, step:Step) -> bool:
+        """ do the `i`th `step`, recording it to the active report and checkpoint; return False if the step raised an `EarlyEscape` """
+        name = type(step).__name__
+        logging.info(name)
+        self.before_step(i, step)
+        try:
+            with measure(name, step) as report:
                 step.do()
-            except EarlyEscape as e:
-                logging.info(f"Pipeline terminated early on `Step` {type(step).__name__} with `EarlyEscape` exception {e}")
-                return
-            
-        logging.info(f"Pipeline completed")
+        except EarlyEscape as e:
+            logging.info(f"Pipeline terminated early on `Step` {name} with `EarlyEscape` exception {e}")
+            return False
+
+        if report is not None:
+            logging.info(f'  {name} completed in {report.wall_time:.2f}s (cpu {report.cpu_time:.2f}s)')
+
+        self.after_step(i, step)
+        return True
+
+
+    def before_step(self, i:int, step:Step) -> None:
+        """ load back any spilled references the `i`th `step` uses """
+        if self.spiller is not None:
+            self.spiller.before_step(i, step)
+
+
+    def after_step(self, i:int, step:Step) -> None:
+        """ checkpoint the references the `i`th `step` wrote, release any it was the last user of, then spill any over the memory budget """
+        if self.checkpoint is not None:
+            self.checkpoint.save(i, step)
+
+        if self.releaser is not None:
+            self.releaser.release_after(i, step)
+
+        if self.spiller is not None:
+            self.spiller.after_step(i, step)
+
+
+    async def ado(self):
+        """ as `do`, but `AsyncStep`s are awaited and other steps are offloaded to threads;
+            await this on the framework's event loop (see `do_async`), which async clients are bound to """
+        with self.running() as skip:
+            self.end_run(await self.ado_steps(skip))
+
+
+    def do_async(self):
+        """ run `ado` to completion on the framework's event loop """
+        run_coroutine(self.ado())
+
+
+    async def ado_steps(self, skip:set[int]) -> bool:
+        """ as `do_steps`, using `StepScheduler.arun` """
+        if self.max_workers:
+            scheduler = StepScheduler(self.steps, self.ado_step, self.max_workers)
+            scheduler.log_dependencies()
+            return await scheduler.arun(skip)
+
+        for i, step in enumerate(self.steps):
+            if i in skip:
+                logging.info(f'{type(step).__name__} (completed in a previous run, skipping)')
+                continue
+            if not await self.ado_step(i, step):
+                return False
+        return True
+
+
+    async def ado_step(self, i:int, step:Step) -> bool:
+        """ as `do_step`; awaits `AsyncStep.ado`, or runs `Step.do` in a thread """
+        name = type(step).__name__
+        logging.info(name)
+        await asyncio.to_thread(self.before_step, i, step)
+        try:
+            with measure(name, step) as report:
+                if isinstance(step, AsyncStep):
+                    await step.ado()
+                else:
+                    await asyncio.to_thread(step.do)
+        except EarlyEscape as e:
+            logging.info(f"Pipeline terminated early on `Step` {name} with `EarlyEscape` exception {e}")
+            return False
+
+        if report is not None:
+            logging.info(f'  {name} completed in {report.wall_time:.2f}s')
+
+        await asyncio.to_thread(self.after_step, i, step)
+        return True
 
 
     def log_steps(self):
+        """ log each step, and (at DEBUG) a bounded-cost summary of each of its references """
+        debug = logging.getLogger().isEnabledFor(logging.DEBUG)
         for i, step in enumerate(self.steps):
-            logging.info(f'{i}\t{type(step).__name__}')
\ No newline at end of file
+            logging.info(f'{i}\t{type(step).__name__}')
+            if debug:
+                for name, reference in step.get_references().items():
+                    logging.debug(f'\t  {name}: {reference!r}')
\ No newline at end of file
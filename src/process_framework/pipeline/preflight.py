@@ -0,0 +1,106 @@
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+#   A concurrent, deduplicating preflight engine        #
+#                                                       #
+#   Steps describe their preflight assertions as        #
+#       keyed `PreflightCheck`s                         #
+#                                                       #
+#   Checks with equal keys (the same client and         #
+#       target) are made once, however many steps       #
+#       share them                                      #
+#                                                       #
+#   The remaining checks run concurrently on a          #
+#       thread pool, and are timed                      #
+#                                                       #
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+
+# stdlib
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Hashable
+
+# first-party
+from process_framework.steps import Step
+from process_framework.steps.preflight import PreflightCheck
+
+
+@dataclass
+class PreflightResult:
+    """ the outcome and timing of a single, deduplicated, `PreflightCheck` """
+    description:str
+    steps:list[str]
+    wall_time:float = 0.
+    error:str|None = None
+
+
+@dataclass
+class PreflightReport:
+    """ a timing breakdown of a pipeline's preflight """
+    wall_time:float = 0.
+    requested:int = 0       # checks requested by steps
+    made:int = 0            # checks made, after deduplication
+    results:list[PreflightResult] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            'wall_time':self.wall_time,
+            'requested':self.requested,
+            'made':self.made,
+            'results':[vars(r) for r in self.results]
+        }
+
+
+def collect_checks(steps:list[Step], cheap_only:bool=False) -> tuple[dict[Hashable, PreflightCheck], dict[Hashable, list[str]], int]:
+    """ get the unique checks for `steps` (only `cheap` ones if `cheap_only`), in order, the steps requesting each, and the number of checks requested """
+    checks:dict[Hashable, PreflightCheck] = {}
+    requested_by:dict[Hashable, list[str]] = {}
+    requested = 0
+    for i, step in enumerate(steps):
+        for check in step.get_preflight_checks():
+            if cheap_only and not check.cheap:
+                continue
+            requested += 1
+            checks.setdefault(check.key, check)
+            requested_by.setdefault(check.key, []).append(f'{i} {type(step).__name__}')
+    return checks, requested_by, requested
+
+
+def run_preflight(steps:list[Step], max_workers:int=8, cheap_only:bool=False) -> PreflightReport:
+    """ make each unique preflight check of `steps` once, up to `max_workers` at a time;
+        once every check has completed, raise the error of the first (in step order) that failed.
+        if `cheap_only`, make only `cheap` (connectivity) checks, as before each run of a long-lived pipeline """
+    start = time.perf_counter()
+    checks, requested_by, requested = collect_checks(steps, cheap_only)
+    report = PreflightReport(requested=requested, made=len(checks))
+
+    def make(key:Hashable) -> tuple[PreflightResult, BaseException|None]:
+        check = checks[key]
+        result = PreflightResult(check.description or str(key), requested_by[key])
+        t = time.perf_counter()
+        try:
+            check()
+            error = None
+        except Exception as e:
+            result.error = f'{type(e).__name__}: {e}'
+            error = e
+        result.wall_time = time.perf_counter() - t
+        return result, error
+
+    with ThreadPoolExecutor(max(1, max_workers), thread_name_prefix='preflight') as pool:
+        outcomes = list(pool.map(make, checks))
+
+    report.results = [result for result, _ in outcomes]
+    report.wall_time = time.perf_counter() - start
+
+    logging.info(f'  preflight: {report.made} checks made ({report.requested} requested) in {report.wall_time:.2f}s')
+    for result in report.results:
+        logging.debug(f'    {result.wall_time:.3f}s\t{result.description} ({len(result.steps)} steps){" FAILED" if result.error else ""}')
+
+    failed = [(result, error) for result, error in outcomes if error is not None]
+    for result, _ in failed:
+        logging.error(f'preflight check {result.description} failed for steps {result.steps}: {result.error}')
+    if failed:
+        raise failed[0][1]
+
+    return report
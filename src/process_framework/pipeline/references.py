@@ -1,6 +1,11 @@
 # stdlib
 from abc import ABC
+from copy import deepcopy
 from dataclasses import dataclass, fields
+from typing import Any
+
+# first-party
+from process_framework.references import Reference
 
 
 @dataclass
@@ -10,3 +15,26 @@ class ReferencesBase(ABC):
         for field in fields(self):
             if getattr(self, field.name) is None:
                 raise ValueError(f"Required reference {field} is not assigned")
+
+
+    def get_roots(self) -> dict[str, Reference]:
+        """ get the `Reference` fields that own their value, by name; `ColumnReference`s and `IndexReference`s are views of their `df` """
+        return {
+            field.name:value for field in fields(self)
+            if isinstance(value := getattr(self, field.name), Reference) and not isinstance(getattr(value, 'df', None), Reference)
+        }
+
+
+    def snapshot(self) -> dict[str, tuple[Any, int]]:
+        """ get a (deep) copy of the value of each root `Reference`, with its version """
+        return {name:(deepcopy(reference.get_value() if reference.has_value() else None), reference.version) for name, reference in self.get_roots().items()}
+
+
+    def restore(self, values:dict[str, tuple[Any, int]]) -> None:
+        """ set each root `Reference` to a (deep) copy of its value in `values` (a `snapshot`); references not in `values` are set to None.
+            a restored reference takes back the version it had when the snapshot was taken, as its value is the same """
+        for name, reference in self.get_roots().items():
+            value, version = values.get(name, (None, None))
+            reference.set(deepcopy(value))
+            if version is not None:
+                reference.version = version
\ No newline at end of file
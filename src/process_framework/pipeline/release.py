@@ -0,0 +1,70 @@
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+#   Release `Reference`s after their last use           #
+#                                                       #
+#   Each `ReferencesBase` field is released             #
+#       (`set(None)`) once every step that reads        #
+#       or writes it has completed                      #
+#                                                       #
+#   This holds in order and with the concurrent         #
+#       scheduler; pinned fields are never released     #
+#                                                       #
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+
+# stdlib
+import logging
+import threading
+from dataclasses import fields
+from typing import Any, Iterable
+
+# first-party
+from process_framework.references import Reference
+from process_framework.steps import Step
+from process_framework.pipeline.references import ReferencesBase
+from process_framework.references.reference import root_of
+
+
+class ReferenceReleaser:
+    """ tracks the steps that use each field of `refs` (as `get_reads` or `get_writes` report it), releasing a field once they have all
+        completed """
+    def __init__(self, steps:list[Step], refs:ReferencesBase, pinned:Iterable[str]=(), skip:Iterable[int]=()) -> None:
+        self.refs = refs
+        self.released:dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+        # only root references (not `ColumnReference`s etc.) hold values
+        names = {
+            id(value):f.name for f in fields(refs)
+            if f.name not in pinned
+            and isinstance(value := getattr(refs, f.name), Reference) and root_of(value) is value
+        }
+
+        skip = set(skip)
+        self.users:dict[str, set[int]] = {}
+        for i, step in enumerate(steps):
+            if i in skip:
+                continue
+            for reference in (*step.get_reads(), *step.get_writes()):
+                if (name := names.get(id(root_of(reference)))) is not None:
+                    self.users.setdefault(name, set()).add(i)
+
+
+    def log_last_uses(self) -> None:
+        for name, users in sorted(self.users.items()):
+            logging.debug(f'{name} released after step {max(users)}')
+
+
+    def release_after(self, i:int, step:Step) -> None:
+        """ mark step `i` complete, releasing any references it was the last user of """
+        with self._lock:
+            names = []
+            for name, users in self.users.items():
+                users.discard(i)
+                if not users and name not in self.released:
+                    names.append(name)
+
+            for name in names:
+                reference:Reference = getattr(self.refs, name)
+                memory = reference.memory_usage()
+                reference.set(None)
+                self.released[name] = {'after':f'{i} {type(step).__name__}', 'memory':memory}
+                logging.info(f'  released `{name}` after its last use' + (f' ({memory / 2**20:.1f} MiB)' if memory is not None else ''))
\ No newline at end of file
@@ -0,0 +1,223 @@
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+#   A dependency-aware, concurrent step scheduler       #
+#                                                       #
+#   Each `Step`'s read and write sets are inferred      #
+#       from its `Reference` attributes                 #
+#                                                       #
+#   A step depends on every earlier step it shares      #
+#       a written `Reference` with                      #
+#                                                       #
+#   Steps with `side_effects`, or which write no        #
+#       `Reference`s (`Log`, `AssertAnyChanges`), are   #
+#       barriers: they run alone, in order              #
+#                                                       #
+#   Logs from concurrent steps are buffered and         #
+#       re-emitted in step order                        #
+#                                                       #
+#   `run` uses a thread pool, `arun` uses asyncio       #
+#       tasks on the running event loop                 #
+#                                                       #
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+
+# stdlib
+import asyncio
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextvars import ContextVar, copy_context
+from typing import Awaitable, Callable
+
+# first-party
+from process_framework.references.reference import root_of
+from process_framework.steps import Step
+
+
+def is_barrier(step:Step) -> bool:
+    """ a step that must not run concurrently with any other step """
+    return step.side_effects or not step.get_writes()
+
+
+def get_dependencies(steps:list[Step]) -> list[set[int]]:
+    """ for each step, get the indices of the earlier steps it must wait for """
+    reads = [{id(root_of(r)) for r in step.get_reads()} for step in steps]
+    writes = [{id(root_of(r)) for r in step.get_writes()} for step in steps]
+    barriers = [is_barrier(step) for step in steps]
+
+    dependencies:list[set[int]] = []
+    for j in range(len(steps)):
+        dependencies.append({
+            i for i in range(j)
+            if barriers[i] or barriers[j]
+            or writes[i] & (reads[j] | writes[j])   # read-after-write, write-after-write
+            or reads[i] & writes[j]                 # write-after-read
+        })
+    return dependencies
+
+
+class _OrderedLogs(logging.Filter):
+    """ buffer records logged by each step's worker thread (or task), re-emitting them in step order """
+    def __init__(self) -> None:
+        super().__init__()
+        self._buffer:ContextVar[list[logging.LogRecord]|None] = ContextVar('_buffer', default=None)
+        self._buffers:dict[int, list[logging.LogRecord]] = {}
+        self._completed:set[int] = set()
+        self._next = 0
+        self._handlers:list[logging.Handler] = []
+
+
+    def __enter__(self) -> '_OrderedLogs':
+        self._handlers = list(logging.getLogger().handlers)
+        for handler in self._handlers:
+            handler.addFilter(self)
+        return self
+
+
+    def __exit__(self, *_) -> None:
+        for handler in self._handlers:
+            handler.removeFilter(self)
+        # emit anything left over (steps after an early escape or error) in order
+        for i in sorted(self._completed):
+            self._emit(i)
+
+
+    def filter(self, record:logging.LogRecord) -> bool:
+        buffer = self._buffer.get()
+        if buffer is None:
+            return True
+        # a record passes through the filter once per handler; buffer it once
+        if not buffer or buffer[-1] is not record:
+            buffer.append(record)
+        return False
+
+
+    def capture[T](self, i:int, fn:Callable[[], T]) -> T:
+        """ call `fn`, buffering its logs as those of step `i` """
+        token = self._buffer.set(self._buffers.setdefault(i, []))
+        try:
+            return fn()
+        finally:
+            self._buffer.reset(token)
+
+
+    async def acapture[T](self, i:int, awaitable:Callable[[], Awaitable[T]]) -> T:
+        """ await `awaitable()`, buffering its logs as those of step `i`; call from within its own task """
+        token = self._buffer.set(self._buffers.setdefault(i, []))
+        try:
+            return await awaitable()
+        finally:
+            self._buffer.reset(token)
+
+
+    def complete(self, i:int) -> None:
+        """ mark step `i` complete, emitting the logs of every completed step up to the first incomplete one """
+        self._completed.add(i)
+        while self._next in self._completed:
+            self._emit(self._next)
+            self._next += 1
+
+
+    def _emit(self, i:int) -> None:
+        for record in self._buffers.pop(i, []):
+            logging.getLogger(record.name).handle(record)
+
+
+class StepScheduler:
+    """ run up to `max_workers` `steps` at once, starting each as soon as the steps it depends on have completed;
+        `do_step` does a single step, it should be a coroutine function for `arun` """
+    def __init__(self, steps:list[Step], do_step:Callable[[int, Step], bool]|Callable[[int, Step], Awaitable[bool]], max_workers:int) -> None:
+        self.steps = steps
+        self.do_step = do_step
+        self.max_workers = max_workers
+        self.dependencies = get_dependencies(steps)
+
+
+    def log_dependencies(self) -> None:
+        for i, (step, dependencies) in enumerate(zip(self.steps, self.dependencies)):
+            logging.debug(f'{i}\t{type(step).__name__} <- {sorted(dependencies)}')
+
+
+    def run(self, skip:set[int]|None=None) -> bool:
+        """ do the steps, except those in `skip` (which are treated as complete); return False if a step escaped early.
+            once a step escapes or fails no new steps are started, steps already running are completed,
+            then the error of the earliest failing step is raised """
+        completed:set[int] = set(skip or ())
+        pending = [i for i in range(len(self.steps)) if i not in completed]
+        running:dict[Future, int] = {}
+        errors:dict[int, BaseException] = {}
+        escaped = False
+
+        with _OrderedLogs() as logs, ThreadPoolExecutor(self.max_workers, thread_name_prefix='step') as pool:
+
+            def submit_ready() -> None:
+                for i in list(pending):
+                    if self.dependencies[i] <= completed:
+                        pending.remove(i)
+                        # copy the context so the worker records to the active run report
+                        context = copy_context()
+                        step = self.steps[i]
+                        running[pool.submit(context.run, logs.capture, i, lambda i=i, step=step: self.do_step(i, step))] = i
+
+            for i in sorted(completed):
+                logs.complete(i)
+
+            submit_ready()
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in sorted(done, key=running.__getitem__):
+                    i = running.pop(future)
+                    try:
+                        escaped |= future.result() is False
+                    except BaseException as e:
+                        errors[i] = e
+                    completed.add(i)
+                    logs.complete(i)
+
+                if not (escaped or errors):
+                    submit_ready()
+
+        if errors:
+            raise errors[min(errors)]
+        return not escaped
+
+
+    async def arun(self, skip:set[int]|None=None) -> bool:
+        """ as `run`, but each step is awaited in its own task on the running event loop """
+        completed:set[int] = set(skip or ())
+        pending = [i for i in range(len(self.steps)) if i not in completed]
+        running:dict[asyncio.Task, int] = {}
+        errors:dict[int, BaseException] = {}
+        escaped = False
+        slots = asyncio.Semaphore(self.max_workers)
+
+        async def do_step(i:int) -> bool:
+            async with slots:
+                return await self.do_step(i, self.steps[i]) # type: ignore
+
+        with _OrderedLogs() as logs:
+            for i in sorted(completed):
+                logs.complete(i)
+
+            def submit_ready() -> None:
+                for i in list(pending):
+                    if self.dependencies[i] <= completed:
+                        pending.remove(i)
+                        # tasks copy the current context, so each step records to the active run report
+                        running[asyncio.create_task(logs.acapture(i, lambda i=i: do_step(i)))] = i
+
+            submit_ready()
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=running.__getitem__):
+                    i = running.pop(task)
+                    try:
+                        escaped |= task.result() is False
+                    except BaseException as e:
+                        errors[i] = e
+                    completed.add(i)
+                    logs.complete(i)
+
+                if not (escaped or errors):
+                    submit_ready()
+
+        if errors:
+            raise errors[min(errors)]
+        return not escaped
@@ -0,0 +1,147 @@
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+#   Spill `Reference`s to disk under a memory budget    #
+#                                                       #
+#   After each step, if the root references hold more   #
+#       than the budget, the least recently used ones   #
+#       that no running step needs are written to a     #
+#       spill directory and dropped from memory         #
+#                                                       #
+#   A spilled reference is loaded back before a step    #
+#       that uses it starts (or on `get_value`)         #
+#                                                       #
+#   DataFrame, Series and Index values go to Parquet    #
+#       (if pyarrow is available), else to pickle, as   #
+#       checkpoints do; a value is written again each   #
+#       time it's spilled, as a step may have changed   #
+#       it in place                                     #
+#                                                       #
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+
+# stdlib
+import logging
+import shutil
+import tempfile
+import threading
+from dataclasses import fields
+from functools import partial
+from itertools import count
+from pathlib import Path
+from typing import Any, Iterable
+
+# first-party
+from process_framework.references import Reference
+from process_framework.steps import Step
+from process_framework.pipeline.references import ReferencesBase
+from process_framework.pipeline.checkpoint import save_value, load_value
+from process_framework.references.reference import root_of
+
+
+class ReferenceSpiller:
+    """ keeps the (deep) memory held by the root fields of `refs` within `budget` bytes, where it can, by spilling the least recently used
+        fields that no running step reads or writes to files in a new directory under `directory` (the system temporary directory by default) """
+    def __init__(self, steps:list[Step], refs:ReferencesBase, budget:int, directory:Path|None=None, pinned:Iterable[str]=()) -> None:
+        self.refs = refs
+        self.budget = budget
+        if directory is not None:
+            Path(directory).mkdir(parents=True, exist_ok=True)
+        # a directory of this run's own, removed by `clear`
+        self.directory = Path(tempfile.mkdtemp(prefix='spill-', dir=directory))
+        self.spilled:dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._clock = count(1)
+
+        # only root references (not `ColumnReference`s etc.) hold values
+        self.references:dict[str, Reference] = {
+            f.name:value for f in fields(refs)
+            if f.name not in pinned
+            and isinstance(value := getattr(refs, f.name), Reference) and root_of(value) is value
+        }
+        names = {id(reference):name for name, reference in self.references.items()}
+
+        # the fields each step reads or writes
+        self.uses:list[set[str]] = [
+            {name for r in (*step.get_reads(), *step.get_writes()) if (name := names.get(id(root_of(r)))) is not None}
+            for step in steps
+        ]
+        self.running:dict[int, set[str]] = {}
+        self.last_used:dict[str, int] = {}
+        # {name: (memory, version)}; a deep `memory_usage` costs a pass over object columns, so it's only redone once the value changes
+        self._memory:dict[str, tuple[int, int]] = {}
+
+
+    def before_step(self, i:int, step:Step) -> None:
+        """ mark step `i` running, loading back the references it uses that were spilled """
+        with self._lock:
+            names = self.uses[i]
+            self.running[i] = names
+            tick = next(self._clock)
+            for name in names:
+                self.last_used[name] = tick
+
+        for name in sorted(names):
+            reference = self.references[name]
+            if reference.is_spilled():
+                reference.load()
+                self.spilled[name]['loads'] += 1
+                logging.info(f'  loaded spilled `{name}` for {type(step).__name__}')
+
+
+    def after_step(self, i:int, step:Step) -> None:
+        """ mark step `i` complete, then spill references, least recently used first, until the rest fit the budget """
+        with self._lock:
+            tick = next(self._clock)
+            for name in self.running.pop(i, ()):
+                self.last_used[name] = tick
+
+            resident = {name:memory for name in self.references if (memory := self.memory_of(name))}
+            total = sum(resident.values())
+            if total <= self.budget:
+                return
+
+            in_use = set().union(*self.running.values())
+            candidates = sorted((name for name in resident if name not in in_use), key=lambda name:self.last_used.get(name, 0))
+            for name in candidates:
+                if total <= self.budget:
+                    break
+                self.spill(name, resident[name], f'{i} {type(step).__name__}')
+                total -= resident[name]
+
+            if total > self.budget:
+                logging.warning(f'  references in use hold {total / 2**20:.1f} MiB, over the memory budget of {self.budget / 2**20:.1f} MiB')
+
+
+    def memory_of(self, name:str) -> int|None:
+        """ the memory held by the value of `name` in bytes; None if it has no value in memory """
+        reference = self.references[name]
+        if reference.peek() is None:
+            return None
+        memory, version = self._memory.get(name, (None, None))
+        if memory is None or version != reference.version:
+            memory = reference.memory_usage()
+            if memory is None:
+                return None
+            self._memory[name] = (memory, reference.version)
+        return memory
+
+
+    def spill(self, name:str, memory:int, after:str) -> None:
+        """ write the value of `name` to the spill directory and drop it from memory; it's rewritten every time, rather than only when
+            its version changes, as steps that modify a value in place needn't `touch` it """
+        reference = self.references[name]
+        path = self.directory / name
+        for stale in self.directory.glob(f'{name}.*'):
+            stale.unlink()
+        reference.spill(partial(load_value, path, save_value(reference.get_value(), path)))
+        entry = self.spilled.setdefault(name, {'after':[], 'memory':memory, 'spills':0, 'loads':0})
+        entry['after'].append(after)
+        entry['memory'] = max(entry['memory'], memory)
+        entry['spills'] += 1
+        logging.info(f'  spilled `{name}` ({memory / 2**20:.1f} MiB) to {self.directory}')
+
+
+    def clear(self) -> None:
+        """ load back any references still spilled, then remove the spill files; called at the end of a run """
+        for name, reference in self.references.items():
+            if reference.is_spilled():
+                reference.load()
+        shutil.rmtree(self.directory, ignore_errors=True)
@@ -1,2 +1,15 @@
+from typing import TYPE_CHECKING
 from .reference import Reference, _repr
-from .dataframe import ColumnReference, IndexReference
\ No newline at end of file
+
+if TYPE_CHECKING:
+    from .dataframe import ColumnReference, ColumnsReference, IndexReference
+
+# `ColumnReference`, `ColumnsReference` and `IndexReference` depend on pandas; import them on first use
+_LAZY = {'ColumnReference', 'ColumnsReference', 'IndexReference'}
+
+
+def __getattr__(name:str):
+    if name in _LAZY:
+        from . import dataframe
+        return getattr(dataframe, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
\ No newline at end of file
@@ -1,2 +1,3 @@
 from .reference_column import ColumnReference
+from .reference_columns import ColumnsReference
 from .reference_index import IndexReference
\ No newline at end of file
@@ -1,8 +1,16 @@
-from ..reference import Reference
-from pandas import Series, DataFrame
+from ..reference import Reference, _set_observer
+from pandas import Series, DataFrame, Index
 from typing import Iterable
 
 
+def _align[T:(Series, DataFrame)](value:T, keys:Index) -> T:
+    """ `value` reordered to `keys` (labels of `value.index`; NA where missing), as `keys.map(value)` would give, but vectorized:
+        a `value` already aligned to `keys` is returned as is, otherwise it's reindexed """
+    if value.index is keys or value.index.equals(keys):
+        return value
+    return value.reindex(keys)
+
+
 class ColumnReference(Reference[Series]):
     """ a reference to a column in the value of a Reference[DataFrame] """
     def __init__(self, df:Reference[DataFrame], column:str, column_as_index:"str|ColumnReference|None"=None):
@@ -33,20 +41,55 @@ class ColumnReference(Reference[Series]):
     
 
     def set(self, value: Series | None):
+        if (observer := _set_observer.get()) is not None:
+            observer(self, value)
+
         if value is None:
             self.value = None
             return
         
         assert isinstance(value, Series), f'expected value of type `Series`, got {Series}'
         
-        df = self.df.value
+        df = self.df.get_value() if self.df.has_value() else None
         assert isinstance(df, DataFrame), "referenced dataframe has not been assigned; we can't assign a value to a column in it"
         
         # we can assign based on index (default) or use a `column_as_index` and map to that instead
-        if isinstance(self.column_as_index, str):
-            df[self.column] = df[self.column_as_index].map(value)
-        else:
-            df[self.column] = df.index.map(value)
+        keys = Index(df[self.column_as_index]) if isinstance(self.column_as_index, str) else df.index
+        df[self.column] = _align(value, keys).array
+        # the frame was modified in place
+        self.df.touch()
+
+
+    @property
+    def version(self) -> int: # type: ignore
+        """ the version of the referenced dataframe """
+        return self.df.version
+
+
+    @version.setter
+    def version(self, _:int) -> None:
+        # the version is always that of `df`; ignore the base class (and `copy`) setting it
+        ...
+
+
+    def touch(self) -> None:
+        self.df.touch()
+
+
+    def is_spilled(self) -> bool:
+        return self.df.is_spilled()
+
+
+    def spill(self, load) -> None:
+        raise TypeError(f'only the referenced dataframe can be spilled, not a {type(self).__name__}')
+
+
+    def load(self) -> None:
+        self.df.load()
+
+
+    def peek(self) -> Series|None:
+        return self.get_value() if self.has_value() else None
 
 
     def get_value(self) -> Series:
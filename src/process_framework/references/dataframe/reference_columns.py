@@ -0,0 +1,92 @@
+from ..reference import Reference, _set_observer
+from .reference_column import ColumnReference, _align
+from pandas import DataFrame, Index
+from typing import Iterable
+
+
+class ColumnsReference(Reference[DataFrame]):
+    """ a reference to several columns in the value of a Reference[DataFrame], set together from the columns of a `DataFrame` """
+    def __init__(self, df:Reference[DataFrame], columns:list[str], column_as_index:"str|ColumnReference|None"=None):
+        self._type = DataFrame
+        self.df = df
+        self.columns = list(columns)
+        self.column_as_index = (
+            column_as_index.column if isinstance(column_as_index, ColumnReference)
+            else column_as_index
+        )
+
+
+    def is_instance_of(self, class_or_tuple) -> bool:
+        if not self.has_value():
+            return False
+
+        if isinstance(class_or_tuple, type):
+            return class_or_tuple == DataFrame
+
+        if isinstance(class_or_tuple, Iterable):
+            return DataFrame in class_or_tuple
+
+        return False
+
+
+    def has_value(self) -> bool:
+        return self.df.has_value() and all(column in self.df.get_value().columns for column in self.columns)
+
+
+    def set(self, value: DataFrame | None):
+        """ assign the `columns` of `value` to the referenced dataframe, aligning them (once, for all columns) as `ColumnReference.set` does """
+        if (observer := _set_observer.get()) is not None:
+            observer(self, value)
+
+        if value is None:
+            self.value = None
+            return
+
+        assert isinstance(value, DataFrame), f'expected value of type `DataFrame`, got {type(value)}'
+
+        df = self.df.get_value() if self.df.has_value() else None
+        assert isinstance(df, DataFrame), "referenced dataframe has not been assigned; we can't assign values to columns in it"
+
+        keys = Index(df[self.column_as_index]) if isinstance(self.column_as_index, str) else df.index
+        aligned = _align(value[self.columns], keys)
+        for column in self.columns:
+            df[column] = aligned[column].array
+        # the frame was modified in place
+        self.df.touch()
+
+
+    @property
+    def version(self) -> int: # type: ignore
+        """ the version of the referenced dataframe """
+        return self.df.version
+
+
+    @version.setter
+    def version(self, _:int) -> None:
+        # the version is always that of `df`; ignore the base class (and `copy`) setting it
+        ...
+
+
+    def touch(self) -> None:
+        self.df.touch()
+
+
+    def is_spilled(self) -> bool:
+        return self.df.is_spilled()
+
+
+    def spill(self, load) -> None:
+        raise TypeError(f'only the referenced dataframe can be spilled, not a {type(self).__name__}')
+
+
+    def load(self) -> None:
+        self.df.load()
+
+
+    def peek(self) -> DataFrame|None:
+        return self.get_value() if self.has_value() else None
+
+
+    def get_value(self) -> DataFrame:
+        """ return the columns `self.columns` of `self.df`; throws an error if `self.df` is not set, or any of `self.columns` are not in the `DataFrame` """
+        return self.df.get_value()[self.columns]
\ No newline at end of file
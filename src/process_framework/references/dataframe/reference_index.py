@@ -1,5 +1,5 @@
 from ..reference import Reference
-from pandas import Series, DataFrame
+from pandas import Series, DataFrame, Index
 from typing import Iterable
 
 
@@ -24,6 +24,34 @@ class IndexReference(Reference[Series]):
         return False
 
 
+    @property
+    def version(self) -> int: # type: ignore
+        """ the version of the referenced dataframe """
+        return self.df.version
+
+
+    @version.setter
+    def version(self, _:int) -> None:
+        # the version is always that of `df`; ignore the base class (and `copy`) setting it
+        ...
+
+
+    def touch(self) -> None:
+        self.df.touch()
+
+
+    def is_spilled(self) -> bool:
+        return self.df.is_spilled()
+
+
+    def spill(self, load) -> None:
+        raise TypeError(f'only the referenced dataframe can be spilled, not a {type(self).__name__}')
+
+
+    def load(self) -> None:
+        self.df.load()
+
+
     def has_value(self) -> bool:
         """ returns True if self.df has a value; throws an error if self.df has a value, but its index lacks the specified `level` """
         try:
@@ -38,6 +66,14 @@ class IndexReference(Reference[Series]):
         return True
 
 
+    def peek(self) -> Index|None:
+        """ the index (or the level of it), without converting it to a `Series` """
+        if not self.df.has_value():
+            return None
+        index = self.df.get_value().index
+        return index.get_level_values(self.level) if isinstance(self.level, int) else index
+
+
     def get_value(self) -> Series:
         """ get the values of `self.df.index` (optionally at `level` if specified) as a Series """
         df:DataFrame = self.df.get_value()
@@ -1,15 +1,18 @@
 from dataclasses import dataclass, field
 from typing import Callable, Any
-from collections.abc import Sized
-import reprlib
+from contextvars import ContextVar
+from itertools import count
+import threading
+from .summary import _repr, get_size, get_sample, summarize, memory_of
 
-# one small, shared repr truncator
-_repr = reprlib.Repr()
-_repr.maxstring = 30
-_repr.maxother = 30
-_repr.maxlist = 3
-_repr.maxtuple = 3
-_repr.maxdict = 3
+# versions are drawn from one counter, so a version is never reused, even by another reference (or a copy of this one)
+_versions = count(1)
+
+# an optional, context-local observer notified on every `set`; used by `process_framework.instrumentation`
+_set_observer:ContextVar[Callable[['Reference', Any], Any]|None] = ContextVar('_set_observer', default=None)
+
+# serializes loading spilled values, so a value is only loaded once
+_load_lock = threading.Lock()
 
 
 @dataclass(slots=True)
@@ -20,6 +23,12 @@ class Reference[T]:
 
     on_set:Callable[['Reference[T]', T|None], Any]|None=None    # an optional callback, invoked on `set`
 
+    # changes whenever the value is `set` (or `touch`ed); steps can compare versions to tell whether their inputs changed
+    version:int = field(default=0, init=False, repr=False, compare=False)
+
+    # if the value has been spilled (see `pipeline.spill`), a callable that loads it back; `value` is None meanwhile
+    _spilled:Callable[[], T]|None = field(default=None, init=False, repr=False, compare=False)
+
     def __post_init__(self) -> None:
         """ check that _type is not None and that, if value is not None, that it is an instance of self._type """
         if self._type is None:
@@ -37,68 +46,104 @@ class Reference[T]:
         if self.on_set:
             self.on_set(self, value)
 
+        if (observer := _set_observer.get()) is not None:
+            observer(self, value)
+
         self.value = value
+        self._spilled = None
+        self.version = next(_versions)
+
+
+    def touch(self) -> None:
+        """ record that the value has been modified in place, giving it a new `version` """
+        self.version = next(_versions)
 
 
     def is_instance_of(self, class_or_tuple: type | tuple[type, ...]) -> bool:
         """ returns True if `value` is an instance of `class_or_tuple`; see `isinstance` """
+        self.load()
         return isinstance(self.value, class_or_tuple)
 
 
     def has_value(self) -> bool:
-        """ returns True if `value` is not None, else False """
-        return self.value is not None
+        """ returns True if `value` is not None (or has been spilled), else False """
+        return self.value is not None or self._spilled is not None
     
     
     def get_value(self) -> T:
-        """ get `value` as a `T`; throw if `value` is None 
+        """ get `value` as a `T`, loading it if it was spilled; throw if `value` is None 
             useful for telling IDE type checkers that `value` is not None """
+        self.load()
         if self.value is None:
             raise ValueError("Reference has a None value")
         return self.value
 
 
-    def _get_size(self) -> str|None:
-        # try to get the value
-        try:
-            value = self.get_value()
-        except:
-            return None
-        
-        # pandas-like shapes
-        if shape:= getattr(value, 'shape', None):
-            return shape
-        
-        if not isinstance(value, str) and isinstance(value, Sized):
-            return str(len(value))
+    def peek(self) -> T|None:
+        """ the value, without materializing anything; derived references return the cheapest view of theirs.
+            None if the value has been spilled """
+        return self.value
+
+
+    def memory_usage(self, deep:bool=True) -> int|None:
+        """ an estimate of the memory held by the value in bytes (see `summary.memory_of`); None if there's no value in memory.
+            `deep` counts the contents of object (e.g. string) columns, which costs a pass over them """
+        return memory_of(self.peek(), deep)
 
-        return None
+
+    def is_spilled(self) -> bool:
+        """ True if the value has been spilled, and will be loaded on `get_value` """
+        return self._spilled is not None
+
+
+    def spill(self, load:Callable[[], T]) -> None:
+        """ drop the value from memory, once it has been saved; `load` gets it back, on the next `get_value`.
+            the version is kept, as the value is unchanged """
+        if self.value is None:
+            return
+        self._spilled = load
+        self.value = None
+
+
+    def load(self) -> None:
+        """ load the value back, if it has been spilled """
+        if self._spilled is None:
+            return
+        with _load_lock:
+            if (load := self._spilled) is not None:
+                self.value = load()
+                self._spilled = None
+
+
+    def _get_size(self) -> str|None:
+        return get_size(self.peek())
 
 
     def _get_sample(self) -> str:
-        try:
-            value = self.get_value()
-        except:
+        if (value := self.peek()) is None:
             return 'None'
+        return get_sample(value)
 
-        try:
-            if hasattr(value, 'to_list'):
-                return _repr.repr(value.to_list()) # type: ignore
-            
-            if hasattr(value, 'to_dict'):
-                return _repr.repr(value.to_dict('index')) # type: ignore
-            
-            return _repr.repr(value)
-        
-        except Exception:
-            return _repr.repr(value)
+
+    def summary(self, *, memory:bool=False, stats:bool=False, sample_size:int=1_000) -> str:
+        """ describe the value at a cost that doesn't grow with its size; see `summary.summarize` """
+        return f'Reference[{self._type.__name__}]({summarize(self.peek(), memory=memory, stats=stats, sample_size=sample_size)})'
 
 
     def __repr__(self) -> str:
+        if self.is_spilled():
+            return f"Reference[{self._type.__name__}](spilled)"
 
         _size = self._get_size()
         _sample = self._get_sample()
                 
         s = ', '.join(str(t) for t in (_size, _sample) if t)
 
-        return f"Reference[{self._type.__name__}]({s})"
\ No newline at end of file
+        return f"Reference[{self._type.__name__}]({s})"
+
+
+def root_of(reference:Reference) -> Reference:
+    """ get the `Reference` that owns the value of `reference`; `ColumnReference`s and `IndexReference`s resolve to their `df` """
+    while isinstance(df := getattr(reference, 'df', None), Reference):
+        reference = df
+    return reference
\ No newline at end of file
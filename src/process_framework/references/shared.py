@@ -0,0 +1,249 @@
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+#   Share `Reference` values with worker processes      #
+#                                                       #
+#   A `SharedValue` puts the columns (and index) of a   #
+#       DataFrame, Series or Index in one segment of    #
+#       `multiprocessing.shared_memory`; it pickles     #
+#       as a small handle, which workers `attach` to    #
+#       without copying the data                        #
+#                                                       #
+#   NumPy columns are laid out as raw arrays; arrow-    #
+#       backed columns (`ArrowDtype`, `string[pyarrow]`)#
+#       as an Arrow IPC stream, which needs pyarrow.    #
+#       Other columns (objects, categoricals, nullable  #
+#       extension types) are pickled into the segment,  #
+#       and unpickled once per attaching process        #
+#                                                       #
+#   Attached arrays are read-only views of the segment  #
+#                                                       #
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+
+# stdlib
+import logging
+import os
+import pickle
+import sys
+from dataclasses import dataclass, field
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any
+
+# third-party
+import numpy as np
+import pandas as pd
+from pandas import DataFrame, Index, MultiIndex, RangeIndex, Series
+
+# offsets of numpy columns in a segment are aligned to this many bytes
+ALIGNMENT = 64
+
+# segments attached to by this process, by name; kept open while the process lives, as the values attached hold views of them
+_attached:dict[str, tuple[SharedMemory, Any]] = {}
+
+
+@dataclass(slots=True)
+class _Column:
+    """ where one column (or index level) of a shared value is in the segment: `numpy` (`length` values at `offset`), `arrow`
+        (at `position` in the IPC stream at `offset`), or `pickled` (`length` bytes at `offset`) """
+    kind:str
+    dtype:Any
+    offset:int = 0
+    length:int = 0
+    position:int = 0
+
+
+def _is_arrow(values:Series|Index) -> bool:
+    dtype = values.dtype
+    return isinstance(dtype, pd.ArrowDtype) or (isinstance(dtype, pd.StringDtype) and dtype.storage == 'pyarrow')
+
+
+def _is_numpy(values:Series|Index) -> bool:
+    return isinstance(values.dtype, np.dtype) and values.dtype.kind in 'biufmM'
+
+
+@dataclass
+class SharedValue:
+    """ a DataFrame, Series or Index in shared memory. the process that makes one owns the segment, and should `unlink` it once
+        workers are done with it (or use it as a context manager); a `SharedValue` pickles as a handle that workers `attach` to """
+    name:str
+    size:int
+    kind:str                                # DataFrame | Series | Index
+    columns:list[_Column]
+    labels:Any                              # the column labels of a DataFrame, the name of a Series
+    index:list[_Column]
+    index_names:list[Any]
+    range_index:tuple[int, int, int]|None = None
+    _memory:SharedMemory|None = field(default=None, repr=False)
+
+
+    @classmethod
+    def share(cls, value:DataFrame|Series|Index) -> 'SharedValue':
+        """ copy `value` into a new shared memory segment; raise TypeError if it isn't a DataFrame, Series or Index (subclasses,
+            e.g. a `GeoDataFrame`, would lose their type) """
+        if type(value) not in (DataFrame, Series) and not isinstance(value, Index):
+            raise TypeError(f'expected a DataFrame, Series or Index, got {type(value).__name__}')
+
+        if isinstance(value, Index):
+            kind, frame, labels, index = 'Index', DataFrame(index=value), None, value
+        elif isinstance(value, Series):
+            kind, frame, labels, index = 'Series', value.to_frame(), value.name, value.index
+        else:
+            kind, frame, labels, index = 'DataFrame', value, value.columns, value.index
+
+        range_index = (index.start, index.stop, index.step) if isinstance(index, RangeIndex) else None
+        levels = [] if range_index else [index.get_level_values(i) for i in range(index.nlevels)]
+        values = [frame.iloc[:, i] for i in range(frame.shape[1])] + levels
+
+        # lay out the numpy and pickled columns, then the arrow columns as one IPC stream
+        specs:list[_Column] = []
+        buffers:list[Any] = []
+        arrow:list[Any] = []
+        offset = 0
+        for column in values:
+            if _is_numpy(column):
+                array = np.ascontiguousarray(column.to_numpy())
+                specs.append(_Column('numpy', array.dtype.str, offset, len(array)))
+                buffer = array.view(np.uint8)
+            elif _is_arrow(column):
+                specs.append(_Column('arrow', column.dtype, position=len(arrow)))
+                arrow.append(column.array)
+                continue
+            else:
+                buffer = pickle.dumps(column.array, protocol=pickle.HIGHEST_PROTOCOL)
+                specs.append(_Column('pickled', column.dtype, offset, len(buffer)))
+            buffers.append(buffer)
+            offset += -(-len(buffer) // ALIGNMENT) * ALIGNMENT
+
+        table = _to_table(arrow) if arrow else None
+        size = max(1, offset + (_ipc_size(table) if table is not None else 0))
+        memory = SharedMemory(create=True, size=size)
+        try:
+            for spec, buffer in zip((s for s in specs if s.kind != 'arrow'), buffers):
+                memory.buf[spec.offset:spec.offset + len(buffer)] = buffer
+            if table is not None:
+                _write_ipc(table, memory.buf[offset:])
+        except BaseException:
+            memory.close()
+            memory.unlink()
+            raise
+
+        for spec in specs:
+            if spec.kind == 'arrow':
+                spec.offset = offset
+        n = frame.shape[1]
+        logging.debug(f'shared a {kind} of {len(frame):,} rows in {memory.name} ({size / 2**20:.1f}MiB; {sum(s.kind == "pickled" for s in specs)} columns pickled)')
+        return cls(memory.name, size, kind, specs[:n], labels, specs[n:], list(index.names), range_index, memory)
+
+
+    def attach(self) -> DataFrame|Series|Index:
+        """ the shared value, as read-only views of the segment; attached once per process (and per segment) """
+        if (attached := _attached.get(self.name)) is not None:
+            return attached[1]
+
+        memory = self._memory if self._memory is not None else _open(self.name)
+        arrow = _from_ipc(memory.buf, next(s.offset for s in (*self.columns, *self.index) if s.kind == 'arrow')) \
+            if any(s.kind == 'arrow' for s in (*self.columns, *self.index)) else []
+
+        def restore(spec:_Column) -> Any:
+            if spec.kind == 'numpy':
+                array = np.frombuffer(memory.buf, dtype=np.dtype(spec.dtype), count=spec.length, offset=spec.offset)
+                array.flags.writeable = False
+                return array
+            if spec.kind == 'arrow':
+                chunked = arrow[spec.position]
+                if isinstance(spec.dtype, pd.StringDtype):
+                    return pd.arrays.ArrowStringArray(chunked)
+                return pd.arrays.ArrowExtensionArray(chunked)
+            return pickle.loads(memory.buf[spec.offset:spec.offset + spec.length])
+
+        if self.range_index is not None:
+            index = RangeIndex(*self.range_index, name=self.index_names[0])
+        elif len(self.index) == 1:
+            index = Index(restore(self.index[0]), name=self.index_names[0], copy=False)
+        else:
+            index = MultiIndex.from_arrays([restore(s) for s in self.index], names=self.index_names)
+
+        value:DataFrame|Series|Index
+        if self.kind == 'Index':
+            value = index
+        elif self.kind == 'Series':
+            value = Series(restore(self.columns[0]), index=index, name=self.labels, copy=False)
+        else:
+            value = DataFrame({i:restore(s) for i, s in enumerate(self.columns)}, index=index, copy=False)
+            value.columns = self.labels
+
+        _attached[self.name] = (memory, value)
+        return value
+
+
+    def unlink(self) -> None:
+        """ release the segment; call once, from the process that shared the value, when no worker needs it """
+        # the value attached in this process (if any) goes first, so that, unless it's still referenced elsewhere, the segment can close
+        _attached.pop(self.name, None)
+        if self._memory is not None:
+            _close(self._memory)
+            self._memory.unlink()
+            self._memory = None
+
+
+    def __enter__(self) -> 'SharedValue':
+        return self
+
+
+    def __exit__(self, *_) -> None:
+        self.unlink()
+
+
+    def __getstate__(self) -> dict[str, Any]:
+        # pickle as a handle; the segment is opened by name in the worker
+        return {f:getattr(self, f) for f in self.__dataclass_fields__ if f != '_memory'} | {'_memory':None}
+
+
+def _open(name:str) -> SharedMemory:
+    # the segment is owned (and unlinked) by the process that shared it; since 3.13 attaching processes can opt out of tracking it
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name, track=False) # type: ignore
+    return SharedMemory(name)
+
+
+def _close(memory:SharedMemory) -> None:
+    """ close `memory`; while views of it are still referenced in this process, leave the mapping to them instead (it goes with the
+        last of them), dropping `memory`'s handles so it isn't closed again, and failing, when it's collected """
+    try:
+        memory.close()
+    except BufferError:
+        memory._buf = None # type: ignore
+        memory._mmap = None # type: ignore
+        if getattr(memory, '_fd', -1) >= 0:
+            os.close(memory._fd) # type: ignore
+            memory._fd = -1 # type: ignore
+
+
+def _to_table(arrays:list[Any]):
+    """ a pyarrow Table of arrow-backed pandas arrays, without copying them """
+    import pyarrow as pa
+    columns = [pa.array(a) for a in arrays]
+    columns = [c if isinstance(c, pa.ChunkedArray) else pa.chunked_array([c]) for c in columns]
+    return pa.Table.from_arrays(columns, names=[str(i) for i in range(len(columns))])
+
+
+def _ipc_size(table) -> int:
+    import pyarrow as pa
+    sink = pa.MockOutputStream()
+    _write_stream(table, sink)
+    return sink.size()
+
+
+def _write_ipc(table, buffer:memoryview) -> None:
+    import pyarrow as pa
+    _write_stream(table, pa.FixedSizeBufferWriter(pa.py_buffer(buffer)))
+
+
+def _write_stream(table, sink) -> None:
+    import pyarrow as pa
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _from_ipc(buffer:memoryview, offset:int) -> list[Any]:
+    import pyarrow as pa
+    table = pa.ipc.open_stream(pa.py_buffer(buffer[offset:])).read_all()
+    return [table.column(i) for i in range(table.num_columns)]
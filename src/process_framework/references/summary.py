@@ -0,0 +1,167 @@
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+#   Bounded-cost summaries of values                    #
+#                                                       #
+#   Used by `Reference.__repr__` and the `Log` step;    #
+#       the cost of a summary doesn't grow with the     #
+#       number of rows: samples are taken from the      #
+#       head, shapes, dtypes and (shallow) memory       #
+#       come from metadata                              #
+#                                                       #
+#   Statistics (nulls, distinct values) are opt-in,     #
+#       and are estimated from a random sample of a     #
+#       fixed number of rows                            #
+#                                                       #
+#   pandas objects are handled by duck typing, so       #
+#       this module doesn't import pandas               #
+#                                                       #
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+
+# stdlib
+import itertools
+import math
+import random
+import reprlib
+import sys
+from collections.abc import Sized
+from typing import Any
+
+# one small, shared repr truncator
+_repr = reprlib.Repr()
+_repr.maxstring = 30
+_repr.maxother = 30
+_repr.maxlist = 3
+_repr.maxtuple = 3
+_repr.maxdict = 3
+
+# the most columns described individually by `get_dtypes` and `get_stats`
+MAX_COLUMNS = 10
+
+# the most elements of a container `memory_of` measures to estimate the size of the rest
+MAX_SAMPLE = 100
+
+
+def is_frame(value:Any) -> bool:
+    return hasattr(value, 'columns') and hasattr(value, 'dtypes') and hasattr(value, 'iloc')
+
+
+def get_size(value:Any) -> Any:
+    """ the shape of `value` if it has one, else its length if it's `Sized` (and not a string), else None """
+    if shape := getattr(value, 'shape', None):
+        return shape
+    if not isinstance(value, str) and isinstance(value, Sized):
+        return str(len(value))
+    return None
+
+
+def get_sample(value:Any) -> str:
+    """ a truncated repr of the first few elements (or rows) of `value` """
+    # take one more than is shown, so the repr is marked as truncated if there's more
+    n = max(_repr.maxlist, _repr.maxdict) + 1
+    try:
+        if is_frame(value):
+            return _repr.repr(value.iloc[:n].to_dict('index'))
+
+        if hasattr(value, 'iloc'):
+            # a Series
+            return _repr.repr(value.iloc[:n].to_list())
+
+        if hasattr(value, 'to_list'):
+            # an Index
+            return _repr.repr(value[:n].to_list())
+
+        return _repr.repr(value)
+
+    except Exception:
+        return _repr.repr(value)
+
+
+def get_dtypes(value:Any) -> str|None:
+    """ the dtype of `value`, or the dtypes of the (first `MAX_COLUMNS`) columns of a frame """
+    if is_frame(value):
+        dtypes = [f'{column}:{dtype}' for column, dtype in list(value.dtypes.items())[:MAX_COLUMNS]]
+        if len(value.columns) > MAX_COLUMNS:
+            dtypes.append(f'... ({len(value.columns)} columns)')
+        return ', '.join(dtypes)
+    if (dtype := getattr(value, 'dtype', None)) is not None:
+        return str(dtype)
+    return None
+
+
+def memory_of(value:Any, deep:bool=True) -> int|None:
+    """ an estimate of the memory used by `value` in bytes: `memory_usage` for pandas objects (if not `deep`, object (e.g. string) values
+        are counted as pointers), `nbytes` for arrays, else `sys.getsizeof`; if `deep`, the elements of a list, tuple, set or dict are
+        estimated from a sample of `MAX_SAMPLE` of them """
+    if value is None:
+        return None
+    if (memory_usage := getattr(value, 'memory_usage', None)) is not None:
+        try:
+            usage = memory_usage(deep=deep)
+            return int(usage.sum()) if hasattr(usage, 'sum') else int(usage)
+        except Exception:
+            pass
+    if (nbytes := getattr(value, 'nbytes', None)) is not None:
+        return int(nbytes)
+    try:
+        size = sys.getsizeof(value)
+    except TypeError:
+        return None
+    if deep and isinstance(value, (list, tuple, set, frozenset, dict)) and value:
+        items = list(itertools.islice(value.items() if isinstance(value, dict) else value, MAX_SAMPLE))
+        sample = sum(sum(sys.getsizeof(x) for x in item) if isinstance(value, dict) else sys.getsizeof(item) for item in items)
+        size += round(sample * len(value) / len(items))
+    return size
+
+
+def estimate_distinct(sample:Any, total:int) -> int|None:
+    """ estimate the number of distinct values of a column of `total` rows from a random `sample` of it, with the GEE estimator:
+        values seen once in the sample are scaled up by sqrt(total / sample size), values seen more than once are counted once """
+    try:
+        counts = sample.value_counts(dropna=True)
+    except TypeError:
+        # unhashable values (lists, dicts)
+        return None
+    if len(sample) >= total:
+        return len(counts)
+    once = int((counts == 1).sum())
+    return round(math.sqrt(total / max(1, len(sample))) * once + (len(counts) - once))
+
+
+def get_stats(value:Any, sample_size:int=1_000) -> str|None:
+    """ null fractions and estimated distinct counts of (the first `MAX_COLUMNS` columns of) `value`, from a random sample of `sample_size` rows """
+    if not hasattr(value, 'isna') or not hasattr(value, 'take'):
+        return None
+    total = len(value)
+    if total == 0:
+        return None
+    sample = value
+    if total > sample_size:
+        positions = sorted(random.sample(range(total), sample_size))
+        # Series and DataFrames take by position with `iloc`, an Index with `take`
+        sample = value.iloc[positions] if hasattr(value, 'iloc') else value.take(positions)
+
+    columns = [sample[column] for column in list(sample.columns)[:MAX_COLUMNS]] if is_frame(sample) else [sample]
+    stats = []
+    for column in columns:
+        nulls = float(column.isna().mean())
+        distinct = estimate_distinct(column, total)
+        name = f'{column.name}: ' if is_frame(sample) else ''
+        stats.append(f'{name}{nulls:.0%} null' + ('' if distinct is None else f', ~{distinct:,} distinct'))
+    return f'({"exact" if total <= sample_size else f"sample of {sample_size:,}"}) ' + '; '.join(stats)
+
+
+def summarize(value:Any, *, memory:bool=False, stats:bool=False, sample_size:int=1_000) -> str:
+    """ describe `value` at a cost that doesn't grow with its size: its size, dtypes and first few elements;
+        optionally a shallow memory estimate, and statistics estimated from a random sample of `sample_size` rows """
+    if value is None:
+        return 'None'
+    parts = []
+    if (size := get_size(value)) is not None:
+        parts.append(str(size))
+    if (dtypes := get_dtypes(value)) is not None:
+        parts.append(dtypes)
+    if memory and (nbytes := memory_of(value, deep=False)) is not None:
+        parts.append(f'{nbytes / 2**20:,.1f}MiB')
+    if stats and (summary := get_stats(value, sample_size)) is not None:
+        parts.append(summary)
+    parts.append(get_sample(value))
+    return ', '.join(parts)
@@ -1,7 +1,11 @@
 from .step import Step
+from .async_step import AsyncStep
 from .assigning_step import AssigningStep
 from .transforming_step import TransformingStep
 from .modifying_step import ModifyingStep
 from .logging_step import Log
 from .appending_step import Append
-from .retry_step import Retry
\ No newline at end of file
+from .retry_step import Retry
+from .retry_policy import RetryPolicy, CircuitBreaker
+from .batch_sizing import AdaptiveBatchSize
+from .batch_journal import BatchJournal
\ No newline at end of file
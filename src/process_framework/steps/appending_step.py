@@ -1,10 +1,13 @@
 from .step import Step
 from ..references import Reference
+import threading
 from .step import Step
 from ..references import Reference
 
 class Append(Step):
     """ append the value of `subject` to `append_to`, initializing the value of `append_to` if it is `None` """
+    # `append_to` may be shared by the workers of a concurrent `BatchProcessor`
+    _lock = threading.Lock()
     def __init__(self, subject:Reference, append_to:Reference[list]) -> None:
         super().__init__()
         self.subject = subject
@@ -22,8 +25,10 @@ class Append(Step):
         # if append_to has no value, initialize it to an empty list
         append_to = self.append_to
 
-        if not append_to.has_value():
-            append_to.set(list())
-        
-        # append `value` to the value of `append_to`
-        append_to.get_value().append(value)
\ No newline at end of file
+        with self._lock:
+            if not append_to.has_value():
+                append_to.set(list())
+            
+            # append `value` to the value of `append_to`
+            append_to.get_value().append(value)
+            append_to.touch()
\ No newline at end of file
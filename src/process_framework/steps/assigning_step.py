@@ -1,13 +1,14 @@
-from .step import Step
+from .memoizing import Memoizing
 from ..references.reference import Reference
 from abc import abstractmethod, ABC
 
-class AssigningStep[T](Step, ABC):
-    """ a step that assigns a typed result to a typed `Reference` """
-    def __init__(self, assign_to:Reference[T], *, overwrite:bool=True):
+class AssigningStep[T](Memoizing, ABC):
+    """ a step that assigns a typed result to a typed `Reference`; if `memoize`, only while its inputs change (see `Memoizing`) """
+    def __init__(self, assign_to:Reference[T], *, overwrite:bool=True, memoize:bool=False):
         super().__init__()
         self.assign_to = assign_to
         self.overwrite=overwrite
+        self.memoize = memoize
 
     @abstractmethod
     def generate(self) -> T:
@@ -16,6 +17,10 @@ class AssigningStep[T](Step, ABC):
     def do(self):
         if self.assign_to.has_value() and not self.overwrite:
             return self.assign_to.get_value()
+
+        if self.recall():
+            return
         
         result = self.generate()
-        self.assign_to.set(result)
\ No newline at end of file
+        self.assign_to.set(result)
+        self.remember(result)
\ No newline at end of file
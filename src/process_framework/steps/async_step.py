@@ -0,0 +1,78 @@
+from .step import Step
+from ..instrumentation.profile import profile_task
+from abc import ABC, abstractmethod
+from collections.abc import Coroutine
+from concurrent.futures import Future
+from contextvars import copy_context
+from typing import Any
+import asyncio
+import threading
+
+# async clients (AsyncElasticsearch, aiohttp sessions) are bound to the event loop they're first used on,
+#   so the framework runs every `AsyncStep` on one, long-lived, loop in a daemon thread
+_loop:asyncio.AbstractEventLoop|None = None
+_loop_lock = threading.Lock()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """ get the framework's event loop, starting it in a daemon thread on first use """
+    global _loop
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name='process_framework-event-loop', daemon=True).start()
+        return _loop
+
+
+def run_coroutine[T](coroutine:Coroutine[Any, Any, T]) -> T:
+    """ run `coroutine` on the framework's event loop from synchronous code, blocking until it completes;
+        the caller's context (e.g. the active run report) is preserved """
+    loop = get_event_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coroutine.close()
+        raise RuntimeError("can't block on the framework's event loop from a coroutine running on it; `await` instead")
+
+    context = copy_context()
+    future:Future[T] = Future()
+
+    def on_done(task:asyncio.Task[T]) -> None:
+        if task.cancelled():
+            future.cancel()
+        elif (e := task.exception()) is not None:
+            future.set_exception(e)
+        else:
+            future.set_result(task.result())
+
+    def start() -> None:
+        task = loop.create_task(coroutine, context=context)
+        # a step being profiled is profiled on the loop's thread too (stopping before the caller resumes)
+        context.run(profile_task, task)
+        task.add_done_callback(on_done)
+
+    loop.call_soon_threadsafe(start)
+    return future.result()
+
+
+class AsyncStep(Step, ABC):
+    """ a step whose unit of work is a coroutine, `ado`; awaited by `PipelineBase.ado`, or run on the framework's event loop by `do` """
+
+    @abstractmethod
+    async def ado(self):
+        pass
+
+
+    async def apreflight(self):
+        """ perform any preflight assertions; can throw errors or log warnings or do nothing """
+        ...
+
+
+    def do(self):
+        return run_coroutine(self.ado())
+
+
+    def preflight(self):
+        return run_coroutine(self.apreflight())
@@ -0,0 +1,105 @@
+from pathlib import Path
+from typing import IO
+import json
+import logging
+import os
+import threading
+
+
+class BatchJournal:
+    """ an append-only json lines file of the batches of a `BatchProcessor` run that have completed (and the sizes they were made at),
+        under a fingerprint of the subject and batching; a run that fails can be re-run, skipping the batches already completed.
+        each line is flushed as it's written, so it survives the process dying; if `fsync`, it's also synced to disk. only which batches
+        completed is journaled: outputs a batch left in memory (results gathered with `append_to`, say) aren't restored for the batches
+        a resumed run skips, so steps whose batches should be skippable must write their results elsewhere (e.g. index them) """
+    def __init__(self, path:Path, fsync:bool=False) -> None:
+        self.path = Path(path)
+        self.fsync = fsync
+        self.completed:set[int] = set()
+        self.sizes:dict[int, int] = {}
+        self._file:IO[str]|None = None
+        # the length of the journal up to the end of its last whole line
+        self._end = 0
+        self._lock = threading.Lock()
+
+
+    def open(self, fingerprint:str) -> set[int]:
+        """ start or resume a run over a subject with `fingerprint`; return the indices of batches a previous run completed """
+        self.completed, self.sizes = set(), {}
+        if self.path.exists():
+            self.read(fingerprint)
+
+        if self.completed or self.sizes:
+            logging.info(f'resuming from batch journal {self.path}: {len(self.completed)} batches already completed')
+            # drop a line torn by the process dying mid-write, so the next entry starts a line of its own
+            os.truncate(self.path, self._end)
+            self._file = self.path.open('a')
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = self.path.open('w')
+            self._write({'fingerprint':fingerprint})
+        return set(self.completed)
+
+
+    def read(self, fingerprint:str) -> None:
+        with self.path.open('rb') as f:
+            lines = iter(f)
+            try:
+                line = next(lines)
+                header = json.loads(line) if line.endswith(b'\n') else {}
+            except (StopIteration, ValueError):
+                header = {}
+            if header.get('fingerprint') != fingerprint:
+                logging.info(f'batch journal {self.path} is for a different subject or batching; starting from scratch')
+                return
+            self._end = f.tell()
+
+            for line in lines:
+                try:
+                    if not line.endswith(b'\n'):
+                        raise ValueError('no newline')
+                    entry = json.loads(line)
+                except ValueError:
+                    # a line torn by the process dying mid-write
+                    continue
+                self._end = f.tell()
+                if 'size' in entry:
+                    self.sizes[entry['batch']] = entry['size']
+                else:
+                    self.completed.add(entry['batch'])
+
+
+    def record_size(self, i:int, size:int) -> None:
+        """ record that batch `i` was made with `size` rows, so a resumed run makes the same batches """
+        if self.sizes.get(i) != size:
+            self.sizes[i] = size
+            self._write({'batch':i, 'size':size})
+
+
+    def record(self, i:int) -> None:
+        """ record that batch `i` completed """
+        self.completed.add(i)
+        self._write({'batch':i})
+
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+    def clear(self) -> None:
+        """ close and remove the journal; called once every batch has completed """
+        self.close()
+        self.path.unlink(missing_ok=True)
+
+
+    def _write(self, entry:dict) -> None:
+        with self._lock:
+            if self._file is None:
+                raise RuntimeError(f'batch journal {self.path} is not open')
+            self._file.write(json.dumps(entry) + '\n')
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
\ No newline at end of file
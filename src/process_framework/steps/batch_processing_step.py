@@ -1,10 +1,25 @@
 from process_framework import Reference, Step
+from process_framework.references.reference import root_of
+from process_framework.instrumentation import measure, record_metrics
+from process_framework.steps.preflight import PreflightCheck
+from process_framework.steps.retry_policy import RetryPolicy, CircuitBreaker, RetryStats
+from process_framework.steps.batch_sizing import AdaptiveBatchSize
+from process_framework.steps.batch_journal import BatchJournal
 from abc import abstractmethod
-from pandas import DataFrame
+from pandas import DataFrame, options
+from pandas.util import hash_pandas_object
 from collections import deque
-from collections.abc import Iterable
-from dataclasses import dataclass
+from collections.abc import Callable, Collection, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextvars import copy_context
+from copy import copy
+from dataclasses import dataclass, asdict
+from time import perf_counter, sleep
+import hashlib
+import json
 import logging
+import pickle
+import threading
 
 
 @dataclass(slots=True)
@@ -12,6 +27,9 @@ class _Retry[TBatch]:
     i:int
     batch:TBatch
     try_:int = 0
+    error:Exception|None = None
+    # the parts of `batch` still to handle, if it has been split (see `AdaptiveBatchSize`)
+    parts:list[TBatch]|None = None
 
 
 class BatchProcessor[TIn, TBatch](Step):
@@ -21,13 +39,47 @@ class BatchProcessor[TIn, TBatch](Step):
             batch: Reference[TBatch],
             steps:list[Step], 
             *, 
-            batch_size:int=1000
+            batch_size:int=1000,
+            max_workers:int|None=None,
+            max_in_flight:int|None=None,
+            ordered:bool=True,
+            retry_policy:RetryPolicy|None=None,
+            circuit_breaker:CircuitBreaker|None=None,
+            batch_sizing:AdaptiveBatchSize|None=None,
+            journal:BatchJournal|None=None
         ):
         self.subject = subject
         self.batch = batch
         self.steps = steps
         self.batch_size = batch_size
-        self.max_retries = 25
+        # if set, the size of each batch is adjusted toward a target latency or byte size, starting from `batch_size`; see `get_batch_size`
+        self.batch_sizing = batch_sizing
+        # if set, completed batches are journaled, and a re-run over the same subject skips them; see `open_journal`
+        self.journal = journal
+        self._sized = 0
+
+        # how failed batches are retried (immediately, up to 25 times, by default), and whether to pause every batch when most are failing
+        self.retry_policy = retry_policy or RetryPolicy(max_retries=25)
+        self.circuit_breaker = circuit_breaker
+        self.retry_stats = RetryStats()
+        self._stats_lock = threading.Lock()
+
+        # if set, handle batches concurrently on `max_workers` threads; each thread has its own copies of the `get_local_references`
+        self.max_workers = max_workers
+        # the most batches generated but not yet completed at any one time (`2 * max_workers` by default)
+        self.max_in_flight = max_in_flight
+        # if set, batches are completed (`on_batch_complete`, `on_batch_error`) in order, else as soon as they finish
+        self.ordered = ordered
+
+
+    @property
+    def max_retries(self) -> int:
+        return self.retry_policy.max_retries
+
+
+    @max_retries.setter
+    def max_retries(self, value:int) -> None:
+        self.retry_policy.max_retries = value
 
 
     @abstractmethod
@@ -35,16 +87,75 @@ class BatchProcessor[TIn, TBatch](Step):
         ...
     
 
+    def get_batch_size(self) -> int:
+        """ the size of the next batch; `gen_batches` should call this for each batch it generates, in order """
+        if self.batch_sizing is None:
+            return self.batch_size
+
+        i, self._sized = self._sized, self._sized + 1
+        if self.journal is None:
+            return self.batch_sizing.size
+        # a resumed run makes the same batches as the run it resumes, so batch indices mean the same rows
+        size = self.journal.sizes.get(i, self.batch_sizing.size)
+        self.journal.record_size(i, size)
+        return size
+
+
+    def fingerprint(self, subject:TIn) -> str:
+        """ a digest of `subject`, identifying it to the `journal`; by default, of its pickle """
+        return hashlib.sha256(pickle.dumps(subject, protocol=pickle.HIGHEST_PROTOCOL)).hexdigest()
+
+
+    def open_journal(self, subject:TIn) -> set[int]:
+        """ open the `journal` for a run over `subject`; get the indices of batches completed by a failed run with the same subject and batching """
+        if self.journal is None:
+            return set()
+        key = json.dumps({
+            'step':f'{type(self).__module__}.{type(self).__qualname__}',
+            'batch_size':self.batch_size,
+            'subject':self.fingerprint(subject),
+        })
+        return self.journal.open(hashlib.sha256(key.encode()).hexdigest())
+
+
+    def get_batch_length(self, batch:TBatch) -> int:
+        """ the number of rows (or items) in `batch` """
+        return len(batch) # type: ignore
+
+
+    def get_batch_bytes(self, batch:TBatch) -> int|None:
+        """ the size of `batch` in bytes, if known; used by `AdaptiveBatchSize.target_bytes` """
+        return None
+
+
+    def split_batch(self, batch:TBatch, size:int) -> list[TBatch]:
+        """ split `batch` into batches of at most `size`; batches that can't be split are returned whole """
+        return [batch]
+
+
     def on_batch_error(self, retry: _Retry[TBatch], exc: Exception) -> None:
         # default: just log; override in subclass for backoff, metrics, etc.
         logging.warning(f"batch {retry.i} failed (try={retry.try_}): {exc}")
 
 
+    def on_batch_complete(self, i:int) -> None:
+        """ called once batch `i` has been handled successfully """
+        ...
+
+
+    def complete_batch(self, i:int) -> None:
+        """ journal batch `i` as completed, then call `on_batch_complete` """
+        if self.journal is not None:
+            self.journal.record(i)
+        self.on_batch_complete(i)
+
+
     def handle_batch(self, batch:TBatch) -> None:
         self.batch.set(batch)
         try:
             for step in self.steps:
-                step.do()
+                with measure(type(step).__name__, step):
+                    step.do()
         finally:
             # clear the batch on successful completion or on error
             self.batch.set(None)
@@ -54,6 +165,32 @@ class BatchProcessor[TIn, TBatch](Step):
         # get the subject; throw an error if it's not available
         subject = self.subject.get_value()
 
+        self.retry_stats = RetryStats()
+        self._sized = 0
+        if self.batch_sizing is not None:
+            self.batch_sizing.begin(self.batch_size)
+        skip = self.open_journal(subject)
+        opens = self.circuit_breaker.opens if self.circuit_breaker is not None else 0
+        try:
+            if self.max_workers:
+                self.do_concurrently(subject, skip)
+            else:
+                self.do_sequentially(subject, skip)
+        finally:
+            if self.circuit_breaker is not None:
+                self.retry_stats.breaker_opens = self.circuit_breaker.opens - opens
+            self.report_retries()
+            self.report_batch_sizes()
+            if self.journal is not None:
+                self.journal.close()
+
+        # every batch completed; the journal is only needed to resume a failed run
+        if self.journal is not None:
+            self.journal.clear()
+
+
+    def do_sequentially(self, subject:TIn, skip:Collection[int]=()) -> None:
+        """ handle batches one at a time, except those in `skip`; failed batches are retried once every batch has been tried """
         # generated an enumerated iterable of batches
         batches = enumerate(self.gen_batches(subject))
 
@@ -61,44 +198,280 @@ class BatchProcessor[TIn, TBatch](Step):
         to_retry:deque[_Retry[TBatch]] = deque()
 
         for i, batch in batches:
+            if i in skip:
+                continue
+            retry = _Retry(i, batch)
             try:
-                self.handle_batch(batch)
+                self.attempt(retry, self.handle_batch)
             except Exception as e:
-                retry = _Retry(i, batch)
                 self.on_batch_error(retry, e)
+                self.schedule_retry(retry, e)
                 to_retry.append(retry)
+            else:
+                self.complete_batch(i)
 
-        # while there are _Retries handle them until their `try_` exceeds `self.max_retries`
+        # while there are _Retries handle them until they succeed, or `schedule_retry` gives up on them
         while to_retry:
             retry = to_retry.popleft()
             try:
-                logging.info(f"retrying, {retry.i}, try={retry.try_ + 1}/{self.max_retries}")
-                self.handle_batch(retry.batch)
+                logging.info(f"retrying, {retry.i}, try={retry.try_}/{self.max_retries}")
+                self.attempt(retry, self.handle_batch)
             
             except Exception as e:
-                if retry.try_ >= self.max_retries:
-                    logging.info(f'retries exhausted for batch {retry.i}')
-                    raise
-                
                 logging.info(f'{retry.i}, {e}')
-                retry.try_ += 1
+                self.schedule_retry(retry, e)
                 to_retry.append(retry)
+            else:
+                self.complete_batch(retry.i)
 
         logging.info('done!')
+
+
+    def attempt(self, retry:_Retry[TBatch], handle:Callable[[TBatch], None]) -> None:
+        """ `handle` the batch of `retry` once any open circuit breaker has closed, backing off first if it's a retry.
+            if sizing is adaptive, a retried batch is first split to the current batch size, and only the parts not yet handled are retried """
+        paused = self.circuit_breaker.wait() if self.circuit_breaker is not None else 0.
+        backoff = self.retry_policy.get_backoff(retry.try_)
+        if backoff > 0:
+            sleep(backoff)
+        if paused or backoff:
+            with self._stats_lock:
+                self.retry_stats.paused_time += paused
+                self.retry_stats.backoff_time += backoff
+
+        if self.batch_sizing is None:
+            self.attempt_part(retry, retry.batch, handle)
+            return
+
+        parts = retry.parts if retry.parts is not None else [retry.batch]
+        if retry.try_ > 0:
+            # re-split to the (stepped-down) batch size, so a batch too large to handle can succeed on retry
+            parts = [p for part in parts for p in self.split_batch(part, self.batch_sizing.size)]
+        retry.parts = parts
+        while parts:
+            self.attempt_part(retry, parts[0], handle)
+            parts.pop(0)
+
+
+    def attempt_part(self, retry:_Retry[TBatch], batch:TBatch, handle:Callable[[TBatch], None]) -> None:
+        """ `handle` `batch`, all or part of the batch of `retry`, recording the outcome to any circuit breaker and adaptive sizing """
+        start = perf_counter()
+        try:
+            with measure(f'batch {retry.i}' if retry.try_ == 0 else f'batch {retry.i} (try {retry.try_})'):
+                handle(batch)
+        except Exception:
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.record(False)
+            if self.batch_sizing is not None:
+                self.batch_sizing.fail(self.get_batch_length(batch))
+            raise
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.record(True)
+        if self.batch_sizing is not None:
+            nbytes = self.get_batch_bytes(batch) if self.batch_sizing.target_bytes is not None else None
+            self.batch_sizing.record(self.get_batch_length(batch), perf_counter() - start, nbytes)
+
+
+    def schedule_retry(self, retry:_Retry[TBatch], error:Exception) -> None:
+        """ count another try of `retry`; raise `error` if it isn't retryable, the batch's retries are exhausted or the run's retry budget is spent """
+        policy = self.retry_policy
+        if not policy.is_retryable(error):
+            logging.error(f'batch {retry.i} failed with a non-retryable {type(error).__name__}')
+            raise error
+
+        if retry.try_ >= policy.max_retries:
+            logging.info(f'retries exhausted for batch {retry.i}')
+            raise error
+
+        with self._stats_lock:
+            if policy.budget is not None and self.retry_stats.retries >= policy.budget:
+                logging.error(f'retry budget of {policy.budget} retries exhausted at batch {retry.i}')
+                raise error
+            self.retry_stats.retries += 1
+
+        retry.try_ += 1
+        retry.error = error
+
+
+    def report_retries(self) -> None:
+        """ log retry counts and waits, and record them to the active report """
+        stats = self.retry_stats
+        if stats.retries or stats.paused_time:
+            logging.info(f'{stats.retries} retries; {stats.backoff_time:.1f}s backing off, {stats.paused_time:.1f}s paused by the circuit breaker ({stats.breaker_opens} opens)')
+        record_metrics(**asdict(stats))
+
+
+    def report_batch_sizes(self) -> None:
+        """ log the batch sizes used, and record them to the active report, if sizing is adaptive """
+        if self.batch_sizing is None:
+            return
+        stats = self.batch_sizing.stats
+        if stats.batches:
+            logging.info(f'{stats.batches} batches of {stats.min_size}-{stats.max_size} rows (mean {stats.rows / stats.batches:.0f}); '
+                         f'{stats.adjustments} adjustments, {stats.step_downs} step-downs; next batch size {stats.final_size}')
+        record_metrics(batch_sizes=asdict(stats))
+
+
+    def get_local_references(self) -> list[Reference]:
+        """ get the references each worker of `do_concurrently` has its own copy of: `batch`, and the references nested `steps`
+            pass between themselves (written by one and read by another); references only written (results, like an
+            `Append`'s `append_to`) are shared """
+        reads = {id(root_of(r)) for step in self.steps for r in step.get_reads()}
+        local = {id(self.batch):self.batch}
+        for step in self.steps:
+            for reference in step.get_writes():
+                if id(root := root_of(reference)) in reads:
+                    local.setdefault(id(root), root)
+        return list(local.values())
+
+
+    def do_concurrently(self, subject:TIn, skip:Collection[int]=()) -> None:
+        """ handle batches, except those in `skip`, on `max_workers` threads; each thread handles batches with its own copy of this step, rebound to
+            its own copies of the `get_local_references`. failed batches are retried in rounds, once the previous round has completed """
+        local = self.get_local_references()
+        workers = threading.local()
+
+        def handle(retry:_Retry[TBatch]) -> None:
+            worker:BatchProcessor[TIn, TBatch]|None = getattr(workers, 'processor', None)
+            if worker is None:
+                references = {}
+                for reference in local:
+                    references[id(reference)] = own = copy(reference)
+                    own.value = None
+                worker = workers.processor = self.rebind(references)
+            self.attempt(retry, worker.handle_batch)
+
+        with ThreadPoolExecutor(self.max_workers, thread_name_prefix='batch') as pool:
+            failed = self.handle_concurrently(pool, handle, (_Retry(i, batch) for i, batch in enumerate(self.gen_batches(subject)) if i not in skip))
+
+            # while there are _Retries handle them until they succeed, or `schedule_retry` gives up on them
+            while failed:
+                for retry in failed:
+                    logging.info(f"retrying, {retry.i}, try={retry.try_}/{self.max_retries}")
+                failed = self.handle_concurrently(pool, handle, failed)
+
+        logging.info('done!')
+
+
+    def handle_concurrently(self, pool:ThreadPoolExecutor, handle:Callable[[_Retry[TBatch]], None], retries:Iterable[_Retry[TBatch]]) -> list[_Retry[TBatch]]:
+        """ submit `handle(retry)` for each of `retries` to `pool`, keeping at most `max_in_flight` in flight; get those to retry """
+        max_in_flight = max(1, self.max_in_flight or 2 * (self.max_workers or 1))
+        in_flight:dict[Future, _Retry[TBatch]] = {}
+        failed:list[_Retry[TBatch]] = []
+
+        def complete(future:Future) -> None:
+            retry = in_flight.pop(future)
+            try:
+                future.result()
+            except Exception as e:
+                if retry.try_ == 0:
+                    self.on_batch_error(retry, e)
+                else:
+                    logging.info(f'{retry.i}, {e}')
+                self.schedule_retry(retry, e)
+                failed.append(retry)
+            else:
+                self.complete_batch(retry.i)
+
+        def complete_next() -> None:
+            if self.ordered:
+                # dicts are ordered; the oldest batch in flight is first
+                complete(next(iter(in_flight)))
+                return
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=lambda f: in_flight[f].i):
+                complete(future)
+
+        try:
+            for retry in retries:
+                while len(in_flight) >= max_in_flight:
+                    complete_next()
+                # copy the context so each batch records to the active run report
+                in_flight[pool.submit(copy_context().run, handle, retry)] = retry
+            while in_flight:
+                complete_next()
+        except BaseException:
+            for future in in_flight:
+                future.cancel()
+            raise
+
+        return failed
     
 
-    def preflight(self):
+    def get_preflight_checks(self) -> list[PreflightCheck]:
         """ perform preflight for nested steps """
-        for step in self.steps:
-            step.preflight()
+        return [check for step in self.steps for check in step.get_preflight_checks()]
+
+
+    @property
+    def side_effects(self) -> bool:
+        return any(step.side_effects for step in self.steps)
+
+
+    def get_reads(self) -> list[Reference]:
+        """ the subject, and anything read by nested steps """
+        return [self.subject] + [r for step in self.steps for r in step.get_reads()]
+
+
+    def get_writes(self) -> list[Reference]:
+        """ the batch, and anything written by nested steps """
+        return [self.batch] + [r for step in self.steps for r in step.get_writes()]
+
+
+def copy_on_write() -> bool:
+    """ True if pandas copy-on-write is enabled (`pandas.set_option('mode.copy_on_write', True)`, or `--copy-on-write`) """
+    return options.mode.copy_on_write is True
 
 
 class BatchProcessDataFrame(BatchProcessor[DataFrame, DataFrame]):
-    def __init__(self, subject: Reference[DataFrame], batch: Reference[DataFrame], steps: list[Step], *, batch_size: int = 1000):
-        super().__init__(subject, batch, steps, batch_size=batch_size)
+    def __init__(self, subject: Reference[DataFrame], batch: Reference[DataFrame], steps: list[Step], *, batch_size: int = 1000,
+                 max_workers:int|None=None, max_in_flight:int|None=None, ordered:bool=True, retry_policy:RetryPolicy|None=None, circuit_breaker:CircuitBreaker|None=None,
+                 batch_sizing:AdaptiveBatchSize|None=None, journal:BatchJournal|None=None, views:bool=False):
+        super().__init__(subject, batch, steps, batch_size=batch_size, max_workers=max_workers, max_in_flight=max_in_flight, ordered=ordered,
+                         retry_policy=retry_policy, circuit_breaker=circuit_breaker, batch_sizing=batch_sizing, journal=journal)
+        # if set (and pandas copy-on-write is enabled), batches are views of the subject, copied only if and when a nested step writes to them
+        self.views = views
+
+
+    def slice_batch(self, df: DataFrame, start: int, stop: int) -> DataFrame:
+        """ rows `start` to `stop` of `df`, as a view if `views` is set and copy-on-write is enabled, else as a copy """
+        batch = df.iloc[start : stop, :]
+        return batch if self.views and copy_on_write() else batch.copy()
 
 
     def gen_batches(self, subject: DataFrame) -> Iterable[DataFrame]:
+            if self.views and not copy_on_write():
+                # without copy-on-write, writes to a view could reach the subject
+                logging.warning('pandas copy-on-write is not enabled (see `--copy-on-write`); batches will be copies, not views')
+
             n = len(subject.index)
-            for start in range(0, n, self.batch_size):
-                yield subject.iloc[start : start + self.batch_size, :].copy()
\ No newline at end of file
+            start = 0
+            while start < n:
+                # the size may change between batches, if sizing is adaptive
+                size = self.get_batch_size()
+                yield self.slice_batch(subject, start, start + size)
+                start += size
+
+
+    def fingerprint(self, subject: DataFrame) -> str:
+        """ a digest of the index, columns, dtypes and values of `subject` """
+        try:
+            hashes = hash_pandas_object(subject, index=True)
+        except TypeError:
+            # unhashable values (lists, dicts)
+            return super().fingerprint(subject)
+        digest = hashlib.sha256(hashes.to_numpy().tobytes())
+        digest.update(repr((subject.columns.to_list(), subject.dtypes.astype(str).to_list())).encode())
+        return digest.hexdigest()
+
+
+    def get_batch_length(self, batch: DataFrame) -> int:
+        return len(batch.index)
+
+
+    def split_batch(self, batch: DataFrame, size: int) -> list[DataFrame]:
+        return [self.slice_batch(batch, start, start + size) for start in range(0, len(batch.index), size)]
+
+
+    def get_batch_bytes(self, batch: DataFrame) -> int|None:
+        return int(batch.memory_usage(index=True, deep=True).sum())
\ No newline at end of file
@@ -0,0 +1,115 @@
+from dataclasses import dataclass, field
+import logging
+import threading
+
+
+@dataclass
+class BatchSizeStats:
+    """ the batch sizes used during a run """
+    batches:int = 0
+    rows:int = 0
+    min_size:int|None = None
+    max_size:int|None = None
+    final_size:int|None = None      # the size of the next batch, as of the end of the run
+    adjustments:int = 0
+    step_downs:int = 0
+
+
+@dataclass
+class AdaptiveBatchSize:
+    """ sizes batches to take about `target_latency` seconds, or to hold about `target_bytes`, within [`floor`, `ceiling`].
+        after each successful batch the next size moves toward the size expected to meet the target (the smaller, if both are set),
+        changing by at most `max_growth` times. after a failed batch the size is `step_down` times that batch's, and is held
+        at or below that until `recovery` batches have succeeded """
+    target_latency:float|None = None
+    target_bytes:int|None = None
+    floor:int = 10
+    ceiling:int = 100_000
+    initial:int|None = None         # the first batch size; the processor's `batch_size` by default
+    max_growth:float = 2.
+    step_down:float = .5
+    recovery:int = 20
+    smoothing:float = .5            # the weight of the latest batch in the running per-row cost estimates
+    tolerance:float = .1            # sizes within this fraction of the current size are not worth changing to
+    size:int = field(default=0, init=False)
+    stats:BatchSizeStats = field(default_factory=BatchSizeStats, init=False)
+
+    _seconds_per_row:float|None = field(default=None, init=False, repr=False)
+    _bytes_per_row:float|None = field(default=None, init=False, repr=False)
+    _limit:int|None = field(default=None, init=False, repr=False)
+    _successes:int = field(default=0, init=False, repr=False)
+    _lock:threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+
+    def __post_init__(self) -> None:
+        if self.target_latency is None and self.target_bytes is None:
+            raise ValueError('AdaptiveBatchSize needs a target_latency or a target_bytes')
+        if not 0 < self.floor <= self.ceiling:
+            raise ValueError(f'expected 0 < floor <= ceiling, got floor={self.floor}, ceiling={self.ceiling}')
+
+
+    def begin(self, default:int) -> None:
+        """ start a run: reset the stats; the first run starts at `initial` (or `default`), later ones where the last left off """
+        with self._lock:
+            if not self.size:
+                self.size = self.clamp(self.initial or default)
+            self.stats = BatchSizeStats(final_size=self.size)
+
+
+    def clamp(self, size:float) -> int:
+        return max(self.floor, min(self.ceiling, int(size)))
+
+
+    def record(self, rows:int, seconds:float, nbytes:int|None=None) -> None:
+        """ record a successful batch of `rows` that took `seconds` (and held `nbytes`), then adjust the size toward the target """
+        if rows <= 0:
+            return
+        with self._lock:
+            stats = self.stats
+            stats.batches += 1
+            stats.rows += rows
+            stats.min_size = rows if stats.min_size is None else min(stats.min_size, rows)
+            stats.max_size = rows if stats.max_size is None else max(stats.max_size, rows)
+
+            self._seconds_per_row = self._smooth(self._seconds_per_row, seconds / rows)
+            if nbytes is not None:
+                self._bytes_per_row = self._smooth(self._bytes_per_row, nbytes / rows)
+
+            self._successes += 1
+            if self._limit is not None and self._successes >= self.recovery:
+                self._limit = None
+
+            ideals = []
+            if self.target_latency is not None and self._seconds_per_row:
+                ideals.append(self.target_latency / self._seconds_per_row)
+            if self.target_bytes is not None and self._bytes_per_row:
+                ideals.append(self.target_bytes / self._bytes_per_row)
+            if not ideals:
+                return
+
+            size = self.clamp(min(self.size * self.max_growth, max(self.size / self.max_growth, min(ideals))))
+            if self._limit is not None:
+                size = min(size, self._limit)
+            if abs(size - self.size) <= self.tolerance * self.size:
+                return
+            logging.info(f'batch size {self.size} -> {size} ({rows} rows took {seconds:.2f}s{"" if nbytes is None else f", {nbytes / 2**20:.1f}MiB"})')
+            self.size = stats.final_size = size
+            stats.adjustments += 1
+
+
+    def fail(self, rows:int) -> None:
+        """ record a failed batch of `rows`, stepping the size down """
+        with self._lock:
+            # batches generated at the same size and failing together (on concurrent workers) step the size down once
+            size = min(self.size, self.clamp(rows * self.step_down))
+            self._limit = size if self._limit is None else min(self._limit, size)
+            self._successes = 0
+            if size == self.size:
+                return
+            logging.info(f'batch failed; batch size {self.size} -> {size}')
+            self.size = self.stats.final_size = size
+            self.stats.step_downs += 1
+
+
+    def _smooth(self, estimate:float|None, sample:float) -> float:
+        return sample if estimate is None else self.smoothing * sample + (1 - self.smoothing) * estimate
\ No newline at end of file
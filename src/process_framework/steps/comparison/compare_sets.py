@@ -16,6 +16,6 @@ class CompareSets(AssigningStep[Series]):
         
         return Series(
             list(
-                set(self.a.value).difference(self.b.value) # type: ignore
+                set(self.a.get_value()).difference(self.b.get_value()) # type: ignore
             )
         )
\ No newline at end of file
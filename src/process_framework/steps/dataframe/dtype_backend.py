@@ -0,0 +1,107 @@
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+#   Arrow-backed columns for source steps               #
+#                                                       #
+#   Scan, SQL and Solr results are built from Python    #
+#       objects; string columns end up as object        #
+#       columns of one Python string per value          #
+#                                                       #
+#   `dtype_backend='pyarrow_strings'` converts string   #
+#       columns (and the index) to `string[pyarrow]`;   #
+#       `'pyarrow'` converts every column to an         #
+#       `ArrowDtype` (as `convert_dtypes` does)         #
+#                                                       #
+#   Either needs pyarrow (the `arrow` extra)            #
+#                                                       #
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+
+# stdlib
+from typing import Literal
+
+# third-party
+import pandas as pd
+from pandas import DataFrame, Index, Series
+from pandas.api.types import infer_dtype, is_object_dtype
+
+DtypeBackend = Literal['pyarrow', 'pyarrow_strings']
+DTYPE_BACKENDS = ('pyarrow', 'pyarrow_strings')
+
+# the dtype string columns are converted to
+ARROW_STRING = 'string[pyarrow]'
+
+
+def check_dtype_backend(dtype_backend:str|None) -> None:
+    """ raise if `dtype_backend` isn't None or one of `DTYPE_BACKENDS`, or if pyarrow isn't installed to back it """
+    if dtype_backend is None:
+        return
+    if dtype_backend not in DTYPE_BACKENDS:
+        raise ValueError(f'expected `dtype_backend` to be one of {DTYPE_BACKENDS} or None, got {dtype_backend!r}')
+    try:
+        import pyarrow # noqa: F401
+    except ImportError as e:
+        raise ImportError(f'`dtype_backend={dtype_backend!r}` needs pyarrow; install the `arrow` extra') from e
+
+
+def is_strings(values:Series|Index) -> bool:
+    """ True if `values` is an object column of strings (and nulls) """
+    return is_object_dtype(values.dtype) and infer_dtype(values, skipna=True) in ('string', 'empty')
+
+
+def string_dtype(dtype_backend:str|None) -> str|type:
+    """ the dtype to give a column of strings: `str` (an object column) by default, or `string[pyarrow]` """
+    return str if dtype_backend is None else ARROW_STRING
+
+
+def _convert_index(index:Index, dtype_backend:DtypeBackend) -> Index:
+    if isinstance(index, pd.MultiIndex):
+        return index.set_levels([_convert_index(level, dtype_backend) for level in index.levels])
+    if is_strings(index):
+        return index.astype(ARROW_STRING)
+    if dtype_backend == 'pyarrow' and index.dtype.kind in 'biufM' and not isinstance(index, pd.RangeIndex):
+        return index.astype(pd.ArrowDtype(_arrow_type(index)))
+    return index
+
+
+def _arrow_type(values:Series|Index):
+    import pyarrow as pa
+    return pa.from_numpy_dtype(values.dtype)
+
+
+def to_dtype_backend[V:(DataFrame, Series, Index)](value:V, dtype_backend:str|None) -> V:
+    """ `value` with its columns (or values) and index backed by arrow as set by `dtype_backend`; as is if `dtype_backend` is None.
+        columns that can't be converted (lists, dicts, mixed types) are left as they are. a frame's index may be replaced in place """
+    if dtype_backend is None:
+        return value
+    check_dtype_backend(dtype_backend)
+
+    if isinstance(value, Index):
+        return _convert_index(value, dtype_backend)
+
+    if dtype_backend == 'pyarrow':
+        # numbers, booleans, timestamps and strings; `infer_objects=True` would also try to convert object columns of ints etc.
+        value = value.convert_dtypes(dtype_backend='pyarrow')
+    elif isinstance(value, Series):
+        if is_strings(value):
+            value = value.astype(ARROW_STRING)
+    else:
+        strings = [column for column in value.columns if is_strings(value[column])]
+        if strings:
+            value = value.astype({column:ARROW_STRING for column in strings})
+
+    value.index = _convert_index(value.index, dtype_backend)
+    return value
+
+
+def to_list(values:Series) -> list:
+    """ `values` as a list of python scalars, as `Series.to_list` gives (nulls are None, NaN or NaT), but converted by pyarrow
+        if they're arrow-backed, rather than element by element; arrow timestamps go through numpy, which boxes them faster """
+    dtype = values.dtype
+    if isinstance(dtype, pd.ArrowDtype):
+        import pyarrow as pa
+        if pa.types.is_timestamp(dtype.pyarrow_dtype):
+            unit, tz = dtype.pyarrow_dtype.unit, dtype.pyarrow_dtype.tz
+            return values.astype(pd.DatetimeTZDtype(unit, tz) if tz else f'datetime64[{unit}]').to_list()
+        return pa.array(values.array).to_pylist()
+    if isinstance(dtype, pd.StringDtype) and dtype.storage == 'pyarrow':
+        import pyarrow as pa
+        return pa.array(values.array).to_pylist()
+    return values.to_list()
\ No newline at end of file
@@ -0,0 +1,132 @@
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+#   Run a `TransformingStep.transform` in processes     #
+#                                                       #
+#   CPU-bound transforms (building documents,           #
+#       validating models, geometry) hold the GIL; a    #
+#       `ProcessPoolTransform` runs one over row        #
+#       partitions of its subject in a process pool     #
+#                                                       #
+#   The subject is put in shared memory once (see       #
+#       `references.shared`); each task pickles only    #
+#       the step, a handle and a row range, and         #
+#       workers attach to the subject without copying   #
+#                                                       #
+#   Results are pickled back and concatenated           #
+#                                                       #
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+
+# stdlib
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from typing import Any
+
+# third-party
+import pandas as pd
+from pandas import DataFrame, Index, Series
+
+# first-party
+from ..transforming_step import TransformingStep
+from ..preflight import PreflightCheck
+from ...references.reference import Reference, root_of
+from ...references.shared import SharedValue
+from ...instrumentation import record_metrics
+
+
+class ProcessPoolTransform[T1:(DataFrame, Series, Index), T2](TransformingStep[T1, T2]):
+    """ do `step` by running its `transform` over `partitions` row ranges of its subject (`max_workers` * 4 by default) on a pool of
+        `max_workers` processes, and concatenating the results. subjects of fewer than `min_rows` rows are transformed in this process.
+        `transform` must return a value (in-place modifications would be made to a worker's read-only view), depend only on its subject
+        and the step's own attributes (references are not sent to workers), and the step must pickle. a subject that can't be shared
+        (e.g. a `GeoDataFrame`) is pickled to the workers by partition instead """
+    def __init__(self, step:TransformingStep[T1, T2], max_workers:int|None=None, partitions:int|None=None, *, min_rows:int=10_000,
+                 mp_context:str|None=None) -> None:
+        super().__init__(step.subject_reference, step.assign_to, overwrite=step.overwrite, memoize=step.memoize)
+        self.step = step
+        self.max_workers = max_workers
+        self.partitions = partitions
+        self.min_rows = min_rows
+        self.mp_context = mp_context
+
+
+    def get_worker_step(self) -> TransformingStep[T1, T2]:
+        """ a copy of `step` to send to workers, with its references replaced by empty ones so their values aren't pickled """
+        roots = {id(root):root for root in map(root_of, (*self.step.get_reads(), *self.step.get_writes()))}
+        step = self.step.rebind({key:Reference(root._type) for key, root in roots.items()})
+        step._memo = None
+        return step
+
+
+    def get_ranges(self, rows:int, workers:int) -> list[tuple[int, int]]:
+        partitions = max(1, min(rows, self.partitions or workers * 4))
+        bounds = [rows * i // partitions for i in range(partitions + 1)]
+        return list(zip(bounds[:-1], bounds[1:]))
+
+
+    def transform(self, subject:T1) -> T2|None:
+        if len(subject) < self.min_rows:
+            return self.step.transform(subject)
+
+        workers = self.max_workers or multiprocessing.cpu_count()
+        ranges = self.get_ranges(len(subject), workers)
+        step = self.get_worker_step()
+        context = multiprocessing.get_context(self.mp_context) if self.mp_context else None
+
+        try:
+            shared = SharedValue.share(subject)
+        except TypeError as e:
+            logging.info(f'{type(self.step).__name__}: {e}; sending partitions to workers by pickling')
+            shared = None
+
+        try:
+            with ProcessPoolExecutor(workers, mp_context=context) as pool:
+                if shared is not None:
+                    results = list(pool.map(_transform_range, *zip(*((step, shared, start, stop) for start, stop in ranges))))
+                else:
+                    results = list(pool.map(_transform_partition, *zip(*((step, _slice(subject, start, stop)) for start, stop in ranges))))
+        finally:
+            if shared is not None:
+                shared.unlink()
+
+        record_metrics(partitions=len(ranges), workers=workers, shared=shared is not None)
+        return combine(results)
+
+
+    def get_preflight_checks(self) -> list[PreflightCheck]:
+        return self.step.get_preflight_checks()
+
+
+    def get_reads(self) -> list[Reference]:
+        return self.step.get_reads()
+
+
+    def get_writes(self) -> list[Reference]:
+        return self.step.get_writes()
+
+
+def combine(results:list[Any]) -> Any:
+    """ concatenate the results of partitions, in order """
+    if any(result is None for result in results):
+        raise TypeError('a `ProcessPoolTransform` step must return its result; modifying the subject in place is not supported')
+    first = results[0]
+    if isinstance(first, (DataFrame, Series)):
+        return pd.concat(results)
+    if isinstance(first, Index):
+        return first.append(results[1:])
+    if isinstance(first, list):
+        return list(chain.from_iterable(results))
+    raise TypeError(f'expected partition results to be DataFrames, Series, Indexes or lists, got {type(first).__name__}')
+
+
+def _slice(subject:Any, start:int, stop:int) -> Any:
+    return subject[start:stop] if isinstance(subject, Index) else subject.iloc[start:stop]
+
+
+def _transform_range(step:TransformingStep, shared:SharedValue, start:int, stop:int) -> Any:
+    # runs in a worker; the subject is attached to once per worker
+    return step.transform(_slice(shared.attach(), start, stop))
+
+
+def _transform_partition(step:TransformingStep, partition:Any) -> Any:
+    return step.transform(partition)
@@ -1,7 +1,37 @@
-from .document import Document
-from .documents_from_dataframe import DataFrameToDocuments
-from .index_documents import IndexDocuments
-from .assign_scan_result import ScanToDataFrame
-from .delete_by_id import DeleteById
-from .execute_enrich_policy import ExecutePolicy
-from .update_by_query import UpdateByQuery
\ No newline at end of file
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .document import Document
+    from .documents_from_dataframe import DataFrameToDocuments
+    from .index_documents import IndexDocuments
+    from .assign_scan_result import ScanToDataFrame
+    from .delete_by_id import DeleteById
+    from .execute_enrich_policy import ExecutePolicy
+    from .update_by_query import UpdateByQuery
+    from .async_assign_scan_result import AsyncScanToDataFrame
+    from .async_index_documents import AsyncIndexDocuments
+    from .errors import is_transient
+    from .hit_decoding import Flattening
+
+# steps depend on elasticsearch and pandas; import each from its module on first use
+_LAZY = {
+    'Document':'.document',
+    'DataFrameToDocuments':'.documents_from_dataframe',
+    'IndexDocuments':'.index_documents',
+    'ScanToDataFrame':'.assign_scan_result',
+    'DeleteById':'.delete_by_id',
+    'ExecutePolicy':'.execute_enrich_policy',
+    'UpdateByQuery':'.update_by_query',
+    'AsyncScanToDataFrame':'.async_assign_scan_result',
+    'AsyncIndexDocuments':'.async_index_documents',
+    'is_transient':'.errors',
+    'Flattening':'.hit_decoding',
+}
+__all__ = list(_LAZY)
+
+
+def __getattr__(name:str):
+    if name in _LAZY:
+        return getattr(import_module(_LAZY[name], __name__), name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
\ No newline at end of file
@@ -3,15 +3,29 @@ from ..assigning_step import AssigningStep
 from pandas import DataFrame, Series
 from elasticsearch.client import Elasticsearch
 from elasticsearch.helpers import scan
-from typing import Iterable, Any, cast
+from typing import Iterable, Iterator, Any, cast
 from itertools import islice
+from contextlib import closing
+from .preflight import elasticsearch_info, index_exists
+from ..preflight import PreflightCheck
+from ..dataframe.dtype_backend import DtypeBackend, check_dtype_backend, to_dtype_backend
+from .slicing import check_slices, merge_slices, slice_query
+from .hit_decoding import Flattening, HitDecoder
+from .point_in_time import ScanEngine, PitCursor, check_scan_engine, pit_filter_path, pit_scan, point_in_time
+from ..retry_policy import RetryPolicy
+from ...instrumentation import record_metrics
 
 DEFAULT_FILTER_PATH = 'index,took,hits.hits._id,hits.hits._source,_scroll_id,_shards'
 
 class ScanToDataFrame[T:(Series, DataFrame)](AssigningStep[T]):
-    """ assign the result of an ElasticSearch index scan to a context """
+    """ assign the result of an ElasticSearch index scan to a context; set `dtype_backend` for arrow-backed columns (see `steps.dataframe.dtype_backend`),
+        and `slices` to scan that many sliced scrolls concurrently (see `steps.elasticsearch.slicing`); rows are then in no particular order.
+        with `engine='pit'`, the index is scanned through a point in time with `search_after` rather than scrolled (see
+        `steps.elasticsearch.point_in_time`), and pages that fail as `retry_policy` allows are retried from where the scan had got to.
+        nested objects in `_source` are kept as dicts, or flattened to columns as set by `flatten` (see `steps.elasticsearch.hit_decoding`) """
     def __init__(self, assign_to:Reference[T], elasticsearch:Elasticsearch, index:str, source:str|list[str]|bool|None, query:dict[str, Any]|None=None, dtypes:dict[str, Any]|None=None, keep_columns:list[str]|None=None, *, 
-                 limit:int|None=None, size:int=1000, filter_path:str|None=DEFAULT_FILTER_PATH, overwrite:bool=True):
+                 limit:int|None=None, size:int=1000, filter_path:str|None=DEFAULT_FILTER_PATH, overwrite:bool=True, dtype_backend:DtypeBackend|None=None,
+                 slices:int|None=None, engine:ScanEngine='scroll', keep_alive:str='5m', retry_policy:RetryPolicy|None=None, flatten:Flattening|None=None):
         super().__init__(assign_to, overwrite=overwrite)
         self.elasticsearch = elasticsearch
         self.index = index
@@ -22,55 +36,69 @@ class ScanToDataFrame[T:(Series, DataFrame)](AssigningStep[T]):
         self.keep_columns = keep_columns
         self.filter_path = filter_path
         self.limit = limit
+        check_dtype_backend(dtype_backend)
+        self.dtype_backend = dtype_backend
+        check_slices(slices, query)
+        self.slices = slices or 1
+        check_scan_engine(engine)
+        self.engine = engine
+        self.keep_alive = keep_alive
+        self.retry_policy = retry_policy
+        self.flatten = flatten
        
 
     def scan(self) -> Iterable[dict]:
+        if self.engine == 'pit':
+            return self.pit_scan()
+        if self.slices > 1:
+            return merge_slices(self.scan_slice, self.slices, self.size)
+        return self.scan_slice(0)
+
+
+    def scan_slice(self, i:int) -> Iterator[dict]:
+        """ the hits of slice `i` of `slices` (all hits if there's one slice) """
         return scan(
             client=self.elasticsearch,
-            query=self.query,
+            query=slice_query(self.query, i, self.slices),
             index=self.index,
             size=self.size,
             source=self.source,
-            filter_path=self.filter_path
+            filter_path=self.filter_path,
+            scroll=self.keep_alive
         )
-        
 
-    @staticmethod
-    def hits_to_dataframe(hits:Iterable[dict], dtypes:dict[str,Any]|None=None, columns:list[str]|None=None, limit:int|None=None):
-        # build an `_id`-indexed dataframe from the `hits` iterator
-        df:DataFrame = DataFrame.from_records(
-            islice(hits, limit),  # type: ignore
-            index='_id', 
-            columns=['_id', '_index', '_source', '_fields']
-        )
 
-        if df.empty:
-            print('`df` is empty, returning an empty DataFrame')
-            return DataFrame()
+    def pit_scan(self) -> Iterator[dict]:
+        """ the hits of a point in time on `index`, sliced by `slices`; the point in time is closed once the hits are read (or the
+            iterator is closed) """
+        with point_in_time(self.elasticsearch, self.index, self.keep_alive) as pit_id:
+            cursors = [PitCursor(pit_id) for _ in range(self.slices)]
 
-        # unnest `_source` and `fields`, drop (plus column "index") if NA
-        for col in ('_source', '_fields', '_index'):
+            def scan_slice(i:int) -> Iterator[dict]:
+                return pit_scan(self.elasticsearch, cursors[i], self.query, size=self.size, keep_alive=self.keep_alive, source=self.source,
+                                filter_path=pit_filter_path(self.filter_path), slice_=(i, self.slices), retry_policy=self.retry_policy)
 
-            if (col not in df.columns):
-                continue
-            
-            if (df[col].isna().all()):
-                df = df.drop(col, axis=1)
-                continue
+            try:
+                yield from merge_slices(scan_slice, self.slices, self.size) if self.slices > 1 else scan_slice(0)
+            finally:
+                record_metrics(pages=sum(c.pages for c in cursors), page_retries=sum(c.retries for c in cursors))
+        
 
-            col_df = DataFrame.from_records(df[col].values, df.index) # type: ignore
-            col_df = col_df[col_df.columns.difference(df.columns)]
-            df = df.join(col_df, how='left').drop(col, axis=1)
+    @staticmethod
+    def hits_to_dataframe(hits:Iterable[dict], dtypes:dict[str,Any]|None=None, columns:list[str]|None=None, limit:int|None=None, dtype_backend:DtypeBackend|None=None,
+                          flatten:Flattening|None=None):
+        # build an `_id`-indexed dataframe from the `hits` iterator, decoding runs of hits as they arrive (see `HitDecoder`)
+        decoder = HitDecoder(dtypes, columns if isinstance(columns, list) else None, flatten, dtype_backend).extend(islice(hits, limit))
+        return ScanToDataFrame.decoded_to_dataframe(decoder)
 
-        # if `columns` has been passed as a list, keep only those columns
-        if isinstance(columns, list):
-            df = df[df.columns.intersection(columns)]
-        
-        # apply `dtypes` to columns that exist in the DataFrame
-        if isinstance(dtypes, dict):
-            df = df.astype({k:v for k, v in dtypes.items() if k in df.columns})
+    @staticmethod
+    def decoded_to_dataframe(decoder:HitDecoder):
+        # the frame of the hits `decoder` has decoded, or an empty one if there were none
+        if decoder.rows == 0:
+            print('`df` is empty, returning an empty DataFrame')
+            return DataFrame()
 
-        return df
+        return decoder.to_dataframe()
 
     def transform_result(self, result:DataFrame) -> T:
         # this needs overwriting if the default cases (DataFrame, Series and single-element 'field') are not true
@@ -114,12 +142,15 @@ class ScanToDataFrame[T:(Series, DataFrame)](AssigningStep[T]):
 
 
     def generate(self) -> T:
-        hits = self.scan()
-        result = ScanToDataFrame.hits_to_dataframe(hits, self.dtypes, self.keep_columns, self.limit)
+        # closing the scan once `limit` hits are read clears its scroll(s)
+        with closing(self.scan()) as hits: # type: ignore
+            result = ScanToDataFrame.hits_to_dataframe(hits, self.dtypes, self.keep_columns, self.limit, self.dtype_backend, self.flatten)
         result = self.handle_empty_result(result)
         return self.transform_result(result)
     
 
-    def preflight(self):
-        assert self.elasticsearch.info()
-        assert self.elasticsearch.indices.exists(index=self.index)
\ No newline at end of file
+    def get_preflight_checks(self) -> list[PreflightCheck]:
+        return [
+            elasticsearch_info(self.elasticsearch),
+            index_exists(self.elasticsearch, self.index)
+        ]
\ No newline at end of file
@@ -0,0 +1,104 @@
+from ...references.reference import Reference
+from ..async_step import AsyncStep, run_coroutine
+from .assign_scan_result import ScanToDataFrame, DEFAULT_FILTER_PATH
+from .slicing import slice_query
+from .hit_decoding import Flattening, HitDecoder
+from ..dataframe.dtype_backend import DtypeBackend
+from pandas import DataFrame, Series
+from elasticsearch import AsyncElasticsearch
+from elasticsearch.helpers import async_scan
+from contextlib import aclosing
+from typing import Any
+import asyncio
+
+class AsyncScanToDataFrame[T:(Series, DataFrame)](AsyncStep, ScanToDataFrame[T]):
+    """ assign the result of an ElasticSearch index scan to a context, using an `AsyncElasticsearch` client """
+    def __init__(self, assign_to:Reference[T], elasticsearch:AsyncElasticsearch, index:str, source:str|list[str]|bool|None, query:dict[str, Any]|None=None, dtypes:dict[str, Any]|None=None, keep_columns:list[str]|None=None, *, 
+                 limit:int|None=None, size:int=1000, filter_path:str|None=DEFAULT_FILTER_PATH, overwrite:bool=True, dtype_backend:DtypeBackend|None=None,
+                 slices:int|None=None, flatten:Flattening|None=None):
+        super().__init__(assign_to, elasticsearch, index, source, query, dtypes, keep_columns, # type: ignore
+                         limit=limit, size=size, filter_path=filter_path, overwrite=overwrite, dtype_backend=dtype_backend, slices=slices,
+                         flatten=flatten)
+        self.elasticsearch:AsyncElasticsearch = elasticsearch # type: ignore
+
+
+    async def ascan(self, decoder:HitDecoder) -> None:
+        """ decode hits from an async scroll (or `slices` sliced scrolls, concurrently) into `decoder` a page at a time, stopping
+            early at `limit` """
+        # pages are decoded one at a time, so slices don't add to `decoder` at once
+        lock = asyncio.Lock()
+        if self.slices > 1:
+            # an error in one slice cancels the others, whose scrolls are cleared as they close; it's raised as is, so retry
+            # policies (e.g. `is_transient`) see it rather than an `ExceptionGroup`
+            try:
+                async with asyncio.TaskGroup() as group:
+                    for i in range(self.slices):
+                        group.create_task(self.ascan_slice(i, decoder, lock))
+            except ExceptionGroup as errors:
+                raise errors.exceptions[0] from None
+            return
+        await self.ascan_slice(0, decoder, lock)
+
+
+    async def ascan_slice(self, i:int, decoder:HitDecoder, lock:asyncio.Lock) -> None:
+        """ decode the hits of slice `i` into `decoder` a page (of `size` hits) at a time, until it holds `limit` """
+        if self.full(decoder):
+            return
+        scan_ = async_scan(
+            client=self.elasticsearch,
+            query=slice_query(self.query, i, self.slices),
+            index=self.index,
+            size=self.size,
+            source=self.source,
+            filter_path=self.filter_path
+        )
+        page:list[dict] = []
+        # `aclosing` clears the scroll if we stop early
+        async with aclosing(scan_) as scan_:
+            async for hit in scan_:
+                page.append(hit)
+                if len(page) >= self.size or (self.limit is not None and decoder.rows + len(page) >= self.limit):
+                    await self.decode(page, decoder, lock)
+                    page = []
+                    if self.full(decoder):
+                        break
+        await self.decode(page, decoder, lock)
+
+
+    async def decode(self, page:list[dict], decoder:HitDecoder, lock:asyncio.Lock) -> None:
+        """ decode `page` into `decoder`, up to `limit` hits in all; decoding is cpu-bound, so it's kept off the event loop """
+        async with lock:
+            if self.limit is not None:
+                page = page[:max(self.limit - decoder.rows, 0)]
+            if page:
+                await asyncio.to_thread(decoder.extend, page)
+
+
+    def full(self, decoder:HitDecoder) -> bool:
+        return self.limit is not None and decoder.rows >= self.limit
+
+
+    async def agenerate(self) -> T:
+        decoder = HitDecoder(self.dtypes, self.keep_columns if isinstance(self.keep_columns, list) else None, self.flatten, self.dtype_backend)
+        await self.ascan(decoder)
+        # building the DataFrame is cpu-bound; keep it off the event loop
+        result = await asyncio.to_thread(ScanToDataFrame.decoded_to_dataframe, decoder)
+        result = self.handle_empty_result(result)
+        return self.transform_result(result)
+
+
+    def generate(self) -> T:
+        return run_coroutine(self.agenerate())
+
+
+    async def ado(self):
+        if self.assign_to.has_value() and not self.overwrite:
+            return self.assign_to.get_value()
+
+        result = await self.agenerate()
+        self.assign_to.set(result)
+
+
+    async def apreflight(self):
+        assert await self.elasticsearch.info()
+        assert await self.elasticsearch.indices.exists(index=self.index)
@@ -0,0 +1,66 @@
+from ...references.reference import Reference
+from ..async_step import AsyncStep
+from .document import Document
+from .index_documents import IndexDocuments
+from pandas import Series
+from elasticsearch import AsyncElasticsearch
+from elasticsearch.helpers import async_bulk
+from typing import Any, Tuple
+from logging import info
+import asyncio
+
+class AsyncIndexDocuments(AsyncStep, IndexDocuments):
+    """ index a `Series` of `Documents` using elasticsearch.helpers.async_bulk, sending up to `concurrency` bulk streams at once """
+    def __init__(self, subject:Reference[Series], elasticsearch:AsyncElasticsearch, index:str, pipeline:str|None=None, *, assign_result:Reference[Tuple]|None=None, assert_index_exists:bool=True,
+                 raise_on_error:bool=True, raise_on_exception:bool=True, max_retries:int=0, initial_backoff:int=2, 
+                 chunk_size:int=500, max_chunk_bytes:int=104857600, bulk_kwargs:dict[str, Any]|None=None, concurrency:int=1):
+        super().__init__(subject, elasticsearch, index, pipeline, assign_result=assign_result, assert_index_exists=assert_index_exists, # type: ignore
+                         raise_on_error=raise_on_error, raise_on_exception=raise_on_exception, max_retries=max_retries, initial_backoff=initial_backoff,
+                         chunk_size=chunk_size, max_chunk_bytes=max_chunk_bytes, bulk_kwargs=bulk_kwargs)
+        self.elasticsearch:AsyncElasticsearch = elasticsearch # type: ignore
+        self.concurrency = max(1, concurrency)
+
+
+    async def abulk(self, documents) -> tuple[int, Any]:
+        actions = Document.gen_bulk_index_actions(
+            index=self.index,
+            documents=documents
+        )
+        return await async_bulk(
+            client=self.elasticsearch,
+            actions=actions,
+            index=self.index,
+            pipeline=self.pipeline,
+            **self.bulk_kwargs
+        )
+
+
+    async def ado(self):
+        # perform assertions
+        assert self.subject.has_value()
+
+        # split the documents into `concurrency` contiguous parts, one bulk stream each
+        series:Series = self.subject.get_value() # type: ignore
+        documents = series.values
+        size = -(-len(documents) // self.concurrency) or 1
+        parts = [documents[start:start + size] for start in range(0, len(documents), size)]
+
+        results = await asyncio.gather(*(self.abulk(part) for part in parts))
+
+        # combine (success, errors) results; `errors` is an int if `stats_only` is passed in `bulk_kwargs`
+        success = sum(r[0] for r in results)
+        errors = [e for r in results for e in r[1]] if all(isinstance(r[1], list) for r in results) else sum(r[1] for r in results)
+        result = (success, errors)
+
+        if self.assign_result is not None:
+            self.assign_result.set(result)
+            
+        info(f'{result}')
+
+
+    async def apreflight(self):
+        assert await self.elasticsearch.info()
+        if self.assert_exists:
+            assert await self.elasticsearch.indices.exists(index=self.index)
+        if self.pipeline:
+            assert await self.elasticsearch.ingest.get_pipeline(id=self.pipeline)
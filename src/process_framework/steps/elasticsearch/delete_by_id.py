@@ -5,9 +5,13 @@ from elasticsearch.helpers import bulk
 from typing import Any, Tuple
 from logging import info
 from typing import Iterable
+from .preflight import elasticsearch_info, index_exists
+from ..preflight import PreflightCheck
 
 class DeleteById(Step):
     """ delete docs with `_ids` passed as `subject` from the specified `index` using the elasticsearch `bulk` helper"""
+    side_effects = True
+
     def __init__(self, subject:Reference[Iterable], elasticsearch:Elasticsearch, index:str, *, assign_result:Reference[Any]|None=None, assert_index_exists:bool=True):
         super().__init__()
         self.subject = subject
@@ -46,6 +50,8 @@ class DeleteById(Step):
             self.assign_result.set(result)
 
     
-    def preflight(self):
-        assert self.elasticsearch.info()
-        assert self.elasticsearch.indices.exists(index=self.index)
\ No newline at end of file
+    def get_preflight_checks(self) -> list[PreflightCheck]:
+        return [
+            elasticsearch_info(self.elasticsearch),
+            index_exists(self.elasticsearch, self.index)
+        ]
\ No newline at end of file
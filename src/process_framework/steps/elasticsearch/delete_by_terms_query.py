@@ -4,9 +4,13 @@ from typing import Any
 from typing import Iterable
 from itertools import batched
 import logging
+from .preflight import elasticsearch_info, index_exists
+from ..preflight import PreflightCheck
 
 class DeleteByTerms(Step):
     """ delete docs matching a `terms` query on values in the `subject` """
+    side_effects = True
+
     def __init__(self, subject:Reference[Iterable], elasticsearch:Elasticsearch, index:str, field:str, *, assign_result:Reference[Any]|None=None, assert_index_exists:bool=True):
         super().__init__()
         self.subject = subject
@@ -34,6 +38,8 @@ class DeleteByTerms(Step):
             
     
         
-    def preflight(self):
-        assert self.elasticsearch.info()
-        assert self.elasticsearch.indices.exists(index=self.index)
\ No newline at end of file
+    def get_preflight_checks(self) -> list[PreflightCheck]:
+        return [
+            elasticsearch_info(self.elasticsearch),
+            index_exists(self.elasticsearch, self.index)
+        ]
\ No newline at end of file
@@ -1,7 +1,8 @@
 from ...references.reference import Reference
 from ..transforming_step import TransformingStep
 from .document import Document
-from pandas import DataFrame, Series
+from ..dataframe.dtype_backend import to_list
+from pandas import DataFrame, Series, NA, NaT
 from typing import Any, Type
 
 
@@ -12,12 +13,24 @@ class DataFrameToDocuments[T:Document](TransformingStep[DataFrame, Series]):
 
 
     def transform(self, subject: DataFrame) -> Series | None:
-        df = subject.copy()
+        df = subject
         
         # if the df has a named index, get its levels as columns
         if all(df.index.names):
-            for i, n in enumerate(df.index.names):
-                df[n] = df.index.get_level_values(i)
+            df = df.assign(**{str(n):df.index.get_level_values(i) for i, n in enumerate(df.index.names)})
 
-        # construct documents by passing each row (axis=1) of the dataframe to the `document_type` constructor
-        return df.apply(lambda row: row.dropna().to_dict(), axis=1).map(self.document_type.model_validate)
\ No newline at end of file
+        # construct documents by passing each row of the dataframe, less its nulls, to the `document_type` constructor;
+        # rows are zipped from columns converted to python lists in one go each (by pyarrow, for arrow-backed columns; see `to_list`),
+        # where a row-wise `apply` makes a Series per row
+        columns = list(df.columns)
+        rows = zip(*(to_list(df[column]) for column in columns)) if columns else ({} for _ in range(len(df)))
+        return Series(
+            [self.document_type.model_validate({k:v for k, v in zip(columns, row) if not _is_null(v)}) for row in rows],
+            index=subject.index,
+            dtype=object
+        )
+
+
+def _is_null(value:Any) -> bool:
+    """ as `pandas.isna` for the scalars `to_list` gives, but cheaper; lists etc. are never null """
+    return value is None or value is NA or value is NaT or (isinstance(value, float) and value != value)
\ No newline at end of file
@@ -0,0 +1,21 @@
+from elasticsearch import ApiError, ConnectionError, ConnectionTimeout
+from elasticsearch.helpers import BulkIndexError
+
+# statuses worth retrying: too many requests, and an overloaded or restarting cluster
+TRANSIENT_STATUSES = frozenset({429, 502, 503, 504})
+
+
+def is_transient(error:Exception) -> bool:
+    """ True if `error` is an elasticsearch error that retrying (after a backoff) may fix; for `RetryPolicy.retryable` """
+    if isinstance(error, (ConnectionError, ConnectionTimeout)):
+        return True
+
+    if isinstance(error, ApiError):
+        return error.meta.status in TRANSIENT_STATUSES
+
+    # a bulk request fails as a whole if any item failed; retry only if every failure was transient
+    if isinstance(error, BulkIndexError):
+        statuses = [item.get('status') for failure in error.errors for item in failure.values() if isinstance(item, dict)]
+        return bool(statuses) and all(status in TRANSIENT_STATUSES for status in statuses)
+
+    return False
\ No newline at end of file
@@ -3,10 +3,14 @@ from elasticsearch.client import Elasticsearch
 from elasticsearch import NotFoundError
 from logging import info
 from time import sleep
+from .preflight import elasticsearch_info, enrich_policy_exists
+from ..preflight import PreflightCheck
 
 # https://elasticsearch-py.readthedocs.io/en/v8.2.2/api.html?highlight=execute#elasticsearch.client.EnrichClient.execute_policy:~:text=the%20enrich%20policy-,execute,_policy,-(*%2C%20name%3A%20str
 class ExecutePolicy(Step):
     """ execute the specified enrich policy """
+    side_effects = True
+
     def __init__(self, elasticsearch:Elasticsearch, policy:str, await_task:bool=True, await_task_interval:float=1, await_task_timeout:int=120) -> None:
         self.elasticsearch = elasticsearch
         self.policy = policy
@@ -43,6 +47,8 @@ class ExecutePolicy(Step):
         info(f'executed enrich policy {self.policy}')
 
     
-    def preflight(self):
-        assert self.elasticsearch.info()
-        assert self.elasticsearch.enrich.get_policy(name=self.policy)
\ No newline at end of file
+    def get_preflight_checks(self) -> list[PreflightCheck]:
+        return [
+            elasticsearch_info(self.elasticsearch),
+            enrich_policy_exists(self.elasticsearch, self.policy)
+        ]
\ No newline at end of file
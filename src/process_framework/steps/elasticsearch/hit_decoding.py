@@ -0,0 +1,220 @@
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+#   Decode search hits into a DataFrame, by run         #
+#                                                       #
+#   A `HitDecoder` decodes the `_source` (and `_fields`)#
+#       of each run of hits into typed columns as hits  #
+#       arrive, so the hits (and their Python values)   #
+#       can be freed a page at a time; each column's    #
+#       runs are concatenated once, at the end          #
+#                                                       #
+#   A column whose dtype differs between runs (ints in  #
+#       one, floats or strings in another), or that     #
+#       holds objects, is inferred again as a whole, as #
+#       `DataFrame.from_records` would infer it         #
+#                                                       #
+#   Numeric `dtypes` are applied to each run as it's    #
+#       decoded; others (str, category) depend on the   #
+#       whole column, so are applied once at the end    #
+#                                                       #
+#   Nested objects are kept as dicts, or flattened to   #
+#       a column per leaf as set by a `Flattening`      #
+#                                                       #
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+
+# stdlib
+from collections.abc import Collection, Iterable, Iterator
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any
+
+# third-party
+import numpy as np
+import pandas as pd
+from pandas import DataFrame, Index, RangeIndex, Series
+from pandas.api.extensions import ExtensionArray
+from pandas.api.types import infer_dtype, is_numeric_dtype
+
+# first-party
+from ..dataframe.dtype_backend import DtypeBackend, to_dtype_backend
+
+# the value of a field missing from a hit, as `DataFrame.from_records` fills it; a field that is present but null stays None
+MISSING = np.nan
+
+# the hits held before they're decoded into a frame; fewer, longer, runs cost less to build and concatenate
+RUN_LENGTH = 5000
+
+_EMPTY:dict[str, Any] = {}
+
+# a decoded run's values of a field; an extension array (Int64, say) if `dtypes` cast it to one
+type Column = np.ndarray|ExtensionArray
+
+
+@dataclass(frozen=True)
+class Flattening:
+    """ how nested objects in `_source` become columns: an object up to `depth` levels down (any depth by default) is flattened to a
+        column per key, named by joining the keys with `separator` ('address.city'). only the top-level `fields` are flattened, if
+        given. lists, and objects below `depth`, are kept as values """
+    depth:int|None = None
+    separator:str = '.'
+    fields:Collection[str]|None = None
+
+
+class HitDecoder:
+    """ decodes hits, a run at a time, into typed columns; `to_dataframe` builds the `_id`-indexed frame once. `_source` columns come first,
+        then `_fields` columns not already in `_source` (each in name order), then `_index`. only `columns` are kept, if given """
+    def __init__(self, dtypes:dict[str, Any]|None=None, columns:Collection[str]|None=None, flatten:Flattening|None=None,
+                 dtype_backend:DtypeBackend|None=None) -> None:
+        self.dtypes = dtypes or {}
+        self.columns = set(columns) if columns is not None else None
+        self.flatten = flatten
+        self.dtype_backend = dtype_backend
+        # the hits added
+        self.rows = 0
+        self.ids:list[Any] = []
+        self.indices:list[Any] = []
+        # (first row, {column: values}) per run; runs of hits without `_fields` have no `fields` chunk
+        self.source:list[tuple[int, dict[str, Column]]] = []
+        self.fields:list[tuple[int, dict[str, Column]]] = []
+        # the hits not yet decoded
+        self._hits:list[dict] = []
+
+
+    def add(self, hit:dict) -> None:
+        """ decode `hit` """
+        self._hits.append(hit)
+        self.rows += 1
+        if len(self._hits) >= RUN_LENGTH:
+            self.end_run()
+
+
+    def extend(self, hits:Iterable[dict]) -> 'HitDecoder':
+        """ decode `hits` (e.g. a page at a time) """
+        hits = iter(hits)
+        while True:
+            held = len(self._hits)
+            self._hits.extend(islice(hits, RUN_LENGTH - held))
+            self.rows += len(self._hits) - held
+            if len(self._hits) < RUN_LENGTH:
+                return self
+            self.end_run()
+
+
+    def end_run(self) -> None:
+        """ decode the run of hits since the last into columns """
+        run, self._hits = self._hits, []
+        if not run:
+            return
+        start = self.rows - len(run)
+        self.ids += [hit.get('_id') for hit in run]
+        self.indices += [hit.get('_index', MISSING) for hit in run]
+
+        sources = [hit.get('_source') or _EMPTY for hit in run]
+        if self.flatten is not None:
+            sources = [dict(self.flattened(source)) if source else source for source in sources]
+        self.source.append((start, self.decode(sources)))
+
+        fields = [hit.get('_fields') or _EMPTY for hit in run]
+        if any(fields):
+            self.fields.append((start, self.decode(fields)))
+
+
+    def decode(self, values:list[dict[str, Any]]) -> dict[str, Column]:
+        """ the columns (of `columns`) of `values` (`_source`s or `_fields`), a column per field of any of them, each of its numeric
+            dtype in `dtypes`, else of the dtype inferred from the run's values. a column of floats that also holds ints or None is kept
+            as objects, as the ints and Nones are kept if other runs make the column one of objects """
+        # pandas finds the fields itself, unless only `columns` are kept
+        names = None if self.columns is None else sorted(set().union(*values) & self.columns)
+        frame = DataFrame(values, columns=names, dtype=object)
+        columns:dict[str, Column] = {}
+        for name in frame.columns:
+            raw = frame[name].to_numpy()
+            if (dtype := self.dtypes.get(name)) is not None and is_numeric_dtype(dtype):
+                # a numeric cast gives the same values whatever dtype the whole column is inferred as, so the run's objects can go now
+                cast = Series(raw, copy=False).astype(dtype)
+                columns[name] = cast.to_numpy() if isinstance(cast.dtype, np.dtype) else cast.array
+                continue
+            typed = Series(raw, copy=False).infer_objects().to_numpy()
+            # a copy, so that the run's values aren't all kept by a view of the frame
+            columns[name] = raw.copy() if typed.dtype.kind == 'f' and not _floats(raw, typed) else typed
+        return columns
+
+
+    def flattened(self, source:dict[str, Any]) -> Iterator[tuple[str, Any]]:
+        """ the (column, value) pairs of `source`, flattened as set by `flatten` """
+        flatten = self.flatten
+        assert flatten is not None
+        for name, value in source.items():
+            if isinstance(value, dict) and value and (flatten.fields is None or name in flatten.fields) and flatten.depth != 0:
+                yield from _flatten(value, name, 1, flatten)
+            else:
+                yield name, value
+
+
+    def to_dataframe(self) -> DataFrame:
+        """ the decoded hits as a DataFrame indexed by `_id`; each column's runs are released once they're concatenated """
+        self.end_run()
+        source = _concat(self.source, self.rows)
+        fields = _concat(self.fields, self.rows)
+
+        # columns are added to (and converted in) the frame, rather than it being copied
+        df = source
+        for name in sorted(set(fields.columns) - set(source.columns)):
+            df[name] = fields[name]
+        if any(index is not MISSING for index in self.indices) and (self.columns is None or '_index' in self.columns) and '_index' not in df:
+            df['_index'] = Series(np.array(self.indices, dtype=object), copy=False).infer_objects().to_numpy()
+        self.indices = []
+
+        # apply `dtypes` to columns that exist in the DataFrame, and weren't cast as they were decoded
+        for name, dtype in self.dtypes.items():
+            if name in df.columns and df[name].dtype != dtype:
+                df[name] = df[name].astype(dtype)
+
+        df.index = Index(self.ids, name='_id', dtype=object)
+        self.ids = []
+        return to_dtype_backend(df, self.dtype_backend)
+
+
+def _concat(runs:list[tuple[int, dict[str, Column]]], rows:int) -> DataFrame:
+    """ the columns of `runs` (which is emptied) as a frame of `rows` rows, in column name order, missing values filled with `MISSING`.
+        a column of the same (non-object) dtype in every run keeps it; any other is inferred again over all its values, as
+        `DataFrame.from_records` infers a column's dtype """
+    chunks:dict[str, list[tuple[int, Column]]] = {}
+    for start, run in runs:
+        for name, values in run.items():
+            chunks.setdefault(name, []).append((start, values))
+    runs.clear()
+
+    columns:dict[str, Any] = {}
+    for name in sorted(chunks):
+        arrays = chunks.pop(name)
+        dtypes = {array.dtype for _, array in arrays}
+        if len(dtypes) == 1 and dtypes != {np.dtype(object)} and sum(len(array) for _, array in arrays) == rows:
+            if len(arrays) == 1:
+                columns[name] = arrays[0][1]
+            elif isinstance(arrays[0][1], np.ndarray):
+                columns[name] = np.concatenate([array for _, array in arrays])
+            else:
+                columns[name] = pd.concat([Series(array, copy=False) for _, array in arrays], ignore_index=True).array
+            continue
+        values = np.full(rows, MISSING, dtype=object)
+        for start, array in arrays:
+            values[start:start + len(array)] = array
+        columns[name] = Series(values, copy=False).infer_objects().to_numpy()
+    return DataFrame(columns, index=RangeIndex(rows), copy=False)
+
+
+def _floats(raw:np.ndarray, typed:np.ndarray) -> bool:
+    """ whether `raw` held only floats (and missing values), given `typed`, its values as floats: a None would be NaN, and an int
+        a whole number, so only those need checking """
+    if not (np.isnan(typed).any() or (typed == np.trunc(typed)).any()):
+        return True
+    return infer_dtype(raw, skipna=False) == 'floating'
+
+
+def _flatten(value:dict[str, Any], prefix:str, depth:int, flatten:Flattening) -> Iterator[tuple[str, Any]]:
+    for key, child in value.items():
+        name = f'{prefix}{flatten.separator}{key}'
+        if isinstance(child, dict) and child and (flatten.depth is None or depth < flatten.depth):
+            yield from _flatten(child, name, depth + 1, flatten)
+        else:
+            yield name, child
@@ -6,10 +6,14 @@ from elasticsearch.client import Elasticsearch
 from elasticsearch.helpers import bulk
 from typing import Any, Tuple
 from logging import info
+from .preflight import elasticsearch_info, index_exists, ingest_pipeline_exists
+from ..preflight import PreflightCheck
 
 # https://elasticsearch-py.readthedocs.io/en/v8.2.2/helpers.html
 class IndexDocuments(Step):
     """ index a `Series` of `Documents` using elasticsearch.helpers.bulk """
+    side_effects = True
+
     def __init__(self, subject:Reference[Series], elasticsearch:Elasticsearch, index:str, pipeline:str|None=None, *, assign_result:Reference[Tuple]|None=None, assert_index_exists:bool=True,
                  raise_on_error:bool=True, raise_on_exception:bool=True, max_retries:int=0, initial_backoff:int=2, 
                  chunk_size:int=500, max_chunk_bytes:int=104857600, bulk_kwargs:dict[str, Any]|None=None):
@@ -62,9 +66,10 @@ class IndexDocuments(Step):
         info(f'{result}')
 
 
-    def preflight(self):
-        assert self.elasticsearch.info()
+    def get_preflight_checks(self) -> list[PreflightCheck]:
+        checks = [elasticsearch_info(self.elasticsearch)]
         if self.assert_exists:
-            assert self.elasticsearch.indices.exists(index=self.index)
+            checks.append(index_exists(self.elasticsearch, self.index))
         if self.pipeline:
-            assert self.elasticsearch.ingest.get_pipeline(id=self.pipeline)
\ No newline at end of file
+            checks.append(ingest_pipeline_exists(self.elasticsearch, self.pipeline))
+        return checks
\ No newline at end of file
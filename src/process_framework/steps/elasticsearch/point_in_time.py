@@ -0,0 +1,131 @@
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+#   Scan an index through a point in time               #
+#                                                       #
+#   A point in time (PIT) pins a view of an index; it   #
+#       is paged with `search_after` the sort values    #
+#       of the last hit, sorted on `_shard_doc`, the    #
+#       cheapest total order. Unlike a scroll, it keeps #
+#       no per-search context on the cluster, and any   #
+#       page can be requested again                     #
+#                                                       #
+#   A `PitCursor` holds where a scan has got to; a      #
+#       page that fails transiently is retried from it, #
+#       rather than restarting the scan                 #
+#                                                       #
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+
+# stdlib
+import logging
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from time import sleep
+from typing import Any, Literal
+
+# third-party
+from elasticsearch import Elasticsearch
+
+# first-party
+from ..retry_policy import RetryPolicy
+from .errors import is_transient
+from .slicing import slice_query
+
+ScanEngine = Literal['scroll', 'pit']
+SCAN_ENGINES = ('scroll', 'pit')
+
+# what a PIT search response needs besides what a scroll's does: the (possibly updated) PIT id, and the sort values of each hit
+PIT_FILTER_PATH = 'pit_id,hits.hits.sort'
+
+SHARD_DOC = {'_shard_doc':'asc'}
+
+
+def check_scan_engine(engine:str) -> None:
+    """ raise if `engine` isn't one of `SCAN_ENGINES` """
+    if engine not in SCAN_ENGINES:
+        raise ValueError(f'expected `engine` to be one of {SCAN_ENGINES}, got {engine!r}')
+
+
+def pit_filter_path(filter_path:str|None) -> str|None:
+    """ `filter_path` (for a scroll) extended to keep what a PIT scan needs """
+    return None if filter_path is None else f'{filter_path},{PIT_FILTER_PATH}'
+
+
+@dataclass
+class PitCursor:
+    """ where a PIT scan has got to: the PIT id (Elasticsearch may give a new one with any page) and the sort values of the last hit
+        read. a `pit_scan` of a cursor continues from it, so a scan can be resumed, for as long as the PIT is kept alive """
+    pit_id:str
+    search_after:list[Any]|None = None
+    pages:int = 0
+    hits:int = 0
+    retries:int = 0
+
+
+@contextmanager
+def point_in_time(elasticsearch:Elasticsearch, index:str, keep_alive:str='5m') -> Iterator[str]:
+    """ open a point in time on `index`, and close it on exit """
+    pit_id:str = elasticsearch.open_point_in_time(index=index, keep_alive=keep_alive)['id']
+    try:
+        yield pit_id
+    finally:
+        try:
+            elasticsearch.options(ignore_status=404).close_point_in_time(id=pit_id)
+        except Exception as e:
+            # it expires after `keep_alive` anyway
+            logging.warning(f'could not close the point in time on {index}: {e}')
+
+
+def default_retry_policy() -> RetryPolicy:
+    """ retry a page up to 5 times, backing off from 1s, on transient errors (see `is_transient`) """
+    return RetryPolicy(max_retries=5, backoff=1., retryable=is_transient)
+
+
+def pit_scan(elasticsearch:Elasticsearch, cursor:PitCursor, query:dict[str, Any]|None=None, *, size:int=1000, keep_alive:str='5m',
+             source:str|list[str]|bool|None=None, filter_path:str|None=None, slice_:tuple[int, int]=(0, 1),
+             retry_policy:RetryPolicy|None=None) -> Iterator[dict]:
+    """ the hits of `query` (a search body, as for `helpers.scan`) in the point in time of `cursor`, from after its `search_after`, in
+        pages of `size`; `slice_` is (id, max). a page that fails with an error `retry_policy` retries (by default, transient errors)
+        is requested again from the cursor. any `sort` in `query` is kept, with `_shard_doc` as the tiebreaker. as in `helpers.scan`,
+        `source`, `filter_path` and the page's own keys (`size`, `pit`, `search_after`) take the place of any of the same name in `query` """
+    policy = retry_policy or default_retry_policy()
+    search = dict(slice_query(query, *slice_) or {})
+    sort = search.pop('sort', [])
+    search['sort'] = [*(sort if isinstance(sort, list) else [sort]), SHARD_DOC]
+    if source is not None:
+        search.pop('_source', None)
+        search['source'] = source
+    if filter_path is not None:
+        search['filter_path'] = filter_path
+
+    while True:
+        page = {'pit':{'id':cursor.pit_id, 'keep_alive':keep_alive}, 'size':size, 'track_total_hits':False}
+        if cursor.search_after is not None:
+            page['search_after'] = cursor.search_after
+        response = _search_page(elasticsearch, cursor, policy, **(search | page))
+
+        cursor.pit_id = response.get('pit_id', cursor.pit_id)
+        # `filter_path` drops an empty list of hits
+        hits = response.get('hits', {}).get('hits', [])
+        if not hits:
+            return
+        cursor.search_after = hits[-1]['sort']
+        cursor.pages += 1
+        cursor.hits += len(hits)
+        yield from hits
+        if len(hits) < size:
+            return
+
+
+def _search_page(elasticsearch:Elasticsearch, cursor:PitCursor, policy:RetryPolicy, **search:Any) -> Any:
+    tries = 0
+    while True:
+        try:
+            return elasticsearch.search(**search)
+        except Exception as e:
+            if not policy.is_retryable(e) or tries >= policy.max_retries or (policy.budget is not None and cursor.retries >= policy.budget):
+                raise
+            tries += 1
+            cursor.retries += 1
+            backoff = policy.get_backoff(tries)
+            logging.info(f'page {cursor.pages + 1} of a point in time scan failed ({type(e).__name__}: {e}); retrying it in {backoff:.1f}s')
+            sleep(backoff)
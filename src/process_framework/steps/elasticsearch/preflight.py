@@ -0,0 +1,44 @@
+from ..preflight import PreflightCheck
+from typing import Any, Sequence
+
+# checks are keyed on the client instance, so steps sharing a client share the round-trip
+
+def _index_key(index:str|Sequence[str]) -> str|tuple[str, ...]:
+    return index if isinstance(index, str) else tuple(index)
+
+
+def elasticsearch_info(elasticsearch:Any) -> PreflightCheck:
+    """ assert the cluster is reachable """
+    return PreflightCheck(
+        (id(elasticsearch), 'info'), 
+        lambda: elasticsearch.info(), 
+        'elasticsearch.info()',
+        cheap=True
+    )
+
+
+def index_exists(elasticsearch:Any, index:str|Sequence[str]) -> PreflightCheck:
+    """ assert `index` exists """
+    return PreflightCheck(
+        (id(elasticsearch), 'indices.exists', _index_key(index)), 
+        lambda: elasticsearch.indices.exists(index=index), 
+        f'elasticsearch.indices.exists(index={index})'
+    )
+
+
+def ingest_pipeline_exists(elasticsearch:Any, pipeline:str) -> PreflightCheck:
+    """ assert the ingest `pipeline` exists """
+    return PreflightCheck(
+        (id(elasticsearch), 'ingest.get_pipeline', pipeline), 
+        lambda: elasticsearch.ingest.get_pipeline(id=pipeline), 
+        f'elasticsearch.ingest.get_pipeline(id={pipeline})'
+    )
+
+
+def enrich_policy_exists(elasticsearch:Any, policy:str) -> PreflightCheck:
+    """ assert the enrich `policy` exists """
+    return PreflightCheck(
+        (id(elasticsearch), 'enrich.get_policy', policy), 
+        lambda: elasticsearch.enrich.get_policy(name=policy), 
+        f'elasticsearch.enrich.get_policy(name={policy})'
+    )
\ No newline at end of file
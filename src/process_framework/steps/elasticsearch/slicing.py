@@ -0,0 +1,92 @@
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+#   Consume sliced Elasticsearch scans concurrently     #
+#                                                       #
+#   A search with `slice: {id, max}` returns one of     #
+#       `max` disjoint parts of its hits; scanning      #
+#       each part on a thread of its own overlaps the   #
+#       round trips that bound a single scroll          #
+#                                                       #
+#   Hits are handed over a bounded queue a page at a    #
+#       time, so slices can't run far ahead of the      #
+#       consumer; closing the iterator stops them       #
+#                                                       #
+# """"""""""""""""""""""""""""""""""""""""""""""""""""" #
+
+# stdlib
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from queue import Full, Queue
+from threading import Event
+from typing import Any
+
+
+def check_slices(slices:int|None, query:dict[str, Any]|None) -> None:
+    """ raise if `slices` isn't None or a positive int, or if `query` is already sliced """
+    if slices is None:
+        return
+    if not isinstance(slices, int) or slices < 1:
+        raise ValueError(f'expected `slices` to be a positive int or None, got {slices!r}')
+    if slices > 1 and query is not None and 'slice' in query:
+        raise ValueError('`query` already has a `slice`; pass `slices` or slice the query, not both')
+
+
+def slice_query(query:dict[str, Any]|None, i:int, slices:int) -> dict[str, Any]|None:
+    """ `query` restricted to slice `i` of `slices`; as is for a single slice (Elasticsearch needs `max` > 1) """
+    if slices <= 1:
+        return query
+    return {**(query or {}), 'slice':{'id':i, 'max':slices}}
+
+
+def merge_slices(scan_slice:Callable[[int], Iterator[dict]], slices:int, page_size:int=1000) -> Iterator[dict]:
+    """ the hits of `scan_slice(i)` for each of `slices` slices, each scanned on a thread of its own. hits are yielded a page
+        (`page_size` hits) at a time, in the order pages arrive, so slices are interleaved. an error in any slice is raised here, and
+        closing the iterator (or stopping early, at a `limit`) stops every slice at its next page; each slice's iterator is closed,
+        which clears its scroll """
+    # at most two pages per slice wait to be consumed
+    pages:Queue[list[dict]|BaseException|None] = Queue(maxsize=2 * slices)
+    stop = Event()
+
+    def put(item:list[dict]|BaseException|None) -> bool:
+        # block while the queue is full, unless the consumer has stopped
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return True
+            except Full:
+                continue
+        return False
+
+    def scan(i:int) -> None:
+        try:
+            with closing(scan_slice(i)) as hits: # type: ignore
+                page:list[dict] = []
+                for hit in hits:
+                    page.append(hit)
+                    if len(page) >= page_size:
+                        if not put(page):
+                            return
+                        page = []
+                if page:
+                    put(page)
+        except BaseException as e:
+            put(e)
+        finally:
+            put(None)
+
+    with ThreadPoolExecutor(slices, thread_name_prefix='slice') as pool:
+        for i in range(slices):
+            pool.submit(scan, i)
+        try:
+            running = slices
+            while running:
+                page = pages.get()
+                if page is None:
+                    running -= 1
+                elif isinstance(page, BaseException):
+                    raise page
+                else:
+                    yield from page
+        finally:
+            # let slices blocked on a full queue return; the pool waits for them
+            stop.set()
@@ -7,12 +7,16 @@ from elasticsearch import NotFoundError
 from logging import info
 from time import sleep
 from pandas import Index, Series
+from .preflight import elasticsearch_info, index_exists, ingest_pipeline_exists
+from ..preflight import PreflightCheck
 
 MAX_ALLOWABLE_TERMS = 65536
 
 # https://elasticsearch-py.readthedocs.io/en/v8.2.2/api.html?highlight=execute#elasticsearch.Elasticsearch.update_by_query
 class UpdateByQuery(Step):
     """ perform an update-by-query operation on an index """
+    side_effects = True
+
     # TODO : build option to pass and do a query
     def __init__(self, elasticsearch:Elasticsearch, index:str|Sequence[str], pipeline:str, 
                  query:dict|None=None, _ids:list|Reference[list]|Reference[Series]|Reference[Index]|None=None,
@@ -111,7 +115,9 @@ class UpdateByQuery(Step):
                 
         info(f'performed update-by-query {self.pipeline}:{self.index}')
 
-    def preflight(self):
-        assert self.elasticsearch.info()
-        assert self.elasticsearch.indices.exists(index=self.index)
-        assert self.pipeline in self.elasticsearch.ingest.get_pipeline(id=self.pipeline)
\ No newline at end of file
+    def get_preflight_checks(self) -> list[PreflightCheck]:
+        return [
+            elasticsearch_info(self.elasticsearch),
+            index_exists(self.elasticsearch, self.index),
+            ingest_pipeline_exists(self.elasticsearch, self.pipeline)
+        ]
\ No newline at end of file
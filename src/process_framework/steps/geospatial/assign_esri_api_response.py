@@ -8,6 +8,7 @@ from pandas import DataFrame, Series
 from geopandas import GeoDataFrame
 from itertools import batched
 from typing import Iterable
+from ..preflight import PreflightCheck, http_head
 
 # this is going to end up tightly coupled to whatever process is using it.
 # whatever.
@@ -128,5 +129,5 @@ class ArcGisApiTransformer(TransformingStep[DataFrame, GeoDataFrame], ABC):
         return self.get_geodataframe_for_docs(subject)
     
 
-    def preflight(self):
-        self.get_session().head(self.endpoint_url).raise_for_status()
\ No newline at end of file
+    def get_preflight_checks(self) -> list[PreflightCheck]:
+        return [http_head(self.get_session(), self.endpoint_url)]
\ No newline at end of file
@@ -0,0 +1,104 @@
+from process_framework.references.reference import Reference
+from ..async_step import AsyncStep, run_coroutine
+from .assign_esri_api_response import ArcGisApiTransformer
+from aiohttp import ClientSession, TCPConnector
+from pandas import DataFrame
+from geopandas import GeoDataFrame
+from abc import ABC
+import asyncio
+import logging
+import random
+
+# statuses retried with backoff; mirrors `ArcGisApiTransformer.get_retries`
+RETRY_STATUSES = {403}
+BACKOFF_MAX = 120
+
+class AsyncArcGisApiTransformer(AsyncStep, ArcGisApiTransformer, ABC):
+    """ transform a `subject` DataFrame into a GeoDataFrame of Responses, POSTing up to `concurrency` batches at once with `aiohttp` """
+    def __init__(self, subject: Reference[DataFrame], assign_to: Reference[GeoDataFrame], endpoint_url:str, *, 
+                 batch_size:int=1000, max_retries:int=5, retry_backoff_factor:float=10, payload_args:dict|None=None, verify_session:bool=False, overwrite:bool=True,
+                 concurrency:int=4):
+        super().__init__(subject, assign_to, endpoint_url, batch_size=batch_size, max_retries=max_retries, retry_backoff_factor=retry_backoff_factor, 
+                         payload_args=payload_args, verify_session=verify_session, overwrite=overwrite)
+        self.concurrency = max(1, concurrency)
+
+
+    def initialize_async_session(self) -> ClientSession:
+        return ClientSession(connector=TCPConnector(limit=self.concurrency, ssl=None if self.verify_session else False))
+
+
+    async def aget_response_for_payload(self, session:ClientSession, payload:dict) -> dict:
+        """ POST a `payload` to the target API, retrying `RETRY_STATUSES` with exponential backoff; check it for errors """
+        # update `payload` with `payload_args` if defined
+        if isinstance(self.payload_args, dict):
+            payload |= self.payload_args
+
+        for attempt in range(self.max_retries + 1):
+            async with session.post(self.endpoint_url, data=payload) as response:
+                if response.status in RETRY_STATUSES and attempt < self.max_retries:
+                    await asyncio.sleep(min(BACKOFF_MAX, self.retry_backoff_factor * 2 ** attempt) + random.uniform(0, 0.1))
+                    continue
+
+                # test the response, get the json body
+                response.raise_for_status()
+                data = await response.json(content_type=None)
+                break
+
+        # if we've not hit an error, return 
+        if error:= data.get('error'):
+            raise Exception(error)
+           
+        return data
+
+
+    async def aget_responses_for_docs(self, docs:DataFrame) -> list[dict]:
+        """ for a DataFrame of `docs`, POST batches concurrently, returning the responses of batches that succeeded, in order """
+        payloads = [self.get_payload_for_batch(batch) for batch in self.gen_batches(docs, self.batch_size)]
+
+        async with self.initialize_async_session() as session:
+            results = await asyncio.gather(
+                *(self.aget_response_for_payload(session, payload) for payload in payloads),
+                return_exceptions=True
+            )
+
+        responses = []
+        for i, result in enumerate(results):
+            if isinstance(result, BaseException):
+                logging.warning(f'{type(self).__name__} batch {i} failed: {result}')
+                continue
+            responses.append(result)
+        return responses
+
+
+    async def atransform(self, subject:DataFrame) -> GeoDataFrame|None:
+        responses = await self.aget_responses_for_docs(subject)
+        # building the GeoDataFrame is cpu-bound; keep it off the event loop
+        return await asyncio.to_thread(self.get_geodataframe_for_responses, responses) # type: ignore
+
+
+    def transform(self, subject: DataFrame) -> GeoDataFrame | None:
+        return run_coroutine(self.atransform(subject))
+
+
+    async def ado(self):
+        if self.assign_to.has_value() and not self.overwrite:
+            return self.assign_to.get_value()
+
+        subject = self.subject_reference.get_value()
+
+        result = await self.atransform(subject)
+
+        if result is None:
+            return
+
+        if self.assign_to is not None and isinstance(result, self.assign_to._type):
+            self.assign_to.set(result)
+            return
+
+        raise Exception("Unhandled state")
+
+
+    async def apreflight(self):
+        async with self.initialize_async_session() as session:
+            async with session.head(self.endpoint_url) as response:
+                response.raise_for_status()
\ No newline at end of file
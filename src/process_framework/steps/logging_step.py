@@ -1,14 +1,18 @@
 from .step import Step
 from ..references import Reference
-from .step import Step
-from ..references import Reference, _repr
+from ..references.summary import get_sample
 import logging
 
 class Log(Step):
-    def __init__(self, subject:Reference, level:int = logging.INFO) -> None:
+    """ log a summary of `subject` whose cost doesn't grow with its size (see `Reference.summary`): its size, dtypes, first few
+        elements and index values; optionally a shallow `memory` estimate, and `stats` estimated from a sample of `sample_size` rows """
+    def __init__(self, subject:Reference, level:int = logging.INFO, *, memory:bool=False, stats:bool=False, sample_size:int=1_000) -> None:
         super().__init__()
         self.subject = subject
         self.level = level
+        self.memory = memory
+        self.stats = stats
+        self.sample_size = sample_size
 
 
     def log(self, msg:str):
@@ -16,8 +20,13 @@ class Log(Step):
 
 
     def do(self):
+        # summarize nothing if it wouldn't be logged
+        if not logging.getLogger().isEnabledFor(self.level):
+            return
         try:
-            idx = self.subject.get_value().index
-            self.log(f'{self.subject}, {idx.dtype}, {_repr.repr(list(idx.values))}')
+            message = self.subject.summary(memory=self.memory, stats=self.stats, sample_size=self.sample_size)
+            if (idx := getattr(self.subject.peek(), 'index', None)) is not None:
+                message += f', index {idx.dtype}, {get_sample(idx)}'
+            self.log(message)
         except:
             self.log(f'{self.subject}')
\ No newline at end of file
@@ -0,0 +1,71 @@
+from .step import Step
+from ..references.reference import Reference
+from ..instrumentation import record_metrics
+from copy import deepcopy
+from dataclasses import dataclass
+from typing import Any
+import logging
+
+
+@dataclass(slots=True)
+class Memo:
+    """ a step's last result (a copy, which later steps can't modify), the versions of its inputs it was computed from, and the version
+        of its output once set """
+    inputs:tuple[int, ...]
+    result:Any
+    output:int|None
+
+
+class Memoizing(Step):
+    """ a step that, if `memoize` is set, skips recomputing its result while none of its input `Reference`s (`get_reads`) have changed
+        version; if its output has changed since, the memoized result is set on it again. only memoize steps whose result depends
+        on their inputs alone; a copy of a memoized result is kept (in memory) until the inputs change, and copied again when it's set,
+        so changes later steps make to the output (e.g. adding columns through `ColumnReference`s) aren't recalled """
+    # memoizing holds a second copy of the result for as long as the step's inputs are unchanged, and copies it whenever it's set
+    # again (once per batch inside a `BatchProcessor`); DataFrames and Series are copied column by column, not cell by cell (see `_copy`)
+    memoize:bool = False
+    _memo:Memo|None = None
+
+
+    def get_output(self) -> Reference|None:
+        """ the `Reference` a result is set on """
+        writes = self.get_writes()
+        return writes[0] if len(writes) == 1 else None
+
+
+    def get_input_versions(self) -> tuple[int, ...]:
+        return tuple(reference.version for reference in self.get_reads())
+
+
+    def recall(self) -> bool:
+        """ True if memoizing and the inputs are unchanged since the last result, which is set on the output again if it changed """
+        memo = self._memo
+        if not self.memoize or memo is None or memo.inputs != self.get_input_versions():
+            return False
+
+        output = self.get_output()
+        if memo.result is not None and output is not None and output.version != memo.output:
+            output.set(_copy(memo.result))
+            memo.output = output.version
+        logging.debug(f'{type(self).__name__}: inputs unchanged, using the memoized result')
+        record_metrics(memoized=True)
+        return True
+
+
+    def remember(self, result:Any) -> None:
+        """ memoize `result`, computed from the current inputs (None if the output was modified in place) """
+        if not self.memoize:
+            return
+        output = self.get_output()
+        self._memo = Memo(self.get_input_versions(), _copy(result), output.version if output is not None else None)
+
+
+def _copy(value:Any) -> Any:
+    """ a copy of `value` that changes to the other can't reach: DataFrames and Series copy their columns (not the Python objects in
+        object columns, which steps replace rather than modify), Indexes are immutable, and anything else is deep copied """
+    from pandas import DataFrame, Index, Series
+    if isinstance(value, (DataFrame, Series)):
+        return value.copy(deep=True)
+    if isinstance(value, Index):
+        return value
+    return deepcopy(value)
\ No newline at end of file
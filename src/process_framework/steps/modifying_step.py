@@ -1,12 +1,14 @@
 from process_framework.references.reference import Reference
-from process_framework.steps.step import Step
+from process_framework.steps.memoizing import Memoizing
 from abc import ABC, abstractmethod
 
-class ModifyingStep[T](Step, ABC):
-    """ a step that modifies an input value without changing its type, optionally assigning the result to a different reference. the subject and assignee references are of the same type """
-    def __init__(self, subject:Reference[T], assign_to:Reference[T]|None=None):
+class ModifyingStep[T](Memoizing, ABC):
+    """ a step that modifies an input value without changing its type, optionally assigning the result to a different reference. the subject and assignee references are of the same type;
+        if `memoize`, it's only performed when the subject (or another input) changes (see `Memoizing`) """
+    def __init__(self, subject:Reference[T], assign_to:Reference[T]|None=None, *, memoize:bool=False):
         self.subject_reference = subject
         self.assign_to = assign_to
+        self.memoize = memoize
 
     @abstractmethod
     def transform(self, subject:T) -> T|None:
@@ -14,24 +16,42 @@ class ModifyingStep[T](Step, ABC):
         pass
 
     def do(self):
+        if self.recall():
+            return
+
         subject = self.subject_reference.get_value()
 
         result = self.transform(subject)
         # print('result', result)
 
         if result is None:
+            # the subject was modified in place
+            self.subject_reference.touch()
+            self.remember(None)
             return
 
         if self.assign_to is not None and isinstance(result, self.assign_to._type):
             # print(('to-other', self.assign_to), ('current', self.assign_to.value), ('new', result))
             self.assign_to.set(result)
             # print(('post-set', self.assign_to.value))
+            self.remember(result)
             return
 
         if isinstance(result, self.subject_reference._type):
             # print(('in-place', self.assign_to), ('current', self.subject_reference.value), ('new', result))
             self.subject_reference.set(result)
             # print(('post-set', self.subject_reference.value))
+            self.remember(result)
             return
 
-        raise Exception("Unhandled state")
\ No newline at end of file
+        raise Exception("Unhandled state")
+
+
+    def get_writes(self) -> list[Reference]:
+        """ the result is assigned to `assign_to` if provided, else 'in place' to the subject; a `transform` that returns None modifies
+            the subject in place either way """
+        return [self.assign_to, self.subject_reference] if self.assign_to is not None else [self.subject_reference]
+
+
+    def get_output(self) -> Reference|None:
+        return self.assign_to if self.assign_to is not None else self.subject_reference
\ No newline at end of file
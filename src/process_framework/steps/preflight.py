@@ -0,0 +1,30 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, Hashable
+import inspect
+
+@dataclass(frozen=True)
+class PreflightCheck:
+    """ a preflight assertion that `check()` returns a truthy value (or, unless `truthy`, only that it doesn't raise); checks with equal
+        `key`s are made once per pipeline """
+    key:Hashable
+    check:Callable[[], Any] = field(compare=False)
+    description:str = field(default='', compare=False)
+    cheap:bool = field(default=False, compare=False)   # a connectivity check, re-made before every run of a long-lived pipeline
+    truthy:bool = field(default=True, compare=False)   # False for a step's own `preflight`, which asserts or logs and returns None
+
+    def __call__(self) -> Any:
+        result = self.check()
+        # checks against async clients return coroutines; run them on the framework's event loop
+        if inspect.iscoroutine(result):
+            from .async_step import run_coroutine
+            result = run_coroutine(result)
+        assert result or not self.truthy, f'preflight check failed: {self.description or self.key}'
+        return result
+
+
+def http_head(session:Any, url:str, **kwargs) -> PreflightCheck:
+    """ assert that a `HEAD` request to `url` succeeds; keyed on the url """
+    def check() -> bool:
+        session.head(url, **kwargs).raise_for_status()
+        return True
+    return PreflightCheck(('HEAD', url, tuple(sorted(kwargs.items()))), check, f'HEAD {url}', cheap=True)
\ No newline at end of file
@@ -0,0 +1,85 @@
+from dataclasses import dataclass, field
+from collections import deque
+from collections.abc import Callable
+from time import monotonic, sleep
+import logging
+import random
+import threading
+
+
+@dataclass
+class RetryPolicy:
+    """ how failed work is retried: how often, after how long, and which errors are worth retrying.
+        the `n`th retry waits `backoff * multiplier ** (n - 1)` seconds (at most `max_backoff`), less up to `jitter` of that at random """
+    max_retries:int = 25
+    backoff:float = 0.                  # seconds before the first retry; by default, retries are immediate
+    multiplier:float = 2.
+    max_backoff:float = 60.
+    jitter:float = 1.                   # 1. is 'full' jitter (uniform in [0, backoff]); 0. is none
+    budget:int|None = None              # the most retries per run, across all work
+    # errors to retry, as exception types or a predicate; `fatal` errors are never retried
+    retryable:tuple[type[Exception], ...]|Callable[[Exception], bool] = (Exception,)
+    fatal:tuple[type[Exception], ...] = ()
+
+
+    def is_retryable(self, error:Exception) -> bool:
+        if isinstance(error, self.fatal):
+            return False
+        if isinstance(self.retryable, tuple):
+            return isinstance(error, self.retryable)
+        return self.retryable(error)
+
+
+    def get_backoff(self, try_:int) -> float:
+        """ the seconds to wait before retry number `try_` (from 1) """
+        if try_ < 1 or self.backoff <= 0:
+            return 0.
+        delay = min(self.max_backoff, self.backoff * self.multiplier ** (try_ - 1))
+        return delay - random.uniform(0, self.jitter * delay)
+
+
+@dataclass
+class CircuitBreaker:
+    """ pauses all work for `cooldown` seconds once at least `threshold` of the last `window` attempts have failed """
+    threshold:float = .5
+    window:int = 20
+    cooldown:float = 30.
+    opens:int = field(default=0, init=False)    # the number of times the breaker has opened
+
+    _outcomes:deque[bool] = field(init=False, repr=False)
+    _open_until:float = field(default=0., init=False, repr=False)
+    _lock:threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+
+    def __post_init__(self) -> None:
+        self._outcomes = deque(maxlen=self.window)
+
+
+    def record(self, success:bool) -> None:
+        """ record the outcome of an attempt, opening the breaker if too many recent attempts failed """
+        with self._lock:
+            self._outcomes.append(success)
+            if len(self._outcomes) < self.window or self._outcomes.count(False) < self.threshold * self.window:
+                return
+            self._open_until = monotonic() + self.cooldown
+            self._outcomes.clear()
+            self.opens += 1
+        logging.warning(f'circuit breaker opened: at least {self.threshold:.0%} of the last {self.window} attempts failed; pausing for {self.cooldown}s')
+
+
+    def wait(self) -> float:
+        """ block until the breaker is closed; return the seconds waited """
+        remaining = self._open_until - monotonic()
+        if remaining <= 0:
+            return 0.
+        sleep(remaining)
+        return remaining
+
+
+@dataclass
+class RetryStats:
+    """ retries made, and seconds spent waiting, during a run """
+    retries:int = 0
+    backoff_time:float = 0.         # seconds spent backing off before retries (summed over workers)
+    paused_time:float = 0.          # seconds spent waiting for an open circuit breaker (summed over workers)
+    breaker_opens:int = 0
\ No newline at end of file
@@ -1,29 +1,154 @@
 from .step import Step
+from .retry_policy import RetryPolicy
+from ..references import Reference
+from ..references.reference import root_of
+from ..instrumentation import measure, record_metrics
+from ..exceptions import EarlyEscape
+from .preflight import PreflightCheck
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextvars import copy_context
+from copy import copy, deepcopy
 from itertools import count
 import logging
-from time import sleep
+from time import monotonic, sleep
+
+
+class DeadlineExceeded(TimeoutError):
+    """ raised by `Retry` when its step hasn't succeeded within its `deadline` """
+
 
 class Retry(Step):
-    # TODO: catch certain Exceptions, re-raise the rest
-    """ retry a `step` up to `max_retries` times, waiting `retry_backoff` seconds between tries """
-    def __init__(self, step:Step, max_retries:int=10, retry_backoff:int=15) -> None:
+    """ retry a `step` as set by a `retry_policy`: by default, up to `max_retries` tries, waiting `retry_backoff` seconds between tries.
+        if `deadline` is set, give up once that many seconds have passed, even mid-try, raising `DeadlineExceeded`.
+        if `hedge_after` is set, start a second, concurrent, try of `step` once a try has taken that many seconds, and keep whichever
+        succeeds first. tries abandoned mid-try, or raced, run on copies of the values the step writes.
+        a step with `side_effects` is only hedged, or abandoned mid-try at the `deadline`, if declared `idempotent`; otherwise its
+        deadline is checked between tries """
+    def __init__(self, step:Step, max_retries:int=10, retry_backoff:int=15, *, retry_policy:RetryPolicy|None=None,
+                 deadline:float|None=None, hedge_after:float|None=None, idempotent:bool=False) -> None:
         super().__init__()
+        if hedge_after is not None and step.side_effects and not idempotent:
+            raise ValueError(f'{type(step).__name__} has side effects; it can only be hedged if declared `idempotent`, '
+                             'as a hedged try runs alongside the first')
         self.step = step
         self.max_retries = max_retries
         self.retry_backoff=retry_backoff
+        # `EarlyEscape`s end a run by design; they're never retried
+        self.retry_policy = retry_policy or RetryPolicy(max_retries=max_retries - 1, backoff=retry_backoff, multiplier=1., jitter=0., fatal=(EarlyEscape,))
+        self.deadline = deadline
+        self.hedge_after = hedge_after
+        self.idempotent = idempotent
 
 
     def do(self):
-        for i in range(self.max_retries):
-            try:
-                # try to do the wrapped step, if it succeeds, break
-                self.step.do()
-                break
-            except Exception as e:
-                logging.warning(f'retry: {i}: {e} (sleeping for {self.retry_backoff}s)')
-
-                # if we're on the last retry, raise the exception
-                if i == (self.max_retries - 1):
-                    raise e
-                
-                sleep(self.retry_backoff)
+        policy = self.retry_policy
+        expires = None if self.deadline is None else monotonic() + self.deadline
+        self.hedges = self.hedge_wins = 0
+
+        try:
+            for i in count():
+                try:
+                    self.attempt(expires)
+                    return
+                except DeadlineExceeded:
+                    raise
+                except Exception as e:
+                    # if the error isn't worth retrying, or we're on the last retry, raise the exception
+                    if not policy.is_retryable(e) or i >= policy.max_retries:
+                        raise e
+
+                    backoff = policy.get_backoff(i + 1)
+                    if expires is not None and monotonic() + backoff >= expires:
+                        raise DeadlineExceeded(f'{type(self.step).__name__} did not succeed within {self.deadline}s') from e
+
+                    logging.warning(f'retry: {i}: {e} (sleeping for {backoff:.1f}s)')
+                    sleep(backoff)
+        finally:
+            record_metrics(retries=i, hedges=self.hedges, hedge_wins=self.hedge_wins)
+
+
+    def attempt(self, expires:float|None) -> None:
+        """ try the step; if there's a deadline or hedging, in worker threads, so that a slow try can be abandoned (or raced) """
+        if (expires is None or (self.step.side_effects and not self.idempotent)) and self.hedge_after is None:
+            # a try of a step with side effects isn't abandoned, as it would still be running when the next starts
+            self.try_step(self.step)
+            return
+
+        # each try writes to its own copies of the values of the step's written references; the first to succeed has its values set on
+        # them, and an abandoned (or losing) try runs on with its copies
+        outputs = {id(root_of(r)):root_of(r) for r in self.step.get_writes()}
+        tries:dict[Future, dict[int, Reference]] = {}
+        pool = ThreadPoolExecutor(2, thread_name_prefix='retry')
+
+        def start() -> Future:
+            references = {key:_copied(reference) for key, reference in outputs.items()}
+            future = pool.submit(copy_context().run, self.try_step, self.step.rebind(references))
+            tries[future] = references
+            return future
+
+        try:
+            first = start()
+            hedge_at = None if self.hedge_after is None else monotonic() + self.hedge_after
+            error:BaseException|None = None
+            while tries:
+                until = min((t for t in (expires, hedge_at) if t is not None), default=None)
+                done, _ = wait(tries, None if until is None else max(0., until - monotonic()), FIRST_COMPLETED)
+
+                for future in done:
+                    references = tries.pop(future)
+                    if (e := future.exception()) is not None:
+                        error = error or e
+                        continue
+                    self.hedge_wins += future is not first
+                    for key, reference in outputs.items():
+                        reference.set(references[key].get_value() if references[key].has_value() else None)
+                    return
+
+                if done:
+                    continue
+                if expires is not None and monotonic() >= expires:
+                    raise DeadlineExceeded(f'{type(self.step).__name__} did not succeed within {self.deadline}s')
+                if hedge_at is not None and monotonic() >= hedge_at:
+                    logging.info(f'{type(self.step).__name__} has taken over {self.hedge_after}s; starting a hedged try')
+                    self.hedges += 1
+                    hedge_at = None
+                    start()
+
+            assert error is not None
+            raise error
+        finally:
+            # an abandoned try runs on in the background, writing only to its own copies
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+    def try_step(self, step:Step) -> None:
+        with measure(type(step).__name__, step):
+            step.do()
+
+
+    def get_preflight_checks(self) -> list[PreflightCheck]:
+        """ perform preflight for the wrapped step """
+        return self.step.get_preflight_checks()
+
+
+    @property
+    def side_effects(self) -> bool:
+        return self.step.side_effects
+
+
+    def get_reads(self) -> list[Reference]:
+        return self.step.get_reads()
+
+
+    def get_writes(self) -> list[Reference]:
+        return self.step.get_writes()
+
+
+def _copied(reference:Reference) -> Reference:
+    """ a copy of `reference` with a deep copy of its value, so a try that modifies it in place (through a `ColumnReference`, or by
+        appending) doesn't modify the value of `reference`, or that of another try """
+    copied = copy(reference)
+    if reference.has_value():
+        copied.value = deepcopy(reference.get_value())
+    copied._spilled = None
+    return copied
@@ -0,0 +1,92 @@
+from ..async_step import AsyncStep, run_coroutine
+from ...references.reference import Reference
+from .get_solr_query_result import GetSolrQueryResult
+from ..dataframe.dtype_backend import DtypeBackend
+from aiohttp import ClientSession, TCPConnector
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import aclosing
+from itertools import islice
+import asyncio
+
+class AsyncGetSolrQueryResult[T](AsyncStep, GetSolrQueryResult[T]):
+    """ assign the result of a Solr query to a context, fetching up to `concurrency` pages at once with `aiohttp` """
+    def __init__(self, assign_to:Reference[T], url:str, instance:str, *, type_name:str|None, fq:str|None, fields:list[str]|None=None, start:int=0, rows:int=1000, limit:int|None=None, overwrite:bool=True,
+                 concurrency:int=4, dtype_backend:DtypeBackend|None=None):
+        super().__init__(assign_to, url, instance, type_name=type_name, fq=fq, fields=fields, start=start, rows=rows, limit=limit, overwrite=overwrite,
+                         dtype_backend=dtype_backend)
+        self.concurrency = max(1, concurrency)
+
+
+    def get_params(self, start:int) -> dict:
+        params = dict(
+            fq=self.fq,
+            q='*:*',
+            start=start,
+            rows=self.rows
+        )
+
+        if isinstance(self.fields, list):
+            params['fl'] = ','.join(['id'] + self.fields)
+
+        return params
+
+
+    async def get_page(self, session:ClientSession, start:int) -> dict:
+        async with session.get(f'{self.url}/{self.instance}/select', params=self.get_params(start)) as response:
+            response.raise_for_status()
+            return (await response.json(content_type=None))['response']
+        
+
+    async def agen_record_batches(self) -> AsyncIterator[list[dict]]:
+        """ get the first page to learn `numFound`, then the remaining pages with at most `concurrency` requested at once (a window that
+            moves on as the earliest page arrives); batches are yielded in order """
+        async with ClientSession(connector=TCPConnector(limit=self.concurrency)) as session:
+            first = await self.get_page(session, self.start)
+            yield first['docs']
+
+            end = first['numFound']
+            if self.limit:
+                end = min(end, self.start + self.limit)
+
+            starts = iter(range(self.start + self.rows, end, self.rows))
+            pending = deque(asyncio.create_task(self.get_page(session, start)) for start in islice(starts, self.concurrency))
+            try:
+                while pending:
+                    page = await pending.popleft()
+                    if (start := next(starts, None)) is not None:
+                        pending.append(asyncio.create_task(self.get_page(session, start)))
+                    yield page['docs']
+            finally:
+                # on an error (or an early close), don't leave requests running on a closed session
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+
+
+    async def agenerate(self) -> T:
+        async with aclosing(self.agen_record_batches()) as pages:
+            batches = [batch async for batch in pages]
+        records = (record for batch in batches for record in batch)
+        # building the DataFrame is cpu-bound; keep it off the event loop
+        return await asyncio.to_thread(self.records_to_result, records)
+
+
+    def generate(self) -> T:
+        return run_coroutine(self.agenerate())
+
+
+    async def ado(self):
+        if self.assign_to.has_value() and not self.overwrite:
+            return self.assign_to.get_value()
+
+        result = await self.agenerate()
+        self.assign_to.set(result)
+
+
+    async def apreflight(self):
+        async with ClientSession() as session:
+            async with session.head(self.url) as response:
+                response.raise_for_status()
+            async with session.head(f'{self.url}/{self.instance}/select', params={'q':'*:*'}) as response:
+                response.raise_for_status()
\ No newline at end of file
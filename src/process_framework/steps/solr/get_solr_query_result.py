@@ -4,10 +4,13 @@ from pandas import DataFrame, Series
 from typing import Iterable, Any
 from requests import Session
 from inflection import underscore
+from ..preflight import PreflightCheck, http_head
+from ..dataframe.dtype_backend import DtypeBackend, check_dtype_backend, to_dtype_backend
 
 class GetSolrQueryResult[T](AssigningStep[T]):
-    """ assign the result of an ElasticSearch index scan to a context """
-    def __init__(self, assign_to:Reference[T], url:str, instance:str, *, type_name:str|None, fq:str|None, fields:list[str]|None=None, start:int=0, rows:int=1000, limit:int|None=None, overwrite:bool=True):
+    """ assign the result of a Solr query to a context; set `dtype_backend` for arrow-backed columns (see `steps.dataframe.dtype_backend`) """
+    def __init__(self, assign_to:Reference[T], url:str, instance:str, *, type_name:str|None, fq:str|None, fields:list[str]|None=None, start:int=0, rows:int=1000, limit:int|None=None, overwrite:bool=True,
+                 dtype_backend:DtypeBackend|None=None):
         super().__init__(assign_to, overwrite=overwrite)
         self.url = url.strip('/')
         self.instance = instance.strip('/')
@@ -20,6 +23,8 @@ class GetSolrQueryResult[T](AssigningStep[T]):
         self.session = Session()
         self.fields = fields
         self.limit = limit
+        check_dtype_backend(dtype_backend)
+        self.dtype_backend = dtype_backend
 
     
     def gen_record_batches(self) -> Iterable[dict]:
@@ -45,7 +50,8 @@ class GetSolrQueryResult[T](AssigningStep[T]):
             batch = response.json()['response']['docs']
             yield batch
             total += len(batch)
-            if (len(batch) % params['rows'] != 0) or (self.limit and (total >= self.limit)): # type: ignore
+            # stop on a short (or empty, if the total is a multiple of `rows`) page, or at `limit`
+            if (not batch) or (len(batch) % params['rows'] != 0) or (self.limit and (total >= self.limit)): # type: ignore
                 break
             params['start'] += params['rows'] # type: ignore
 
@@ -53,7 +59,11 @@ class GetSolrQueryResult[T](AssigningStep[T]):
     def generate(self) -> T:
         batches = self.gen_record_batches()
         records = (record for batch in batches for record in batch)
+        return self.records_to_result(records)
 
+
+    def records_to_result(self, records:Iterable[dict]) -> T:
+        """ build an `id`-indexed DataFrame from `records`, and transform it to a value assignable to `assign_to` """
         df = DataFrame.from_records(
             data=records, # type: ignore
             index='id'
@@ -66,6 +76,7 @@ class GetSolrQueryResult[T](AssigningStep[T]):
             df.path = df.path.str[0]
 
         df.columns = df.columns.map(underscore)
+        df = to_dtype_backend(df, self.dtype_backend)
 
         if len(df.columns) == 1 and self.assign_to._type == Series:
             return df[df.columns[0]] # type: ignore
@@ -76,6 +87,8 @@ class GetSolrQueryResult[T](AssigningStep[T]):
         raise ValueError("unhandled state")
     
 
-    def preflight(self):
-        self.session.head(url=self.url).raise_for_status()
-        self.session.head(url=f'{self.url}/{self.instance}/select?q=*:*').raise_for_status()
\ No newline at end of file
+    def get_preflight_checks(self) -> list[PreflightCheck]:
+        return [
+            http_head(self.session, self.url),
+            http_head(self.session, f'{self.url}/{self.instance}/select?q=*:*')
+        ]
\ No newline at end of file
@@ -1,2 +1,19 @@
-from .assign_query_result_orm import GetOrmQueryResult
-from .assign_query_result_text import GetTextQueryResult
\ No newline at end of file
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .assign_query_result_orm import GetOrmQueryResult
+    from .assign_query_result_text import GetTextQueryResult
+
+# steps depend on sqlalchemy and pandas; import each from its module on first use
+_LAZY = {
+    'GetOrmQueryResult':'.assign_query_result_orm',
+    'GetTextQueryResult':'.assign_query_result_text',
+}
+__all__ = list(_LAZY)
+
+
+def __getattr__(name:str):
+    if name in _LAZY:
+        return getattr(import_module(_LAZY[name], __name__), name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
\ No newline at end of file
@@ -1,20 +1,24 @@
 from ...references.reference import Reference
 from ..assigning_step import AssigningStep
+from ..dataframe.dtype_backend import DtypeBackend, check_dtype_backend, to_dtype_backend
 from abc import ABC, abstractmethod
 import pandas as pd; from pandas import DataFrame, Series, Index
 from sqlalchemy import Select, Engine, URL, create_engine, Connection
 from typing import Any, Mapping, Callable
 
 class GetSqlQueryResultBase[T:(DataFrame, Series, Index)](AssigningStep[T], ABC):
-    """ base class for Steps that assign the result of Sql queries to `assign_to`"""
+    """ base class for Steps that assign the result of Sql queries to `assign_to`; set `dtype_backend` for arrow-backed columns (see `steps.dataframe.dtype_backend`) """
 
     def __init__(self, assign_to:Reference[T], *, 
-                 engine:Engine|None=None, url_create_kwargs:dict|None=None, column_mapper:dict|Mapping|Callable[[str], str]|None=None, index:str|Any|None=None, drop_index_column:bool=True, overwrite:bool=True):
+                 engine:Engine|None=None, url_create_kwargs:dict|None=None, column_mapper:dict|Mapping|Callable[[str], str]|None=None, index:str|Any|None=None, drop_index_column:bool=True, overwrite:bool=True,
+                 dtype_backend:DtypeBackend|None=None):
         super().__init__(assign_to=assign_to, overwrite=overwrite)
         self.engine = GetSqlQueryResultBase.__handle_engine_init_args__(engine, url_create_kwargs)
         self.column_mapper = column_mapper
         self.index = index
         self.drop_index_column = drop_index_column
+        check_dtype_backend(dtype_backend)
+        self.dtype_backend = dtype_backend
         
 
     @staticmethod
@@ -57,7 +61,10 @@ class GetSqlQueryResultBase[T:(DataFrame, Series, Index)](AssigningStep[T], ABC)
 
     def get_query_result(self, query:Select, conn:Connection) -> DataFrame:
         """ get the result of the qualified query as a DataFrame """
-        return pd.read_sql(query, conn)
+        if self.dtype_backend == 'pyarrow':
+            # pandas builds the arrow columns from the result rows
+            return pd.read_sql(query, conn, dtype_backend='pyarrow')
+        return to_dtype_backend(pd.read_sql(query, conn), self.dtype_backend)
     
 
     def transform_result(self, result) -> T:
@@ -3,6 +3,7 @@ from typing import Any, Mapping, Callable
 from ...references.reference import Reference
 from ...references.dataframe.reference_column import ColumnReference
 from .assign_query_result_base import GetSqlQueryResultBase
+from ..dataframe.dtype_backend import DtypeBackend
 from pandas import DataFrame, Series, Index
 from abc import ABC, abstractmethod
 from sqlalchemy import Select, MetaData, Engine, TextClause, ColumnElement, Table, Column, Connection, insert
@@ -21,8 +22,10 @@ class GetOrmQueryResult[T:(DataFrame, Series, Index)](GetSqlQueryResultBase[T],
     """ get the result of a query defined using the sqlalchemy ORM"""
 
     def __init__(self, assign_to: Reference[T], *, engine: Engine | None = None, url_create_kwargs: dict | None = None, column_mapper:dict|Mapping|Callable[[str], str]|None=None, index: Any | None=None,
-                 limit:int|None=None, _ids:list|Reference[list]|Reference[Series]|Reference[Index]|None=None, where:str|None=None, drop_index_column:bool=True, overwrite:bool=True):
-        super().__init__(assign_to, engine=engine, url_create_kwargs=url_create_kwargs, column_mapper=column_mapper, index=index, drop_index_column=drop_index_column, overwrite=overwrite)
+                 limit:int|None=None, _ids:list|Reference[list]|Reference[Series]|Reference[Index]|None=None, where:str|None=None, drop_index_column:bool=True, overwrite:bool=True,
+                 dtype_backend:DtypeBackend|None=None):
+        super().__init__(assign_to, engine=engine, url_create_kwargs=url_create_kwargs, column_mapper=column_mapper, index=index, drop_index_column=drop_index_column, overwrite=overwrite,
+                         dtype_backend=dtype_backend)
         # qualifiers
         self.limit:int|None=limit
         self._ids:list|Reference[list]|Reference[Series]|Reference[Index]|None = _ids
@@ -1,5 +1,6 @@
 from ...references.reference import Reference
 from .assign_query_result_base import GetSqlQueryResultBase
+from ..dataframe.dtype_backend import DtypeBackend
 from pandas import DataFrame, Series
 from sqlalchemy import Engine, TextClause, text
 from typing import Any, Mapping, Callable
@@ -8,8 +9,10 @@ class GetTextQueryResult[T:(DataFrame, Series)](GetSqlQueryResultBase[T]):
     """ a simple implementation of GetSqlQueryResult using a text query type """
 
     def __init__(self, assign_to: Reference[T], query:str, *, 
-                 engine: Engine | None = None, url_create_kwargs: dict | None = None, column_mapper:dict|Mapping|Callable[[str], str]|None=None, index: Any | None=None, drop_index_column:bool=True, overwrite:bool=True):
-        super().__init__(assign_to, engine=engine, url_create_kwargs=url_create_kwargs, column_mapper=column_mapper, index=index, drop_index_column=drop_index_column, overwrite=overwrite)
+                 engine: Engine | None = None, url_create_kwargs: dict | None = None, column_mapper:dict|Mapping|Callable[[str], str]|None=None, index: Any | None=None, drop_index_column:bool=True, overwrite:bool=True,
+                 dtype_backend:DtypeBackend|None=None):
+        super().__init__(assign_to, engine=engine, url_create_kwargs=url_create_kwargs, column_mapper=column_mapper, index=index, drop_index_column=drop_index_column, overwrite=overwrite,
+                         dtype_backend=dtype_backend)
         self.query = query
 
     def get_query(self) -> TextClause:
@@ -1,12 +1,92 @@
 from abc import ABC, abstractmethod
+from copy import copy
+from typing import Any, Self
+from ..references.reference import Reference
+from .preflight import PreflightCheck
+
+# attribute names of `Reference`s that steps assign to; every other `Reference` attribute is read
+WRITE_ATTRIBUTES = ('assign_to', 'append_to', 'assign_result')
+
 
 class Step(ABC):
-    
+
+    # steps that act on external systems (indexing, deleting, executing policies) are never run concurrently
+    side_effects:bool = False
+
     @abstractmethod
     def do(self):
         pass
     
 
     def preflight(self):
-        """ perform any preflight assertions; can throw errors or log warnings or do nothing """
-        ...
\ No newline at end of file
+        """ perform any preflight assertions; can throw errors or log warnings or do nothing;
+            by default, makes the checks from `get_preflight_checks` """
+        for check in self.get_preflight_checks():
+            check()
+
+
+    def get_preflight_checks(self) -> list[PreflightCheck]:
+        """ get this step's preflight assertions as keyed `PreflightCheck`s, which a pipeline can deduplicate and run concurrently;
+            a step that overrides `preflight` instead is wrapped in a single check of its own, which passes unless it raises """
+        if type(self).preflight is Step.preflight:
+            return []
+        return [PreflightCheck((id(self), 'preflight'), self.preflight, f'{type(self).__name__}.preflight()', truthy=False)]
+
+
+    def get_references(self) -> dict[str, Reference]:
+        """ get the `Reference` attributes of this step by attribute name, and those held in a list or tuple attribute (as 'name[i]') """
+        references:dict[str, Reference] = {}
+        for k, v in vars(self).items():
+            if isinstance(v, Reference):
+                references[k] = v
+            elif isinstance(v, (list, tuple)):
+                references.update({f'{k}[{i}]':r for i, r in enumerate(v) if isinstance(r, Reference)})
+        return references
+
+
+    def get_reads(self) -> list[Reference]:
+        """ get the `Reference`s this step reads; override if the default, name-based, inference is wrong """
+        return [v for k, v in self.get_references().items() if k.partition('[')[0] not in WRITE_ATTRIBUTES]
+
+
+    def get_writes(self) -> list[Reference]:
+        """ get the `Reference`s this step assigns to; override if the default, name-based, inference is wrong """
+        return [v for k, v in self.get_references().items() if k.partition('[')[0] in WRITE_ATTRIBUTES]
+
+
+    def get_arguments(self) -> dict[str, Any]:
+        """ get what this step does with its references, as its attributes other than `Reference`s and `_`-private ones; used to key
+            checkpoints, so override to return a version instead if the attributes hold run state or values that don't describe it """
+        return {k:v for k, v in vars(self).items() if not k.startswith('_') and not isinstance(v, Reference)}
+
+
+    def rebind(self, references:dict[int, Reference]) -> Self:
+        """ get a shallow copy of this step in which each `Reference` attribute keyed (by `id`) in `references` is replaced by its value;
+            references derived from them (`ColumnReference`s of a replaced `df`) and nested steps are rebound in turn """
+        step = copy(self)
+        for name, value in vars(self).items():
+            if (rebound := _rebind(value, references)) is not value:
+                setattr(step, name, rebound)
+        return step
+
+
+def _rebind(value:Any, references:dict[int, Reference]) -> Any:
+    """ rebind a `Reference`, a `Step`, or a list or tuple of them; anything else is returned as is """
+    if isinstance(value, Reference):
+        if (replacement := references.get(id(value))) is not None:
+            return replacement
+        df = getattr(value, 'df', None)
+        if isinstance(df, Reference) and (rebound := _rebind(df, references)) is not df:
+            value = copy(value)
+            value.df = rebound # type: ignore
+        return value
+
+    if isinstance(value, Step):
+        return value.rebind(references)
+
+    if isinstance(value, (list, tuple)):
+        rebound = [_rebind(v, references) for v in value]
+        if any(r is not v for r, v in zip(rebound, value)):
+            return type(value)(rebound)
+
+    return value
\ No newline at end of file
@@ -1,13 +1,15 @@
-from .step import Step
+from .memoizing import Memoizing
 from ..references.reference import Reference
 from abc import abstractmethod, ABC
 
-class TransformingStep[T1, T2](Step, ABC):
-    """ a step that performs an type-transforming transformation to a subject, assigning the result to a different reference. The transformation can change the type of the subject """
-    def __init__(self, subject:Reference[T1], assign_to:Reference[T2], *, overwrite:bool=True):
+class TransformingStep[T1, T2](Memoizing, ABC):
+    """ a step that performs an type-transforming transformation to a subject, assigning the result to a different reference. The transformation can change the type of the subject;
+        if `memoize`, it's only performed when the subject (or another input) changes (see `Memoizing`) """
+    def __init__(self, subject:Reference[T1], assign_to:Reference[T2], *, overwrite:bool=True, memoize:bool=False):
         self.subject_reference = subject
         self.assign_to = assign_to
         self.overwrite = overwrite
+        self.memoize = memoize
 
     @abstractmethod
     def transform(self, subject:T1) -> T2|None:
@@ -17,16 +19,32 @@ class TransformingStep[T1, T2](Step, ABC):
     def do(self):
         if self.assign_to.has_value() and not self.overwrite:
             return self.assign_to.get_value()
+
+        if self.recall():
+            return
         
         subject = self.subject_reference.get_value()
         
         result = self.transform(subject)
         
         if result is None:
+            # the subject was modified in place
+            self.subject_reference.touch()
+            self.remember(None)
             return
         
         if self.assign_to is not None and isinstance(result, self.assign_to._type):
             self.assign_to.set(result)
+            self.remember(result)
             return
         
-        raise Exception("Unhandled state")
\ No newline at end of file
+        raise Exception("Unhandled state")
+
+
+    def get_writes(self) -> list[Reference]:
+        """ the result is assigned to `assign_to`; a `transform` that returns None modifies the subject in place, so it's written too """
+        return [self.assign_to, self.subject_reference]
+
+
+    def get_output(self) -> Reference|None:
+        return self.assign_to
\ No newline at end of file
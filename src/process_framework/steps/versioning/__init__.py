@@ -1,4 +1,26 @@
-from .assert_any_changes import AssertAnyChanges, NoChangesToUpdate
-from .get_elastic_document_versions import GetElasticDocumentVersions
-from .get_sql_document_versions import GetSqlDocumentVersions
-from .changes import DetectAdditions, DetectDeletions, DetectUpdates
\ No newline at end of file
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .assert_any_changes import AssertAnyChanges, NoChangesToUpdate
+    from .get_elastic_document_versions import GetElasticDocumentVersions
+    from .get_sql_document_versions import GetSqlDocumentVersions
+    from .changes import DetectAdditions, DetectDeletions, DetectUpdates
+
+# steps depend on elasticsearch, sqlalchemy and pandas; import each from its module on first use
+_LAZY = {
+    'AssertAnyChanges':'.assert_any_changes',
+    'NoChangesToUpdate':'.assert_any_changes',
+    'GetElasticDocumentVersions':'.get_elastic_document_versions',
+    'GetSqlDocumentVersions':'.get_sql_document_versions',
+    'DetectAdditions':'.changes',
+    'DetectDeletions':'.changes',
+    'DetectUpdates':'.changes',
+}
+__all__ = list(_LAZY)
+
+
+def __getattr__(name:str):
+    if name in _LAZY:
+        return getattr(import_module(_LAZY[name], __name__), name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
\ No newline at end of file
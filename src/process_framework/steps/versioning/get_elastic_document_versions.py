@@ -1,5 +1,9 @@
 from process_framework.references.reference import Reference
 from process_framework.steps import AssigningStep
+from process_framework.steps.dataframe.dtype_backend import DtypeBackend, check_dtype_backend, string_dtype, to_dtype_backend
+from process_framework.steps.elasticsearch.point_in_time import ScanEngine, PitCursor, check_scan_engine, pit_scan, point_in_time
+from process_framework.steps.retry_policy import RetryPolicy
+from process_framework.instrumentation import record_metrics
 from pandas import Series, Index, DataFrame, MultiIndex
 from elasticsearch import Elasticsearch
 from elasticsearch.helpers import scan
@@ -7,7 +11,9 @@ from typing import Iterable, Any
 import logging
 
 class GetElasticDocumentVersions(AssigningStep[Index]):
-    """ scan an elasticsearch index, producing a `MultiIndex` of `fields`, which can be compared with another `MultiIndex` to detect changes """
+    """ scan an elasticsearch index, producing a `MultiIndex` of `fields`, which can be compared with another `MultiIndex` to detect changes;
+        set `dtype_backend` for arrow-backed levels (see `steps.dataframe.dtype_backend`), and `engine='pit'` to scan through a point in time
+        with `search_after` rather than a scroll, retrying failed pages as `retry_policy` allows (see `steps.elasticsearch.point_in_time`) """
     def __init__(self, 
                  *fields:tuple[str, str|type]|str,
                  assign_to: Reference[Index], 
@@ -16,7 +22,12 @@ class GetElasticDocumentVersions(AssigningStep[Index]):
                  default_field_type:str|type = str,
                  include_id:bool=True,
                  overwrite:bool=True,
-                 query:dict|None=None):
+                 query:dict|None=None,
+                 dtype_backend:DtypeBackend|None=None,
+                 engine:ScanEngine='scroll',
+                 size:int=1000,
+                 keep_alive:str='5m',
+                 retry_policy:RetryPolicy|None=None):
 
         super().__init__(assign_to, overwrite=overwrite)
         self.elasticsearch = elasticsearch
@@ -25,6 +36,13 @@ class GetElasticDocumentVersions(AssigningStep[Index]):
         self.default_field_type=default_field_type
         self.include_id=include_id
         self.query=query
+        check_dtype_backend(dtype_backend)
+        self.dtype_backend = dtype_backend
+        check_scan_engine(engine)
+        self.engine = engine
+        self.size = size
+        self.keep_alive = keep_alive
+        self.retry_policy = retry_policy
 
 
     def get_source(self) -> list[str]:
@@ -41,13 +59,13 @@ class GetElasticDocumentVersions(AssigningStep[Index]):
 
 
     def get_astype(self) -> dict:
-        """ get a dict of {field:type} that can be passed to DataFrame.astype() """
+        """ get a dict of {field:type} that can be passed to DataFrame.astype(); `str` fields stay arrow-backed if `dtype_backend` is set """
         astype = dict()
         for field in self.fields:
             if isinstance(field, tuple) and isinstance(field[0], str) and isinstance(field[1], (str, type)):
-                astype[field[0]] = field[1]
+                astype[field[0]] = string_dtype(self.dtype_backend) if field[1] is str else field[1]
             elif isinstance(field, str):
-                astype[field] = self.default_field_type
+                astype[field] = string_dtype(self.dtype_backend) if self.default_field_type is str else self.default_field_type
             else:
                 raise ValueError(f'expected `field` to be `str` or `tuple[str,str|type], got {field}')
         return astype
@@ -60,11 +78,21 @@ class GetElasticDocumentVersions(AssigningStep[Index]):
         
         source = self.get_source()
 
+        if self.engine == 'pit':
+            with point_in_time(self.elasticsearch, self.index, self.keep_alive) as pit_id:
+                cursor = PitCursor(pit_id)
+                index = self.index_from_scan_(pit_scan(self.elasticsearch, cursor, self.query, size=self.size, keep_alive=self.keep_alive,
+                                                       source=source, retry_policy=self.retry_policy))
+            record_metrics(pages=cursor.pages, page_retries=cursor.retries)
+            return index
+
         scan_:Iterable[dict[str, Any]] = scan(
             client=self.elasticsearch,
             index=self.index,
             source=source,
-            query=self.query
+            query=self.query,
+            size=self.size,
+            scroll=self.keep_alive
         )
 
         return self.index_from_scan_(scan_)
@@ -82,7 +110,7 @@ class GetElasticDocumentVersions(AssigningStep[Index]):
 
         df = DataFrame.from_records(df._source.values, index=df.index) #type:ignore
 
-        df = df.astype(self.get_astype()).reset_index()
+        df = to_dtype_backend(df.astype(self.get_astype()), self.dtype_backend).reset_index()
 
         index_keys = (['_id'] if self.include_id else []) + self.get_source() 
 
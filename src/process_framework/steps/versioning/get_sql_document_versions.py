@@ -1,4 +1,5 @@
 from process_framework.steps.sql import GetOrmQueryResult
+from process_framework.steps.dataframe.dtype_backend import string_dtype
 from pandas import Series
 from abc import ABC
 
@@ -7,6 +8,7 @@ class GetSqlDocumentVersions(GetOrmQueryResult[Series], ABC):
 
     def transform_result(self, result) -> Series:
         result = super().transform_result(result)
-        result.index = result.index.astype(str)
-        result = result.astype(str)
+        # strings stay arrow-backed if `dtype_backend` is set
+        result.index = result.index.astype(string_dtype(self.dtype_backend))
+        result = result.astype(string_dtype(self.dtype_backend))
         return result
\ No newline at end of file